@@ -1,4 +1,89 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+# SCALE-encoded input: bytes, or any C-contiguous buffer of bytes (bytearray, memoryview, mmap,
+# NumPy uint8 array), which is read in place without copying.
+# Decoding from a writable buffer holds the GIL; don't change it from other threads meanwhile.
+# A str is decoded as hex, with or without a 0x prefix.
+Encoded = Union[bytes, bytearray, memoryview, "mmap.mmap", "numpy.ndarray", str]
+
+# A public key: 32 bytes, or an SS58 address when decoded with an `ss58_format`.
+AccountId = Union[bytes, str]
+
+T = TypeVar("T")
+
+class DecodeError(ValueError):
+    """
+    Raised when SCALE-encoded bytes can't be decoded as the requested type.
+    """
+
+    # The type being decoded, e.g. "Vec<DelegateInfo>"
+    type_path: str
+    # Byte where decoding stopped, relative to the start of the encoded input
+    offset: int
+    # Bytes left from `offset`
+    remaining: int
+
+class VecIterator(Generic[T]):
+    """
+    Iterator over the items of a SCALE-encoded Vec, decoding one item per step.
+
+    Keeps a reference to the encoded input, so only the current item is held in memory.
+    Stops at the first item that fails to decode, after raising the error.
+    """
+
+    def __iter__(self) -> Iterator[T]:
+        pass
+    def __next__(self) -> T:
+        pass
+    def __length_hint__(self) -> int:
+        pass
+
+class VecDecoder(Generic[T]):
+    """
+    Resumable decoder for a SCALE-encoded Vec received in chunks, e.g. from a websocket.
+
+    Example:
+    >>> decoder = DelegateInfo.vec_decoder()
+    >>> for chunk in chunks:
+    ...     decoder.feed(chunk)
+    ...     for delegate in decoder.drain():
+    ...         ...
+    """
+
+    # Whether every item of the Vec has been decoded
+    done: bool
+    # The bytes fed after the last item of the Vec, or None until done
+    trailing: Optional[bytes]
+
+    def feed(self, chunk: Encoded) -> None:
+        """
+        Append the next chunk of the encoded Vec.
+
+        Raises ValueError once every item has been decoded.
+        """
+        pass
+    def drain(self) -> List[T]:
+        """
+        Decode and return the items completed since the last call.
+
+        The bytes of an item that is still incomplete are kept for the next chunk.
+
+        If an item fails to decode, the items before it are still returned, and the error
+        is raised by the next call (or this one, if there are none). The decoder can't
+        continue past it, so every later call raises the same error.
+        """
+        pass
 
 class AxonInfo:
     #  Axon serving block.
@@ -19,13 +104,59 @@ class AxonInfo:
     placeholder2: int
 
     @staticmethod
-    def decode(encoded: bytes) -> "AxonInfo":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "AxonInfo":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["AxonInfo"]:
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["AxonInfo"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[AxonInfo]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["AxonInfo"]:
+    def vec_decoder() -> "VecDecoder[AxonInfo]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["AxonInfo"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["AxonInfo"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<AxonInfo>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
 
 class PrometheusInfo:
@@ -40,25 +171,71 @@ class PrometheusInfo:
     ip_type: int
 
     @staticmethod
-    def decode(encoded: bytes) -> "PrometheusInfo":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "PrometheusInfo":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["PrometheusInfo"]:
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["PrometheusInfo"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[PrometheusInfo]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["PrometheusInfo"]:
+    def vec_decoder() -> "VecDecoder[PrometheusInfo]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["PrometheusInfo"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["PrometheusInfo"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<PrometheusInfo>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
 
 class NeuronInfo:
-    hotkey: bytes
-    coldkey: bytes
+    hotkey: AccountId
+    coldkey: AccountId
     uid: int
     netuid: int
     active: bool
     axon_info: AxonInfo
     prometheus_info: PrometheusInfo
     stake: List[
-        Tuple[bytes, int]
+        Tuple[AccountId, int]
     ]  # map of coldkey to stake on this neuron/hotkey (includes delegations)
     rank: int
     emission: int
@@ -74,25 +251,89 @@ class NeuronInfo:
     pruning_score: int
 
     @staticmethod
-    def decode(encoded: bytes) -> "NeuronInfo":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "NeuronInfo":
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["NeuronInfo"]:
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["NeuronInfo"]:
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["NeuronInfo"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[NeuronInfo]":
+        pass
+    @staticmethod
+    def vec_decoder() -> "VecDecoder[NeuronInfo]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["NeuronInfo"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["NeuronInfo"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<NeuronInfo>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
+        pass
+    @staticmethod
+    def decode_vec_columnar(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> Dict[str, "numpy.ndarray"]:
+        """
+        Decode a SCALE-encoded Vec<NeuronInfo> into a dict of NumPy arrays, one per scalar field.
+
+        `hotkey` and `coldkey` are (n, 32) uint8 arrays; `active` and `validator_permit` are
+        bool; `emission` and `last_update` are uint64; the other fields are uint16.
+        `stake` is the neuron's total stake as uint64, summed over its coldkeys; the
+        per-coldkey amounts are only available from `decode_vec`.
+        No per-neuron Python objects are created.
+
+        `weights` and `bonds` are sparse (n, n_uids) matrices in CSR form, as a tuple of
+        (indptr: uint32, indices: uint16, values: uint16) arrays. Row i is the i-th neuron.
+        e.g. `scipy.sparse.csr_matrix((values, indices, indptr))`
+        """
         pass
 
 class NeuronInfoLite:
-    hotkey: bytes
-    coldkey: bytes
+    hotkey: AccountId
+    coldkey: AccountId
     uid: int
     netuid: int
     active: bool
     axon_info: AxonInfo
     prometheus_info: PrometheusInfo
     stake: List[
-        Tuple[bytes, int]
+        Tuple[AccountId, int]
     ]  # map of coldkey to stake on this neuron/hotkey (includes delegations)
     rank: int
     emission: int
@@ -107,13 +348,73 @@ class NeuronInfoLite:
     pruning_score: int
 
     @staticmethod
-    def decode(encoded: bytes) -> "NeuronInfoLite":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "NeuronInfoLite":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["NeuronInfoLite"]:
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["NeuronInfoLite"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[NeuronInfoLite]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["NeuronInfoLite"]:
+    def vec_decoder() -> "VecDecoder[NeuronInfoLite]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["NeuronInfoLite"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["NeuronInfoLite"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<NeuronInfoLite>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
+        pass
+    @staticmethod
+    def decode_vec_columnar(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> Dict[str, "numpy.ndarray"]:
+        """
+        Decode a SCALE-encoded Vec<NeuronInfoLite> into a dict of NumPy arrays, one per scalar field.
+
+        `hotkey` and `coldkey` are (n, 32) uint8 arrays; `active` and `validator_permit` are
+        bool; `emission` and `last_update` are uint64; the other fields are uint16.
+        `stake` is the neuron's total stake as uint64, summed over its coldkeys; the
+        per-coldkey amounts are only available from `decode_vec`.
+        No per-neuron Python objects are created.
+        """
         pass
 
 class SubnetIdentity:
@@ -124,13 +425,59 @@ class SubnetIdentity:
     subnet_contact: bytes
 
     @staticmethod
-    def decode(encoded: bytes) -> "SubnetIdentity":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "SubnetIdentity":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["SubnetIdentity"]:
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["SubnetIdentity"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[SubnetIdentity]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["SubnetIdentity"]:
+    def vec_decoder() -> "VecDecoder[SubnetIdentity]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["SubnetIdentity"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["SubnetIdentity"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<SubnetIdentity>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
 
 class SubnetInfo:
@@ -151,19 +498,71 @@ class SubnetInfo:
     network_connect: List[List[int]]  # List[[int, int]]
     emission_values: int
     burn: int
-    owner: bytes
+    owner: AccountId
 
     @staticmethod
-    def decode(encoded: bytes) -> "SubnetInfo":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "SubnetInfo":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["SubnetInfo"]:
+        pass
+    @staticmethod
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[SubnetInfo]":
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["SubnetInfo"]:
+    def vec_decoder() -> "VecDecoder[SubnetInfo]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["SubnetInfo"]:
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["SubnetInfo"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["SubnetInfo"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<SubnetInfo>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
     @staticmethod
-    def decode_vec_option(encoded: bytes) -> List[Optional["SubnetInfo"]]:
+    def decode_vec_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> List[Optional["SubnetInfo"]]:
         pass
 
 class SubnetInfoV2:
@@ -184,20 +583,72 @@ class SubnetInfoV2:
     network_connect: List[List[int]]  # List[[int, int]]
     emission_values: int
     burn: int
-    owner: bytes
+    owner: AccountId
     identity: Optional[SubnetIdentity]
 
     @staticmethod
-    def decode(encoded: bytes) -> "SubnetInfoV2":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "SubnetInfoV2":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["SubnetInfoV2"]:
+        pass
+    @staticmethod
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[SubnetInfoV2]":
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["SubnetInfoV2"]:
+    def vec_decoder() -> "VecDecoder[SubnetInfoV2]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["SubnetInfoV2"]:
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["SubnetInfoV2"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["SubnetInfoV2"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<SubnetInfoV2>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
     @staticmethod
-    def decode_vec_option(encoded: bytes) -> List[Optional["SubnetInfoV2"]]:
+    def decode_vec_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> List[Optional["SubnetInfoV2"]]:
         pass
 
 class SubnetHyperparameters:
@@ -230,38 +681,136 @@ class SubnetHyperparameters:
     liquid_alpha_enabled: bool
 
     @staticmethod
-    def decode(encoded: bytes) -> "SubnetHyperparameters":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "SubnetHyperparameters":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["SubnetHyperparameters"]:
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["SubnetHyperparameters"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[SubnetHyperparameters]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["SubnetHyperparameters"]:
+    def vec_decoder() -> "VecDecoder[SubnetHyperparameters]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["SubnetHyperparameters"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["SubnetHyperparameters"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<SubnetHyperparameters>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
 
 class StakeInfo:
-    hotkey: bytes
-    coldkey: bytes
+    hotkey: AccountId
+    coldkey: AccountId
     stake: int
 
     @staticmethod
-    def decode(encoded: bytes) -> "StakeInfo":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "StakeInfo":
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["StakeInfo"]:
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["StakeInfo"]:
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["StakeInfo"]:
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[StakeInfo]":
         pass
     @staticmethod
-    def decode_vec_tuple_vec(encoded: bytes) -> List[Tuple[bytes, List["StakeInfo"]]]:
+    def vec_decoder() -> "VecDecoder[StakeInfo]":
+        pass
+    @staticmethod
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["StakeInfo"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["StakeInfo"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<StakeInfo>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
+        pass
+    @staticmethod
+    def decode_vec_tuple_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> List[Tuple[AccountId, List["StakeInfo"]]]:
         pass
 
 class DelegateInfo:
-    delegate_ss58: bytes
+    delegate_ss58: AccountId
     take: int
-    nominators: List[Tuple[bytes, int]]  # map of nominator_ss58 to stake amount
-    owner_ss58: bytes
+    nominators: List[Tuple[AccountId, int]]  # map of nominator_ss58 to stake amount
+    owner_ss58: AccountId
     registrations: List[int]  # Vec of netuid this delegate is registered on
     validator_permits: List[int]  # Vec of netuid this delegate has validator permit on
     return_per_1000: (
@@ -270,16 +819,68 @@ class DelegateInfo:
     total_daily_return: int
 
     @staticmethod
-    def decode(encoded: bytes) -> "DelegateInfo":
+    def decode(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        allow_trailing_bytes: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> "DelegateInfo":
+        pass
+    @staticmethod
+    def decode_option(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Optional["DelegateInfo"]:
+        pass
+    @staticmethod
+    def decode_vec_iter(
+        encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "VecIterator[DelegateInfo]":
         pass
     @staticmethod
-    def decode_option(encoded: bytes) -> Optional["DelegateInfo"]:
+    def vec_decoder() -> "VecDecoder[DelegateInfo]":
         pass
     @staticmethod
-    def decode_vec(encoded: bytes) -> List["DelegateInfo"]:
+    def decode_vec(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        strict: bool = True,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> Union[
+        List["DelegateInfo"],
+        List[Dict[str, Any]],
+        Tuple[Union[List["DelegateInfo"], List[Dict[str, Any]]], Optional[DecodeError]],
+    ]:
+        """
+        Decode a SCALE-encoded Vec<DelegateInfo>.
+
+        With `fields`, returns a dict per item holding only those fields; the others are
+        skipped over in the encoded data without being decoded.
+
+        Raises DecodeError on invalid data. With `strict=False`, returns `(items, error)`
+        instead: the items decoded before the error, and the DecodeError (or None).
+
+        With `ss58_format` (e.g. 42), AccountIds are SS58 addresses instead of bytes, as with
+        every typed `decode*` method. With `intern_account_ids=True`, or an `ss58_format`,
+        equal AccountIds across the result are one shared object.
+        """
         pass
     @staticmethod
-    def decode_delegated(encoded: bytes) -> List[Tuple["DelegateInfo", int]]:
+    def decode_delegated(
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        ss58_format: Optional[int] = None,
+        intern_account_ids: bool = False,
+    ) -> List[Tuple["DelegateInfo", int]]:
         pass
 
 class MetadataV15:
@@ -305,7 +906,9 @@ class MetadataV15:
     """
 
     @staticmethod
-    def decode_from_metadata_option(encoded_metadata_v15: bytes) -> "MetadataV15":
+    def decode_from_metadata_option(
+        encoded_metadata_v15: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> "MetadataV15":
         """
         Decodes to Option<Vec<u8>>, then decodes to MetadataPrefixed and returns MetadataV15.
         """
@@ -348,23 +951,258 @@ class PortableRegistry:
     """
 
     registry: str  # JSON encoded PortableRegistry
+    # Whether `decode` and the other type-string functions given this registry decode
+    # sequences and arrays of u8 as tuples of ints, as in earlier versions, instead of bytes
+    bytes_as_tuples: bool
 
     @staticmethod
-    def from_json(json_str: str) -> "PortableRegistry":
+    def from_json(json_str: str, bytes_as_tuples: bool = False) -> "PortableRegistry":
         pass
     @staticmethod
-    def from_metadata_v15(metadata_v15: MetadataV15) -> "PortableRegistry":
+    def from_metadata_v15(
+        metadata_v15: MetadataV15, bytes_as_tuples: bool = False
+    ) -> "PortableRegistry":
         pass
+    def to_bytes(self) -> bytes:
+        """
+        The SCALE-encoded registry, to pass to `from_bytes`.
+        Much smaller, and faster to load, than the JSON in `registry`.
+        """
+        pass
+    @staticmethod
+    def from_bytes(encoded: Encoded, bytes_as_tuples: bool = False) -> "PortableRegistry":
+        """
+        Load a registry from `to_bytes`. Raises DecodeError on invalid data.
+        """
+        pass
+
+class CompiledRegistry:
+    """
+    CompiledRegistry is a PortableRegistry prepared for decoding and encoding by type-string.
+
+    It is built once, and keeps the type-string lookup table and any types created from
+    type-strings (Vec<T>, (T1, T2), [T; N], Compact<T>, Option<T>) across calls.
+    Passing it to `decode`, `decode_list` or `encode` instead of a PortableRegistry avoids
+    copying and re-indexing the whole registry on every call.
+
+    Example:
+    >>> registry = bt_decode.PortableRegistry.from_metadata_v15( metadata_v15 )
+    >>> compiled = bt_decode.CompiledRegistry.from_portable_registry( registry )
+    >>> bt_decode.decode("Vec<NeuronInfoLite>", compiled, neurons_lite_bytes)
+
+    Sequences and arrays of u8, like AccountId32 and Vec<u8>, decode as `bytes`. Pass
+    `bytes_as_tuples=True` to get the tuples of ints of earlier versions instead; by default,
+    `from_portable_registry` takes it from the PortableRegistry.
+
+    With `intern_account_ids=True`, every [u8; 32] (e.g. AccountId32) decoded with the registry
+    is the same object as an equal one decoded before, until `clear_interned_account_ids`.
+    Up to 65536 distinct ones are kept; past that, the registry starts over with new objects.
+    """
+
+    registry: str  # JSON encoded PortableRegistry, including types created from type-strings
+
+    @staticmethod
+    def from_portable_registry(
+        portable_registry: PortableRegistry,
+        bytes_as_tuples: Optional[bool] = None,
+        intern_account_ids: bool = False,
+    ) -> "CompiledRegistry":
+        pass
+    @staticmethod
+    def from_metadata_v15(
+        metadata: MetadataV15,
+        bytes_as_tuples: bool = False,
+        intern_account_ids: bool = False,
+    ) -> "CompiledRegistry":
+        pass
+    def clear_interned_account_ids(self) -> None:
+        """
+        Drop the objects kept for interned AccountIds, e.g. after a runtime upgrade.
+        """
+        pass
+    def enable_decode_cache(
+        self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 4096
+    ) -> None:
+        """
+        Cache values decoded with this registry by `decode` and `CompiledType.decode`, keyed
+        by type and encoded bytes, so decoding the same payload again returns the same object.
+
+        The least recently used values are evicted past `max_entries`, or past `max_bytes` of
+        encoded bytes. Only strict decodes that allow trailing bytes are cached.
+
+        A hit returns the same object as the decode that filled the cache, not a copy.
+        Decoded values are mutable (lists and dicts), and mutating one changes what every
+        later hit returns, so copy a result (e.g. `copy.deepcopy`) before changing it.
+        Calling it again replaces the cache with an empty one.
+        """
+        pass
+    def disable_decode_cache(self) -> None:
+        pass
+    def clear_decode_cache(self) -> None:
+        """
+        Drop every cached value, e.g. after a runtime upgrade changed what the types decode to.
+        """
+        pass
+    def decode_cache_info(self) -> Optional[dict[str, int]]:
+        """
+        The cache's `hits`, `misses`, `entries`, `bytes`, `max_bytes` and `max_entries`, or
+        None if the cache is not enabled.
+        """
+        pass
+
+class CompiledType:
+    """
+    A type-string compiled against a registry, as returned by `compile`.
+
+    Holds the resolved type and a decode plan, so repeated decoding does no
+    type-string parsing or registry lookups.
+
+    Example:
+    >>> neurons_lite_type = bt_decode.compile("Vec<NeuronInfoLite>", registry)
+    >>> neurons_lite = neurons_lite_type.decode(neurons_lite_bytes)
+    """
+
+    type_string: str
+    type_id: int
+
+    def decode(
+        self,
+        encoded: Encoded,
+        offset: int = 0,
+        length: Optional[int] = None,
+        strict: bool = True,
+        allow_trailing_bytes: bool = True,
+    ) -> Any:
+        """
+        Decode a SCALE-encoded value of this type, as with `decode`.
+        """
+        pass
+    def decode_with_offset(self, encoded: Encoded, offset: int = 0) -> Tuple[Any, int]:
+        """
+        Decode a value of this type starting at `offset`, as with `decode_with_offset`.
+        """
+        pass
+    def decode_iter(
+        self, encoded: Encoded, offset: int = 0, length: Optional[int] = None
+    ) -> VecIterator[Any]:
+        """
+        Iterate over the items of a SCALE-encoded value of this sequence type, e.g. Vec<T>.
+        """
+        pass
+    def decode_many(
+        self, list_encoded: list[Encoded], workers: Optional[int] = None
+    ) -> list[Any]:
+        """
+        Decode a list of SCALE-encoded values of this type, in order.
+
+        With `workers` greater than 1, the values are parsed concurrently on that many threads.
+        """
+        pass
+    def encode(self, to_encode: Any, as_list: bool = False) -> Union[bytes, list[int]]:
+        pass
+    def encode_into(self, to_encode: Any, buffer: Any, offset: int = 0) -> int:
+        """
+        Encode a python object into a writable buffer at `offset`, as with `encode_into`.
+        """
+        pass
+
+def compile(
+    type_string: str,
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+) -> CompiledType:
+    """
+    Compile a type-string into a reusable decoder/encoder for that type.
+
+    When given a PortableRegistry, a CompiledRegistry is built for, and kept by, the result.
+    """
+    pass
 
 def decode(
-    type_string: str, portable_registry: PortableRegistry, encoded: bytes
+    type_string: str,
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    encoded: Encoded,
+    offset: int = 0,
+    length: Optional[int] = None,
+    strict: bool = True,
+    allow_trailing_bytes: bool = True,
 ) -> Any:
+    """
+    Decode a SCALE-encoded value using its type-string.
+
+    Only `encoded[offset:offset + length]` is decoded, or `encoded[offset:]` without a length.
+    Bytes left over after the value are ignored, unless `allow_trailing_bytes` is False, in
+    which case they are a DecodeError.
+
+    Raises DecodeError on invalid data. With `strict=False`, returns `(value, error)` instead,
+    where error is the DecodeError or None. On error, value is the list of items decoded
+    before it for sequence types (e.g. Vec<T>), and None otherwise.
+    """
+    pass
+
+def decode_with_offset(
+    type_string: str,
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    encoded: Encoded,
+    offset: int = 0,
+) -> Tuple[Any, int]:
+    """
+    Decode a SCALE-encoded value starting at `offset`.
+
+    Returns the value and the number of bytes it took, so the next value starts at
+    `offset + bytes_consumed`.
+    """
+    pass
+
+def decode_sequence(
+    list_type_strings: list[str],
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    encoded: Encoded,
+    offset: int = 0,
+    allow_trailing_bytes: bool = True,
+) -> list[Any]:
+    """
+    Decode values of the given type-strings stored back-to-back in one buffer, from `offset`.
+
+    With `allow_trailing_bytes=False`, bytes left after the last value are a DecodeError.
+    """
+    pass
+
+def decode_iter(
+    type_string: str,
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    encoded: Encoded,
+    offset: int = 0,
+    length: Optional[int] = None,
+) -> VecIterator[Any]:
+    """
+    Iterate over the items of a SCALE-encoded sequence type, e.g. Vec<T>, decoding one
+    item per step instead of the whole list at once.
+    """
+    pass
+
+def ss58_encode_many(public_keys: Encoded, ss58_format: int = 42) -> list[str]:
+    """
+    SS58 addresses of the 32-byte public keys stored back-to-back in `public_keys`, e.g. a
+    `(n, 32)` NumPy uint8 array.
+    """
+    pass
+
+def ss58_decode_many(
+    addresses: list[str], ss58_format: Optional[int] = None
+) -> "numpy.ndarray":
+    """
+    Public keys of SS58 addresses, as an `(n, 32)` NumPy uint8 array.
+    This needs `numpy` installed (`pip install bt-decode[numpy]`).
+
+    Raises ValueError for an invalid address, or one of another format than `ss58_format`.
+    """
     pass
 
 def decode_list(
     list_type_strings: list[str],
-    portable_registry: PortableRegistry,
-    list_encoded: list[bytes],
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    list_encoded: list[Encoded],
+    workers: Optional[int] = None,
 ) -> list[Any]:
     """
     Decode a list of SCALE-encoded types using a list of their type-strings.
@@ -372,25 +1210,126 @@ def decode_list(
     Note: the type-strings are potentially all different.
     Note: the order of `list_type_strings` and `list_encoded` must match.
 
+    With `workers` greater than 1, the values are parsed concurrently on up to that many
+    threads, with the GIL released. The threads come from one pool shared by every call,
+    with a thread per CPU.
+
     Returns a list of the decoded values as python objects, in the order they were
     provided to the function.
     """
     pass
 
 def encode(
-    type_string: str, portable_registry: PortableRegistry, to_encode: Any
-) -> list[int]:
+    type_string: str,
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    to_encode: Any,
+    as_list: bool = False,
+) -> Union[bytes, list[int]]:
     """
     Encode a python object to bytes.
 
-    Returns a list of integers representing the encoded bytes.
+    Returns the encoded bytes, or a list of integers representing them if `as_list` is set.
 
     Example:
     >>> import bittensor as bt
     >>> res = bt.decode.encode("u128", bt.decode.PortableRegistry.from_json(...), 1234567890)
-    >>> res
-    [210, 2, 150, 73, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-    >>> bytes(res).hex()
+    >>> res.hex()
     'd2029649000000000000000000000000'
+    >>> bt.decode.encode("u128", bt.decode.PortableRegistry.from_json(...), 1234567890, as_list=True)
+    [210, 2, 150, 73, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+    """
+    pass
+
+def encode_list(
+    list_type_strings: list[str],
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    list_to_encode: list[Any],
+    concatenate: bool = False,
+) -> Union[list[bytes], Tuple[bytes, list[int]]]:
+    """
+    Encode a list of python objects using a list of their type-strings.
+
+    Note: the order of `list_type_strings` and `list_to_encode` must match.
+
+    Returns a list of the encoded bytes, in the order they were provided to the function.
+    With `concatenate`, returns a single bytes of all the encoded values instead, with a list of
+    offsets: value i is `encoded[offsets[i]:offsets[i + 1]]`.
+    """
+    pass
+
+def encode_into(
+    type_string: str,
+    portable_registry: Union[PortableRegistry, CompiledRegistry],
+    to_encode: Any,
+    buffer: Any,
+    offset: int = 0,
+) -> int:
+    """
+    Encode a python object into a writable, contiguous buffer (bytearray, memoryview, mmap, ...),
+    starting at `offset`.
+
+    Returns the number of bytes written.
+    Raises ValueError if the encoded value does not fit in the buffer.
+
+    Example:
+    >>> buffer = bytearray(1024)
+    >>> written = bt_decode.encode_into("Vec<(u16, u16)>", registry, weights, buffer, offset=4)
+    """
+    pass
+
+def storage_key(
+    metadata: MetadataV15,
+    pallet: str,
+    entry: str,
+    keys: Sequence[Any] = (),
+) -> bytes:
+    """
+    Build the storage key of `pallet.entry` for the given map keys.
+
+    The hashers and key types are read from the metadata. Each key is encoded as with
+    `encode` (an AccountId32 also takes 32 bytes or an SS58 address), then hashed.
+    With fewer keys than the entry takes, returns the prefix of all keys starting with them,
+    e.g. for `state_getKeysPaged`.
+
+    Example:
+    >>> key = bt_decode.storage_key(metadata_v15, "SubtensorModule", "Stake", [hotkey, coldkey])
+    >>> "0x" + key.hex()
+    """
+    pass
+
+def storage_keys(
+    metadata: MetadataV15,
+    pallet: str,
+    entry: str,
+    keys_list: Sequence[Sequence[Any]],
+) -> list[bytes]:
+    """
+    Build the storage keys of `pallet.entry` for each sequence of map keys in `keys_list`,
+    as with `storage_key`.
+    """
+    pass
+
+def decode_storage_keys(
+    metadata: MetadataV15,
+    pallet: str,
+    entry: str,
+    storage_keys: list[Encoded],
+    workers: Optional[int] = None,
+) -> list[tuple[Any, ...]]:
+    """
+    Decode full storage keys of `pallet.entry`, e.g. as returned by `state_getKeysPaged`,
+    into a tuple of their map keys each.
+
+    The hashers and key types are read from the metadata. A key behind a hasher that doesn't
+    keep it (`Blake2_128`, `Twox128`, ...) can't be recovered and is None. Raises ValueError
+    if a key is not of the entry.
+
+    With `workers` greater than 1, the keys are parsed concurrently on up to that many
+    threads, as with `decode_list`.
+
+    Example:
+    >>> keys = sub.substrate.rpc_request("state_getKeysPaged", [prefix_hex, 1000])["result"]
+    >>> bt_decode.decode_storage_keys(metadata_v15, "SubtensorModule", "Stake", keys)
+    [(hotkey, coldkey), ...]
     """
     pass
@@ -1,10 +1,23 @@
 use proc_macro::TokenStream;
 use proc_macro2::TokenStream as TokenStream2;
 use quote::quote;
-use syn::{parse::Nothing, parse2, parse_quote, Error, ItemImpl, Result};
+use syn::{
+    parse::Nothing, parse2, parse_quote, punctuated::Punctuated, token::Comma, Data, DataStruct,
+    DeriveInput, Error, Field, Fields, ItemImpl, Result,
+};
 
-/// Automatically adds `py_decode` and `py_decode_vec` methods to a struct's inherent impl block,
-/// making them available as Python methods via `pyo3`.
+/// Automatically adds `py_decode`, `py_decode_vec`, `py_decode_vec_iter`, `py_vec_decoder` and
+/// `py_decode_option` methods to a struct's inherent impl block, making them available as Python
+/// methods via `pyo3`.
+///
+/// The methods take any `crate::Encoded` input, with an optional `offset`/`length` range.
+/// Decoding runs through `Encoded::parse`, so large inputs are decoded with the GIL released;
+/// only the conversion of the result to Python objects holds it. `py_decode_vec_iter` instead
+/// returns a `crate::PyVecIterator`, which decodes one item per step, and `py_vec_decoder` a
+/// `crate::PyVecDecoder`, which decodes a Vec fed to it in chunks. `py_decode`, `py_decode_vec`
+/// and `py_decode_option` take an optional `ss58_format` to return AccountIds as SS58 addresses,
+/// and `intern_account_ids` to share one object between equal AccountIds of a call (see
+/// `#[derive(AccountIds)]`).
 ///
 /// ```ignore
 /// use your_crate::pydecode;
@@ -46,40 +59,310 @@ fn pydecode_impl(attr: TokenStream2, tokens: TokenStream2) -> Result<TokenStream
     };
 
     let struct_name_str = struct_name.to_string();
+    let vec_name_str = format!("Vec<{}>", struct_name_str);
+    let option_name_str = format!("Option<{}>", struct_name_str);
 
     // Add the py_decode method
     item_impl.items.push(parse_quote! {
-        #[pyo3(name = "decode")]
+        #[pyo3(
+            name = "decode",
+            signature = (
+                encoded,
+                offset=0,
+                length=None,
+                allow_trailing_bytes=true,
+                ss58_format=None,
+                intern_account_ids=false
+            )
+        )]
+        #[staticmethod]
+        fn py_decode(
+            py: Python<'_>,
+            encoded: crate::Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            allow_trailing_bytes: bool,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Self> {
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    let (decoded, consumed) =
+                        crate::errors::decode_prefix::<#struct_name>(encoded, offset, #struct_name_str)?;
+                    if !allow_trailing_bytes {
+                        crate::errors::check_trailing_bytes(encoded, consumed, offset, #struct_name_str)?;
+                    }
+                    Ok::<_, crate::errors::DecodeFailure>(decoded)
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+            crate::accountids::preset_account_ids(
+                py,
+                std::slice::from_ref(&decoded),
+                ss58_format,
+                intern_account_ids,
+            )?;
+            Ok(decoded)
+        }
+    });
+
+    // Add the py_decode_vec method; with fields, only those are decoded (see #[derive(Project)]),
+    // and without strict, the items decoded before an error are returned with the error
+    item_impl.items.push(parse_quote! {
+        #[pyo3(
+            name = "decode_vec",
+            signature = (
+                encoded,
+                offset=0,
+                length=None,
+                fields=None,
+                strict=true,
+                ss58_format=None,
+                intern_account_ids=false
+            )
+        )]
+        #[staticmethod]
+        fn py_decode_vec(
+            py: Python<'_>,
+            encoded: crate::Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            fields: Option<Vec<String>>,
+            strict: bool,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Py<PyAny>> {
+            if let Some(fields) = fields {
+                return crate::projection::decode_vec_projected::<#struct_name>(
+                    py,
+                    &encoded,
+                    offset,
+                    length,
+                    &fields,
+                    strict,
+                    ss58_format,
+                    intern_account_ids,
+                );
+            }
+            if !strict {
+                let (decoded, failure) = encoded.parse(py, offset, length, |encoded| {
+                    crate::errors::decode_vec_partial::<#struct_name>(encoded, offset, #vec_name_str)
+                })?;
+                crate::accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+                let error = failure.map(|failure| failure.into_pyerr(py).into_value(py));
+                return Ok((decoded, error).into_pyobject(py)?.into_any().unbind());
+            }
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    crate::errors::decode_typed::<Vec<#struct_name>>(encoded, offset, #vec_name_str)
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+            crate::accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+            Ok(decoded.into_pyobject(py)?.into_any().unbind())
+        }
+    });
+
+    // Add the py_decode_vec_iter method
+    item_impl.items.push(parse_quote! {
+        #[pyo3(name = "decode_vec_iter", signature = (encoded, offset=0, length=None))]
         #[staticmethod]
-        fn py_decode(encoded: &[u8]) -> Self {
-            #struct_name::decode(&mut &encoded[..])
-                .expect(&format!("Failed to decode {}", #struct_name_str))
+        fn py_decode_vec_iter(
+            py: Python<'_>,
+            encoded: crate::Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+        ) -> PyResult<crate::PyVecIterator> {
+            crate::PyVecIterator::typed::<#struct_name>(py, encoded, offset, length)
         }
     });
 
-    // Add the py_decode_vec method
+    // Add the py_vec_decoder method
     item_impl.items.push(parse_quote! {
-        #[pyo3(name = "decode_vec")]
+        #[pyo3(name = "vec_decoder")]
         #[staticmethod]
-        fn py_decode_vec(encoded: &[u8]) -> Vec<Self> {
-            Vec::<#struct_name>::decode(&mut &encoded[..])
-                .expect(&format!("Failed to decode Vec<{}>", #struct_name_str))
+        fn py_vec_decoder() -> crate::PyVecDecoder {
+            crate::PyVecDecoder::typed::<#struct_name>()
         }
     });
 
     // Add the py_decode_option method
     item_impl.items.push(parse_quote! {
-        #[pyo3(name = "decode_option")]
+        #[pyo3(
+            name = "decode_option",
+            signature = (encoded, offset=0, length=None, ss58_format=None, intern_account_ids=false)
+        )]
         #[staticmethod]
-        fn py_decode_option(encoded: &[u8]) -> Option<Self> {
-            Option::<#struct_name>::decode(&mut &encoded[..])
-                .expect(&format!("Failed to decode Option<{}>", #struct_name_str))
+        fn py_decode_option(
+            py: Python<'_>,
+            encoded: crate::Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Option<Self>> {
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    crate::errors::decode_typed::<Option<#struct_name>>(
+                        encoded,
+                        offset,
+                        #option_name_str,
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+            crate::accountids::preset_account_ids(
+                py,
+                decoded.as_slice(),
+                ss58_format,
+                intern_account_ids,
+            )?;
+            Ok(decoded)
         }
     });
 
     Ok(quote!(#item_impl))
 }
 
+/// Implements `crate::projection::Skip` and `crate::projection::Project` for a struct with named
+/// fields, so `decode_vec(..., fields=[...])` can decode only the requested fields and walk
+/// over the rest without allocating them. Every field type must implement `Skip` and `Decode`.
+///
+/// ```ignore
+/// #[pyclass(get_all)]
+/// #[derive(Clone, Encode, Decode, Project)]
+/// struct MyStruct {
+///     // Fields
+/// }
+/// ```
+#[proc_macro_derive(Project)]
+pub fn derive_project(tokens: TokenStream) -> TokenStream {
+    match project_impl(tokens.into()) {
+        Ok(item_impl) => item_impl.into(),
+        Err(err) => err.to_compile_error().into(),
+    }
+}
+
+// The fields of a struct with named fields, the only items derive_name supports
+fn named_fields<'a>(
+    input: &'a DeriveInput,
+    derive_name: &str,
+) -> Result<&'a Punctuated<Field, Comma>> {
+    match &input.data {
+        Data::Struct(DataStruct {
+            fields: Fields::Named(fields),
+            ..
+        }) => Ok(&fields.named),
+        _ => Err(Error::new_spanned(
+            input,
+            format!(
+                "{} can only be derived for structs with named fields.",
+                derive_name
+            ),
+        )),
+    }
+}
+
+fn project_impl(tokens: TokenStream2) -> Result<TokenStream2> {
+    let input = parse2::<DeriveInput>(tokens)?;
+    let struct_name = &input.ident;
+    let struct_name_str = struct_name.to_string();
+
+    let fields = named_fields(&input, "Project")?;
+
+    let types = fields.iter().map(|field| &field.ty).collect::<Vec<_>>();
+    let names = fields
+        .iter()
+        .map(|field| field.ident.as_ref().unwrap().to_string())
+        .collect::<Vec<_>>();
+    let indices = 0..fields.len();
+
+    Ok(quote! {
+        impl crate::projection::Skip for #struct_name {
+            const FIXED_SIZE: Option<usize> = crate::projection::fixed_size_sum(&[
+                #(<#types as crate::projection::Skip>::FIXED_SIZE),*
+            ]);
+
+            fn skip(input: &mut &[u8]) -> Result<(), codec::Error> {
+                #(<#types as crate::projection::Skip>::skip(input)?;)*
+                Ok(())
+            }
+        }
+
+        impl crate::projection::Project for #struct_name {
+            const NAME: &'static str = #struct_name_str;
+
+            const FIELDS: &'static [&'static str] = &[#(#names),*];
+
+            fn decode_projected(
+                input: &mut &[u8],
+                selected: &[bool],
+            ) -> Result<Vec<Box<dyn crate::projection::IntoPyAny>>, codec::Error> {
+                let mut values: Vec<Box<dyn crate::projection::IntoPyAny>> = Vec::new();
+                #(
+                    if selected[#indices] {
+                        values.push(Box::new(<#types as codec::Decode>::decode(input)?));
+                    } else {
+                        <#types as crate::projection::Skip>::skip(input)?;
+                    }
+                )*
+                Ok(values)
+            }
+        }
+    })
+}
+
+/// Implements `crate::accountids::AccountIds` for a struct with named fields, so its
+/// `AccountId` fields (held in `Lazy`) can be converted ahead of time to SS58 addresses, or to
+/// objects shared with equal AccountIds. Every field type must implement `AccountIds`.
+///
+/// ```ignore
+/// #[pyclass(get_all)]
+/// #[derive(Clone, Encode, Decode, AccountIds)]
+/// struct MyStruct {
+///     // Fields
+/// }
+/// ```
+#[proc_macro_derive(AccountIds)]
+pub fn derive_account_ids(tokens: TokenStream) -> TokenStream {
+    match account_ids_impl(tokens.into()) {
+        Ok(item_impl) => item_impl.into(),
+        Err(err) => err.to_compile_error().into(),
+    }
+}
+
+fn account_ids_impl(tokens: TokenStream2) -> Result<TokenStream2> {
+    let input = parse2::<DeriveInput>(tokens)?;
+    let struct_name = &input.ident;
+
+    let fields = named_fields(&input, "AccountIds")?;
+    let types = fields.iter().map(|field| &field.ty).collect::<Vec<_>>();
+    let idents = fields.iter().map(|field| &field.ident).collect::<Vec<_>>();
+
+    Ok(quote! {
+        impl crate::accountids::AccountIds for #struct_name {
+            const HAS_ACCOUNT_ID: bool =
+                false #(|| <#types as crate::accountids::AccountIds>::HAS_ACCOUNT_ID)*;
+
+            fn to_object_with(
+                &self,
+                py: pyo3::Python<'_>,
+                account_ids: &mut crate::accountids::AccountIdObjects,
+            ) -> pyo3::PyResult<pyo3::Py<pyo3::PyAny>> {
+                let value = ::std::clone::Clone::clone(self);
+                crate::accountids::AccountIds::preset_account_ids(&value, py, account_ids)?;
+                Ok(pyo3::IntoPyObject::into_pyobject(value, py)?.into_any().unbind())
+            }
+
+            fn preset_account_ids(
+                &self,
+                py: pyo3::Python<'_>,
+                account_ids: &mut crate::accountids::AccountIdObjects,
+            ) -> pyo3::PyResult<()> {
+                #(crate::accountids::AccountIds::preset_account_ids(&self.#idents, py, account_ids)?;)*
+                Ok(())
+            }
+        }
+    })
+}
+
 // Inline tests
 #[test]
 fn test_pydecode_macro() {
@@ -95,23 +378,152 @@ fn test_pydecode_macro() {
         impl MyStruct {
             // Other methods
 
-            #[pyo3(name = "decode")]
+            #[pyo3(
+                name = "decode",
+                signature = (
+                encoded,
+                offset=0,
+                length=None,
+                allow_trailing_bytes=true,
+                ss58_format=None,
+                intern_account_ids=false
+            )
+            )]
+            #[staticmethod]
+            fn py_decode(
+                py: Python<'_>,
+                encoded: crate::Encoded<'_>,
+                offset: usize,
+                length: Option<usize>,
+                allow_trailing_bytes: bool,
+                ss58_format: Option<u16>,
+                intern_account_ids: bool,
+            ) -> PyResult<Self> {
+                let decoded = encoded
+                    .parse(py, offset, length, |encoded| {
+                        let (decoded, consumed) =
+                            crate::errors::decode_prefix::<MyStruct>(encoded, offset, "MyStruct")?;
+                        if !allow_trailing_bytes {
+                            crate::errors::check_trailing_bytes(encoded, consumed, offset, "MyStruct")?;
+                        }
+                        Ok::<_, crate::errors::DecodeFailure>(decoded)
+                    })?
+                    .map_err(|failure| failure.into_pyerr(py))?;
+                crate::accountids::preset_account_ids(
+                py,
+                std::slice::from_ref(&decoded),
+                ss58_format,
+                intern_account_ids,
+            )?;
+                Ok(decoded)
+            }
+
+            #[pyo3(
+                name = "decode_vec",
+                signature = (
+                encoded,
+                offset=0,
+                length=None,
+                fields=None,
+                strict=true,
+                ss58_format=None,
+                intern_account_ids=false
+            )
+            )]
+            #[staticmethod]
+            fn py_decode_vec(
+                py: Python<'_>,
+                encoded: crate::Encoded<'_>,
+                offset: usize,
+                length: Option<usize>,
+                fields: Option<Vec<String>>,
+                strict: bool,
+                ss58_format: Option<u16>,
+                intern_account_ids: bool,
+            ) -> PyResult<Py<PyAny>> {
+                if let Some(fields) = fields {
+                    return crate::projection::decode_vec_projected::<MyStruct>(
+                        py,
+                    &encoded,
+                    offset,
+                    length,
+                    &fields,
+                    strict,
+                    ss58_format,
+                    intern_account_ids,
+                    );
+                }
+                if !strict {
+                    let (decoded, failure) = encoded.parse(py, offset, length, |encoded| {
+                        crate::errors::decode_vec_partial::<MyStruct>(encoded, offset, "Vec<MyStruct>")
+                    })?;
+                    crate::accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+                    let error = failure.map(|failure| failure.into_pyerr(py).into_value(py));
+                    return Ok((decoded, error).into_pyobject(py)?.into_any().unbind());
+                }
+                let decoded = encoded
+                    .parse(py, offset, length, |encoded| {
+                        crate::errors::decode_typed::<Vec<MyStruct>>(encoded, offset, "Vec<MyStruct>")
+                    })?
+                    .map_err(|failure| failure.into_pyerr(py))?;
+                crate::accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+                Ok(decoded.into_pyobject(py)?.into_any().unbind())
+            }
+
+            #[pyo3(name = "decode_vec_iter", signature = (encoded, offset=0, length=None))]
+            #[staticmethod]
+            fn py_decode_vec_iter(
+                py: Python<'_>,
+                encoded: crate::Encoded<'_>,
+                offset: usize,
+                length: Option<usize>,
+            ) -> PyResult<crate::PyVecIterator> {
+                crate::PyVecIterator::typed::<MyStruct>(py, encoded, offset, length)
+            }
+
+            #[pyo3(name = "vec_decoder")]
             #[staticmethod]
-            fn py_decode(encoded: &[u8]) -> Self {
-                let decoded = MyStruct::decode(&mut &encoded[..])
-                    .expect("Failed to decode");
-                decoded
+            fn py_vec_decoder() -> crate::PyVecDecoder {
+                crate::PyVecDecoder::typed::<MyStruct>()
             }
 
-            #[pyo3(name = "decode_vec")]
+            #[pyo3(
+                name = "decode_option",
+                signature = (encoded, offset=0, length=None, ss58_format=None, intern_account_ids=false)
+            )]
             #[staticmethod]
-            fn py_decode_vec(encoded: &[u8]) -> Vec<Self> {
-                Vec::<MyStruct>::decode(&mut &encoded[..])
-                    .expect(&format!("Failed to decode Vec<{}>", "MyStruct"))
+            fn py_decode_option(
+                py: Python<'_>,
+                encoded: crate::Encoded<'_>,
+                offset: usize,
+                length: Option<usize>,
+                ss58_format: Option<u16>,
+                intern_account_ids: bool,
+            ) -> PyResult<Option<Self>> {
+                let decoded = encoded
+                    .parse(py, offset, length, |encoded| {
+                        crate::errors::decode_typed::<Option<MyStruct>>(
+                            encoded,
+                            offset,
+                            "Option<MyStruct>",
+                        )
+                    })?
+                    .map_err(|failure| failure.into_pyerr(py))?;
+                crate::accountids::preset_account_ids(
+                py,
+                decoded.as_slice(),
+                ss58_format,
+                intern_account_ids,
+            )?;
+                Ok(decoded)
             }
         }
     };
 
+    // Round-trip through syn so closure bars are printed the same way as in the output
+    let expected = parse2::<ItemImpl>(expected).unwrap();
+    let expected = quote!(#expected);
+
     let output = pydecode_impl(TokenStream2::new(), input).unwrap();
 
     assert_eq!(output.to_string(), expected.to_string());
@@ -135,3 +547,72 @@ fn test_pydecode_with_trait_impl_error() {
         );
     }
 }
+
+#[test]
+fn test_project_derive() {
+    let input = quote! {
+        struct MyStruct {
+            a: u8,
+            b: Vec<u8>,
+        }
+    };
+
+    let output = project_impl(input).unwrap().to_string();
+
+    assert!(output.contains("impl crate :: projection :: Skip for MyStruct"));
+    assert!(output.contains("const FIELDS : & 'static [& 'static str] = & [\"a\" , \"b\"]"));
+    assert!(output.contains("if selected [1usize]"));
+}
+
+#[test]
+fn test_project_derive_tuple_struct_error() {
+    let input = quote! {
+        struct MyStruct(u8, u16);
+    };
+
+    let result = project_impl(input);
+
+    assert!(result.is_err());
+    if let Err(err) = result {
+        assert_eq!(
+            err.to_string(),
+            "Project can only be derived for structs with named fields."
+        );
+    }
+}
+
+#[test]
+fn test_account_ids_derive() {
+    let input = quote! {
+        struct MyStruct {
+            a: u8,
+            b: Lazy<AccountId>,
+        }
+    };
+
+    let output = account_ids_impl(input).unwrap().to_string();
+
+    assert!(output.contains("impl crate :: accountids :: AccountIds for MyStruct"));
+    assert!(output
+        .contains("< Lazy < AccountId > as crate :: accountids :: AccountIds > :: HAS_ACCOUNT_ID"));
+    assert!(output.contains(
+        "crate :: accountids :: AccountIds :: preset_account_ids (& self . b , py , account_ids) ?"
+    ));
+}
+
+#[test]
+fn test_account_ids_derive_tuple_struct_error() {
+    let input = quote! {
+        struct MyStruct(u8, u16);
+    };
+
+    let result = account_ids_impl(input);
+
+    assert!(result.is_err());
+    if let Err(err) = result {
+        assert_eq!(
+            err.to_string(),
+            "AccountIds can only be derived for structs with named fields."
+        );
+    }
+}
@@ -0,0 +1,300 @@
+use std::collections::hash_map::Entry;
+use std::collections::HashMap;
+
+use pyo3::prelude::*;
+use pyo3::types::{PyList, PyString, PyTuple};
+use pyo3::BoundObject;
+
+use crate::ss58::{check_ss58_format, ss58_encode};
+use crate::{AccountId, Compact, Lazy};
+
+/*
+ * The Python objects for the AccountIds of one decode call: SS58 addresses if a format is
+ * given, else bytes. Each distinct key is converted once, and its object shared by every
+ * value holding it.
+ */
+pub struct AccountIdObjects {
+    ss58_format: Option<u16>,
+    objects: HashMap<[u8; 32], Py<PyAny>>,
+}
+
+impl AccountIdObjects {
+    /*
+     * None if AccountIds are neither SS58 addresses nor interned, so values are converted as
+     * usual (on first access, for Lazy fields)
+     */
+    pub fn new(ss58_format: Option<u16>, intern: bool) -> PyResult<Option<Self>> {
+        if let Some(ss58_format) = ss58_format {
+            check_ss58_format(ss58_format)?;
+        } else if !intern {
+            return Ok(None);
+        }
+
+        Ok(Some(AccountIdObjects {
+            ss58_format,
+            objects: HashMap::new(),
+        }))
+    }
+
+    fn get(&mut self, py: Python<'_>, account_id: &AccountId) -> PyResult<Py<PyAny>> {
+        let entry = match self.objects.entry(account_id.0) {
+            Entry::Occupied(entry) => return Ok(entry.get().clone_ref(py)),
+            Entry::Vacant(entry) => entry,
+        };
+
+        let object = match self.ss58_format {
+            Some(ss58_format) => PyString::new(py, &ss58_encode(&account_id.0, ss58_format))
+                .into_any()
+                .unbind(),
+            None => to_object(account_id, py)?,
+        };
+        Ok(entry.insert(object).clone_ref(py))
+    }
+}
+
+fn to_object<T>(value: &T, py: Python<'_>) -> PyResult<Py<PyAny>>
+where
+    T: Clone + for<'py> IntoPyObject<'py>,
+{
+    Ok(value
+        .clone()
+        .into_pyobject(py)
+        .map_err(Into::into)?
+        .into_bound()
+        .into_any()
+        .unbind())
+}
+
+/*
+ * Converts a decoded value to Python with its AccountIds taken from an AccountIdObjects.
+ *
+ * Implemented for the field types of the typed pyclasses; structs get it from
+ * #[derive(AccountIds)]. Their AccountId fields are all Lazy, so preset_account_ids stores
+ * the shared objects in place of the usual conversion.
+ */
+pub trait AccountIds {
+    // Whether values of the type hold AccountIds
+    const HAS_ACCOUNT_ID: bool = false;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>>;
+
+    // Converts the Lazy fields holding AccountIds ahead of time, in this value and the
+    // structs it holds; AccountIds outside a Lazy are only converted by to_object_with
+    fn preset_account_ids(
+        &self,
+        _py: Python<'_>,
+        _account_ids: &mut AccountIdObjects,
+    ) -> PyResult<()> {
+        Ok(())
+    }
+}
+
+macro_rules! impl_PlainAccountIds {
+    ($($type:ty),+) => {
+        $(
+            impl AccountIds for $type {
+                fn to_object_with(
+                    &self,
+                    py: Python<'_>,
+                    _account_ids: &mut AccountIdObjects,
+                ) -> PyResult<Py<PyAny>> {
+                    to_object(self, py)
+                }
+            }
+        )+
+    };
+}
+
+impl_PlainAccountIds!(bool, u8, u16, u32, u64, u128, i8, i16, i32, i64, i128);
+
+impl<T> AccountIds for Compact<T>
+where
+    Compact<T>: Clone + for<'py> IntoPyObject<'py>,
+{
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        _account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        to_object(self, py)
+    }
+}
+
+impl AccountIds for AccountId {
+    const HAS_ACCOUNT_ID: bool = true;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        account_ids.get(py, self)
+    }
+}
+
+impl<T, const N: usize> AccountIds for [T; N]
+where
+    T: AccountIds,
+    [T; N]: Clone + for<'py> IntoPyObject<'py>,
+{
+    const HAS_ACCOUNT_ID: bool = T::HAS_ACCOUNT_ID;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        if !Self::HAS_ACCOUNT_ID {
+            return to_object(self, py);
+        }
+        let items = self
+            .iter()
+            .map(|item| item.to_object_with(py, account_ids))
+            .collect::<PyResult<Vec<_>>>()?;
+        Ok(PyList::new(py, items)?.into_any().unbind())
+    }
+
+    fn preset_account_ids(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<()> {
+        self.iter()
+            .try_for_each(|item| item.preset_account_ids(py, account_ids))
+    }
+}
+
+impl<T> AccountIds for Vec<T>
+where
+    T: AccountIds,
+    Vec<T>: Clone + for<'py> IntoPyObject<'py>,
+{
+    const HAS_ACCOUNT_ID: bool = T::HAS_ACCOUNT_ID;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        if !Self::HAS_ACCOUNT_ID {
+            return to_object(self, py);
+        }
+        let items = self
+            .iter()
+            .map(|item| item.to_object_with(py, account_ids))
+            .collect::<PyResult<Vec<_>>>()?;
+        Ok(PyList::new(py, items)?.into_any().unbind())
+    }
+
+    fn preset_account_ids(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<()> {
+        self.iter()
+            .try_for_each(|item| item.preset_account_ids(py, account_ids))
+    }
+}
+
+impl<T: AccountIds> AccountIds for Option<T> {
+    const HAS_ACCOUNT_ID: bool = T::HAS_ACCOUNT_ID;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        match self {
+            Some(value) => value.to_object_with(py, account_ids),
+            None => Ok(py.None()),
+        }
+    }
+
+    fn preset_account_ids(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<()> {
+        match self {
+            Some(value) => value.preset_account_ids(py, account_ids),
+            None => Ok(()),
+        }
+    }
+}
+
+impl<A: AccountIds, B: AccountIds> AccountIds for (A, B) {
+    const HAS_ACCOUNT_ID: bool = A::HAS_ACCOUNT_ID || B::HAS_ACCOUNT_ID;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        let items = [
+            self.0.to_object_with(py, account_ids)?,
+            self.1.to_object_with(py, account_ids)?,
+        ];
+        Ok(PyTuple::new(py, items)?.into_any().unbind())
+    }
+
+    fn preset_account_ids(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<()> {
+        self.0.preset_account_ids(py, account_ids)?;
+        self.1.preset_account_ids(py, account_ids)
+    }
+}
+
+impl<T> AccountIds for Lazy<T>
+where
+    T: AccountIds + Clone + for<'py> IntoPyObject<'py>,
+{
+    const HAS_ACCOUNT_ID: bool = T::HAS_ACCOUNT_ID;
+
+    fn to_object_with(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<Py<PyAny>> {
+        if !Self::HAS_ACCOUNT_ID {
+            return Ok(IntoPyObject::into_pyobject(self, py)?.unbind());
+        }
+        (**self).to_object_with(py, account_ids)
+    }
+
+    fn preset_account_ids(
+        &self,
+        py: Python<'_>,
+        account_ids: &mut AccountIdObjects,
+    ) -> PyResult<()> {
+        if Self::HAS_ACCOUNT_ID {
+            self.preset((**self).to_object_with(py, account_ids)?);
+        }
+        Ok(())
+    }
+}
+
+/*
+ * Presets the AccountIds of decoded values to SS58 addresses, if a format is given, and
+ * shares one object between equal AccountIds, if interning or converting to SS58
+ */
+pub fn preset_account_ids<T: AccountIds>(
+    py: Python<'_>,
+    values: &[T],
+    ss58_format: Option<u16>,
+    intern: bool,
+) -> PyResult<()> {
+    let Some(mut account_ids) = AccountIdObjects::new(ss58_format, intern)? else {
+        return Ok(());
+    };
+
+    values
+        .iter()
+        .try_for_each(|value| value.preset_account_ids(py, &mut account_ids))
+}
@@ -0,0 +1,194 @@
+use std::collections::HashMap;
+
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use xxhash_rust::xxh3::xxh3_64;
+
+type CacheKey = (u32, u64);
+
+// Marks the end of the recency list
+const NONE: usize = usize::MAX;
+
+struct CacheEntry {
+    key: CacheKey,
+    // Kept to tell a hash collision from a hit
+    encoded: Vec<u8>,
+    value: Py<PyAny>,
+    // Neighbours in the recency list: the more and the less recently used entry
+    newer: usize,
+    older: usize,
+}
+
+/*
+ * Bounded LRU cache of decoded values, keyed by type id and the xxh3 hash of the encoded
+ * bytes.
+ *
+ * The budget counts encoded bytes, as the size of the Python objects is unknown. Entries
+ * live in a slab, linked from the most to the least recently used, so a hit, an insert and
+ * an eviction are each O(1).
+ */
+pub struct DecodeCache {
+    max_bytes: usize,
+    max_entries: usize,
+    bytes: usize,
+    hits: u64,
+    misses: u64,
+    index: HashMap<CacheKey, usize>,
+    slots: Vec<Option<CacheEntry>>,
+    // Slots of removed entries, reused before the slab grows
+    free: Vec<usize>,
+    newest: usize,
+    oldest: usize,
+}
+
+impl DecodeCache {
+    pub fn new(max_bytes: usize, max_entries: usize) -> Self {
+        DecodeCache {
+            max_bytes,
+            max_entries,
+            bytes: 0,
+            hits: 0,
+            misses: 0,
+            index: HashMap::new(),
+            slots: Vec::new(),
+            free: Vec::new(),
+            newest: NONE,
+            oldest: NONE,
+        }
+    }
+
+    pub fn key(type_id: u32, encoded: &[u8]) -> CacheKey {
+        (type_id, xxh3_64(encoded))
+    }
+
+    fn entry(&mut self, slot: usize) -> &mut CacheEntry {
+        self.slots[slot]
+            .as_mut()
+            .expect("Decode cache slot is empty")
+    }
+
+    fn unlink(&mut self, slot: usize) {
+        let (newer, older) = {
+            let entry = self.entry(slot);
+            (entry.newer, entry.older)
+        };
+        match newer {
+            NONE => self.newest = older,
+            newer => self.entry(newer).older = older,
+        }
+        match older {
+            NONE => self.oldest = newer,
+            older => self.entry(older).newer = newer,
+        }
+    }
+
+    fn push_newest(&mut self, slot: usize) {
+        let newest = self.newest;
+        {
+            let entry = self.entry(slot);
+            entry.newer = NONE;
+            entry.older = newest;
+        }
+        match newest {
+            NONE => self.oldest = slot,
+            newest => self.entry(newest).newer = slot,
+        }
+        self.newest = slot;
+    }
+
+    /*
+     * Returns the value decoded from encoded before, counting a hit or a miss
+     */
+    pub fn get(&mut self, py: Python<'_>, key: CacheKey, encoded: &[u8]) -> Option<Py<PyAny>> {
+        match self.index.get(&key).copied() {
+            Some(slot) if self.entry(slot).encoded == encoded => {
+                self.unlink(slot);
+                self.push_newest(slot);
+                self.hits += 1;
+                Some(self.entry(slot).value.clone_ref(py))
+            }
+            _ => {
+                self.misses += 1;
+                None
+            }
+        }
+    }
+
+    /*
+     * Caches value, evicting the least recently used entries to make room. Returns the
+     * values dropped, so the caller can release them after unlocking the cache.
+     */
+    pub fn insert(&mut self, key: CacheKey, encoded: &[u8], value: Py<PyAny>) -> Vec<Py<PyAny>> {
+        let mut dropped = Vec::new();
+        if encoded.len() > self.max_bytes || self.max_entries == 0 {
+            dropped.push(value);
+            return dropped;
+        }
+
+        dropped.extend(self.remove(&key));
+        while self.bytes + encoded.len() > self.max_bytes || self.index.len() >= self.max_entries {
+            match self.oldest {
+                NONE => break,
+                oldest => {
+                    let key = self.entry(oldest).key;
+                    dropped.extend(self.remove(&key));
+                }
+            }
+        }
+
+        let entry = CacheEntry {
+            key,
+            encoded: encoded.to_vec(),
+            value,
+            newer: NONE,
+            older: NONE,
+        };
+        let slot = match self.free.pop() {
+            Some(slot) => {
+                self.slots[slot] = Some(entry);
+                slot
+            }
+            None => {
+                self.slots.push(Some(entry));
+                self.slots.len() - 1
+            }
+        };
+        self.push_newest(slot);
+        self.index.insert(key, slot);
+        self.bytes += encoded.len();
+
+        dropped
+    }
+
+    fn remove(&mut self, key: &CacheKey) -> Option<Py<PyAny>> {
+        let slot = self.index.remove(key)?;
+        self.unlink(slot);
+        let entry = self.slots[slot].take().expect("Decode cache slot is empty");
+        self.free.push(slot);
+        self.bytes -= entry.encoded.len();
+        Some(entry.value)
+    }
+
+    /*
+     * Drops every entry; the hit and miss counters are kept
+     */
+    pub fn clear(&mut self) {
+        self.index.clear();
+        self.slots.clear();
+        self.free.clear();
+        self.newest = NONE;
+        self.oldest = NONE;
+        self.bytes = 0;
+    }
+
+    pub fn info<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let info = PyDict::new(py);
+        info.set_item("hits", self.hits)?;
+        info.set_item("misses", self.misses)?;
+        info.set_item("entries", self.index.len())?;
+        info.set_item("bytes", self.bytes)?;
+        info.set_item("max_bytes", self.max_bytes)?;
+        info.set_item("max_entries", self.max_entries)?;
+        Ok(info)
+    }
+}
@@ -0,0 +1,844 @@
+use codec::{Compact, Decode};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyDict, PyList, PyString, PyTuple};
+use scale_info::{
+    form::PortableForm, Field as TypeField, PortableRegistry, TypeDef, TypeDefBitSequence,
+    TypeDefPrimitive,
+};
+use std::collections::HashMap;
+use std::sync::{Arc, Mutex};
+
+/*
+ * A decode plan is every registry type reachable from one type id, resolved ahead of time
+ * into a flat list of nodes. Nodes refer to each other by index into that list, so decoding
+ * does no type id resolution or type string handling.
+ *
+ * The Python objects produced have the same shape as decoding through scale_value:
+ * named composites are dicts, unnamed composites/tuples/sequences/arrays are tuples,
+ * Option-like variants are None or the inner value, other variants are {name: fields}.
+ */
+pub type NodeId = usize;
+
+#[derive(Clone, Copy, Debug)]
+pub enum Primitive {
+    Bool,
+    Char,
+    Str,
+    U8,
+    U16,
+    U32,
+    U64,
+    U128,
+    U256,
+    I8,
+    I16,
+    I32,
+    I64,
+    I128,
+    I256,
+}
+
+impl From<&TypeDefPrimitive> for Primitive {
+    fn from(primitive: &TypeDefPrimitive) -> Self {
+        match primitive {
+            TypeDefPrimitive::Bool => Primitive::Bool,
+            TypeDefPrimitive::Char => Primitive::Char,
+            TypeDefPrimitive::Str => Primitive::Str,
+            TypeDefPrimitive::U8 => Primitive::U8,
+            TypeDefPrimitive::U16 => Primitive::U16,
+            TypeDefPrimitive::U32 => Primitive::U32,
+            TypeDefPrimitive::U64 => Primitive::U64,
+            TypeDefPrimitive::U128 => Primitive::U128,
+            TypeDefPrimitive::U256 => Primitive::U256,
+            TypeDefPrimitive::I8 => Primitive::I8,
+            TypeDefPrimitive::I16 => Primitive::I16,
+            TypeDefPrimitive::I32 => Primitive::I32,
+            TypeDefPrimitive::I64 => Primitive::I64,
+            TypeDefPrimitive::I128 => Primitive::I128,
+            TypeDefPrimitive::I256 => Primitive::I256,
+        }
+    }
+}
+
+#[derive(Clone, Copy, Debug)]
+pub enum CompactWidth {
+    U8,
+    U16,
+    U32,
+    U64,
+    U128,
+}
+
+#[derive(Clone, Copy, Debug)]
+pub enum BitStore {
+    U8,
+    U16,
+    U32,
+    U64,
+}
+
+/// A field or variant name, with the Python string used as its dict key.
+pub struct Name {
+    pub text: String,
+    pub key: Py<PyString>,
+}
+
+pub struct Field {
+    pub name: Option<Name>,
+    pub node: NodeId,
+}
+
+#[derive(Clone, Copy, PartialEq, Eq)]
+pub enum VariantKind {
+    None,
+    Some,
+    Other,
+}
+
+pub struct VariantNode {
+    pub index: u8,
+    pub name: Name,
+    pub kind: VariantKind,
+    pub fields: Vec<Field>,
+}
+
+pub enum Node {
+    Primitive(Primitive),
+    // Compact integer; wrappers are the single-field composites around it, outermost first
+    Compact {
+        width: CompactWidth,
+        wrappers: Vec<Option<Name>>,
+    },
+    Sequence(NodeId),
+    Array(usize, NodeId),
+    Tuple(Vec<NodeId>),
+    Composite(Vec<Field>),
+    Variant(Vec<VariantNode>),
+    BitSequence {
+        store: BitStore,
+        lsb0: bool,
+    },
+}
+
+// Distinct AccountIds an AccountIdTable keeps before starting over
+const MAX_INTERNED_ACCOUNT_IDS: usize = 1 << 16;
+
+/*
+ * The Python object of each distinct [u8; 32] (e.g. an AccountId32) decoded so far, shared
+ * by every decode with the plans holding the table. Past MAX_INTERNED_ACCOUNT_IDS entries
+ * it is emptied, so it doesn't keep every AccountId ever seen.
+ *
+ * The lock is only held to look up and store objects; they are built, and dropped, outside
+ * it, as that can run Python code.
+ */
+#[derive(Default)]
+pub struct AccountIdTable {
+    objects: Mutex<HashMap<[u8; 32], Py<PyAny>>>,
+}
+
+impl AccountIdTable {
+    fn lock(&self) -> std::sync::MutexGuard<'_, HashMap<[u8; 32], Py<PyAny>>> {
+        self.objects.lock().expect("AccountId table lock poisoned")
+    }
+
+    fn get(&self, py: Python<'_>, key: &[u8; 32]) -> Option<Py<PyAny>> {
+        self.lock().get(key).map(|object| object.clone_ref(py))
+    }
+
+    /*
+     * Stores object for key, unless another thread stored one first, and returns the object
+     * stored
+     */
+    fn insert(&self, py: Python<'_>, key: [u8; 32], object: Py<PyAny>) -> Py<PyAny> {
+        let mut evicted = HashMap::new();
+        let mut objects = self.lock();
+        if objects.len() >= MAX_INTERNED_ACCOUNT_IDS {
+            evicted = std::mem::take(&mut *objects);
+        }
+        let stored = objects
+            .entry(key)
+            .or_insert_with(|| object.clone_ref(py))
+            .clone_ref(py);
+        drop(objects);
+
+        drop(evicted);
+        stored
+    }
+
+    pub fn clear(&self) {
+        let objects = std::mem::take(&mut *self.lock());
+        drop(objects);
+    }
+}
+
+#[derive(Clone, Default)]
+pub struct PlanOptions {
+    // Materialize sequences and arrays of u8 as tuples of ints instead of bytes
+    pub bytes_as_tuples: bool,
+    // If set, equal [u8; 32] arrays materialize as one shared object, kept in the table
+    pub account_ids: Option<Arc<AccountIdTable>>,
+}
+
+pub struct DecodePlan {
+    nodes: Vec<Node>,
+    root: NodeId,
+    options: PlanOptions,
+}
+
+struct PlanBuilder<'a, 'py> {
+    py: Python<'py>,
+    registry: &'a PortableRegistry,
+    nodes: Vec<Node>,
+    node_ids: HashMap<u32, NodeId>,
+}
+
+impl PlanBuilder<'_, '_> {
+    fn name(&self, text: &str) -> Name {
+        Name {
+            text: text.to_string(),
+            key: PyString::intern(self.py, text).unbind(),
+        }
+    }
+
+    fn fields(&mut self, fields: &[TypeField<PortableForm>]) -> Result<Vec<Field>, String> {
+        fields
+            .iter()
+            .map(|field| {
+                Ok(Field {
+                    name: field.name.as_deref().map(|name| self.name(name)),
+                    node: self.node(field.ty.id)?,
+                })
+            })
+            .collect()
+    }
+
+    fn node(&mut self, type_id: u32) -> Result<NodeId, String> {
+        if let Some(node_id) = self.node_ids.get(&type_id) {
+            return Ok(*node_id);
+        }
+
+        let registry = self.registry;
+        let ty = registry
+            .resolve(type_id)
+            .ok_or_else(|| format!("Type id {} not found in registry", type_id))?;
+
+        // Reserve the slot before resolving children, so recursive types can refer back to it
+        let node_id = self.nodes.len();
+        self.nodes.push(Node::Tuple(vec![]));
+        self.node_ids.insert(type_id, node_id);
+
+        let node = match &ty.type_def {
+            TypeDef::Primitive(primitive) => Node::Primitive(Primitive::from(primitive)),
+            TypeDef::Compact(compact) => self.compact(compact.type_param.id)?,
+            TypeDef::Sequence(sequence) => Node::Sequence(self.node(sequence.type_param.id)?),
+            TypeDef::Array(array) => {
+                Node::Array(array.len as usize, self.node(array.type_param.id)?)
+            }
+            TypeDef::Tuple(tuple) => Node::Tuple(
+                tuple
+                    .fields
+                    .iter()
+                    .map(|field| self.node(field.id))
+                    .collect::<Result<Vec<NodeId>, String>>()?,
+            ),
+            TypeDef::Composite(composite) => Node::Composite(self.fields(&composite.fields)?),
+            TypeDef::Variant(variant) => Node::Variant(
+                variant
+                    .variants
+                    .iter()
+                    .map(|variant| {
+                        Ok(VariantNode {
+                            index: variant.index,
+                            name: self.name(&variant.name),
+                            kind: match variant.name.as_str() {
+                                "None" => VariantKind::None,
+                                "Some" => VariantKind::Some,
+                                _ => VariantKind::Other,
+                            },
+                            fields: self.fields(&variant.fields)?,
+                        })
+                    })
+                    .collect::<Result<Vec<VariantNode>, String>>()?,
+            ),
+            TypeDef::BitSequence(bit_sequence) => self.bit_sequence(bit_sequence)?,
+        };
+
+        self.nodes[node_id] = node;
+        Ok(node_id)
+    }
+
+    /*
+     * Compact<T> where T is an unsigned integer, or a chain of single-field composites around one
+     */
+    fn compact(&self, type_id: u32) -> Result<Node, String> {
+        let registry = self.registry;
+        let mut wrappers = vec![];
+        let mut inner_type_id = type_id;
+
+        loop {
+            let ty = registry
+                .resolve(inner_type_id)
+                .ok_or_else(|| format!("Type id {} not found in registry", inner_type_id))?;
+
+            match &ty.type_def {
+                TypeDef::Primitive(primitive) => {
+                    let width = match primitive {
+                        TypeDefPrimitive::U8 => CompactWidth::U8,
+                        TypeDefPrimitive::U16 => CompactWidth::U16,
+                        TypeDefPrimitive::U32 => CompactWidth::U32,
+                        TypeDefPrimitive::U64 => CompactWidth::U64,
+                        TypeDefPrimitive::U128 => CompactWidth::U128,
+                        _ => return Err(format!("Unsupported Compact type: {:?}", primitive)),
+                    };
+
+                    return Ok(Node::Compact { width, wrappers });
+                }
+                TypeDef::Composite(composite) if composite.fields.len() == 1 => {
+                    let field = &composite.fields[0];
+                    wrappers.push(field.name.as_deref().map(|name| self.name(name)));
+                    inner_type_id = field.ty.id;
+                }
+                _ => return Err(format!("Unsupported Compact type: {:?}", ty.type_def)),
+            }
+        }
+    }
+
+    fn bit_sequence(
+        &self,
+        bit_sequence: &TypeDefBitSequence<PortableForm>,
+    ) -> Result<Node, String> {
+        let registry = self.registry;
+
+        let store = match registry
+            .resolve(bit_sequence.bit_store_type.id)
+            .map(|ty| &ty.type_def)
+        {
+            Some(TypeDef::Primitive(TypeDefPrimitive::U8)) => BitStore::U8,
+            Some(TypeDef::Primitive(TypeDefPrimitive::U16)) => BitStore::U16,
+            Some(TypeDef::Primitive(TypeDefPrimitive::U32)) => BitStore::U32,
+            Some(TypeDef::Primitive(TypeDefPrimitive::U64)) => BitStore::U64,
+            _ => return Err(format!("Unsupported bit store type: {:?}", bit_sequence)),
+        };
+
+        let lsb0 = match registry
+            .resolve(bit_sequence.bit_order_type.id)
+            .and_then(|ty| ty.path.segments.last())
+        {
+            Some(order) if order == "Lsb0" => true,
+            Some(order) if order == "Msb0" => false,
+            _ => return Err(format!("Unsupported bit order type: {:?}", bit_sequence)),
+        };
+
+        Ok(Node::BitSequence { store, lsb0 })
+    }
+}
+
+/// One step of a parsed value, in decode order.
+///
+/// Parsing a value produces a flat tape of these without touching Python; the tape is then
+/// walked alongside the plan to build the Python objects. Strings and raw runs of bytes
+/// borrow from the input instead of being copied.
+pub enum Token<'a> {
+    Bool(bool),
+    Char(char),
+    Str(&'a str),
+    Uint(u128),
+    Int(i128),
+    // 256-bit integers, or every item of a sequence/array of fixed-size primitives
+    Raw(&'a [u8]),
+    Len(usize),
+    // Position of the decoded variant in the plan's variant list
+    Variant(usize),
+    // Number of bits, and the store words holding them
+    Bits(usize, &'a [u8]),
+}
+
+fn decode_error(err: codec::Error) -> String {
+    format!("{}", err)
+}
+
+fn decode_len(input: &mut &[u8]) -> Result<usize, String> {
+    Ok(Compact::<u32>::decode(input).map_err(decode_error)?.0 as usize)
+}
+
+fn take<'a>(input: &mut &'a [u8], len: usize) -> Result<&'a [u8], String> {
+    if input.len() < len {
+        return Err("Not enough data to fill buffer".to_string());
+    }
+
+    let (head, rest) = input.split_at(len);
+    *input = rest;
+
+    Ok(head)
+}
+
+fn out_of_sync() -> PyErr {
+    PyErr::new::<PyValueError, _>("Decoded tape does not match the decode plan")
+}
+
+impl Primitive {
+    /*
+     * Size of primitives that are plain little-endian integers (or bools), which sequences
+     * and arrays keep as one raw run of bytes
+     */
+    fn fixed_size(&self) -> Option<usize> {
+        match self {
+            Primitive::Bool | Primitive::U8 | Primitive::I8 => Some(1),
+            Primitive::U16 | Primitive::I16 => Some(2),
+            Primitive::U32 | Primitive::I32 => Some(4),
+            Primitive::U64 | Primitive::I64 => Some(8),
+            Primitive::U128 | Primitive::I128 => Some(16),
+            _ => None,
+        }
+    }
+}
+
+impl DecodePlan {
+    pub fn new(
+        py: Python,
+        registry: &PortableRegistry,
+        type_id: u32,
+        options: PlanOptions,
+    ) -> Result<Self, String> {
+        let mut builder = PlanBuilder {
+            py,
+            registry,
+            nodes: vec![],
+            node_ids: HashMap::new(),
+        };
+        let root = builder.node(type_id)?;
+
+        Ok(DecodePlan {
+            nodes: builder.nodes,
+            root,
+            options,
+        })
+    }
+
+    /*
+     * Parses one value of the plan's type from the front of input, advancing input past it.
+     * Does not need the GIL, so callers can parse with it released.
+     */
+    pub fn parse<'a>(&self, input: &mut &'a [u8]) -> Result<Vec<Token<'a>>, String> {
+        self.parse_at(self.root, input)
+    }
+
+    /*
+     * Builds the Python object for a value parsed by `parse`
+     */
+    pub fn materialize<'py>(
+        &self,
+        py: Python<'py>,
+        tokens: &[Token],
+    ) -> PyResult<Bound<'py, PyAny>> {
+        self.materialize_at(py, self.root, tokens)
+    }
+
+    /*
+     * The item node, if the plan is for a sequence (e.g. Vec<T>), so its items can be decoded
+     * one at a time with parse_at and materialize_at
+     */
+    pub fn sequence_item(&self) -> Option<NodeId> {
+        match &self.nodes[self.root] {
+            Node::Sequence(inner) => Some(*inner),
+            _ => None,
+        }
+    }
+
+    /*
+     * As `parse`, for the value of a node of the plan instead of its root
+     */
+    pub fn parse_at<'a>(
+        &self,
+        node_id: NodeId,
+        input: &mut &'a [u8],
+    ) -> Result<Vec<Token<'a>>, String> {
+        let mut tokens = Vec::new();
+        self.parse_node(node_id, input, &mut tokens)?;
+
+        Ok(tokens)
+    }
+
+    /*
+     * As `materialize`, for a value parsed by `parse_at`
+     */
+    pub fn materialize_at<'py>(
+        &self,
+        py: Python<'py>,
+        node_id: NodeId,
+        tokens: &[Token],
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let mut tokens = tokens.iter();
+        self.materialize_node(py, node_id, &mut tokens)
+    }
+
+    fn fixed_size_primitive(&self, node_id: NodeId) -> Option<(Primitive, usize)> {
+        match &self.nodes[node_id] {
+            Node::Primitive(primitive) => primitive.fixed_size().map(|size| (*primitive, size)),
+            _ => None,
+        }
+    }
+
+    fn parse_node<'a>(
+        &self,
+        node_id: NodeId,
+        input: &mut &'a [u8],
+        tokens: &mut Vec<Token<'a>>,
+    ) -> Result<(), String> {
+        match &self.nodes[node_id] {
+            Node::Primitive(primitive) => tokens.push(parse_primitive(*primitive, input)?),
+            Node::Compact { width, .. } => tokens.push(Token::Uint(parse_compact(*width, input)?)),
+            Node::Sequence(inner) => {
+                let len = decode_len(input)?;
+                self.parse_items(*inner, len, input, tokens)?;
+            }
+            Node::Array(len, inner) => self.parse_items(*inner, *len, input, tokens)?,
+            Node::Tuple(inner) => {
+                for node_id in inner.iter() {
+                    self.parse_node(*node_id, input, tokens)?;
+                }
+            }
+            Node::Composite(fields) => {
+                for field in fields.iter() {
+                    self.parse_node(field.node, input, tokens)?;
+                }
+            }
+            Node::Variant(variants) => {
+                let index = u8::decode(input).map_err(decode_error)?;
+                let position = variants
+                    .iter()
+                    .position(|variant| variant.index == index)
+                    .ok_or_else(|| format!("Invalid variant index: {}", index))?;
+
+                tokens.push(Token::Variant(position));
+                for field in variants[position].fields.iter() {
+                    self.parse_node(field.node, input, tokens)?;
+                }
+            }
+            Node::BitSequence { store, .. } => {
+                let bit_count = decode_len(input)?;
+                let store_bits = store.bits();
+                let words = take(input, bit_count.div_ceil(store_bits) * (store_bits / 8))?;
+
+                tokens.push(Token::Bits(bit_count, words));
+            }
+        }
+
+        Ok(())
+    }
+
+    fn parse_items<'a>(
+        &self,
+        node_id: NodeId,
+        len: usize,
+        input: &mut &'a [u8],
+        tokens: &mut Vec<Token<'a>>,
+    ) -> Result<(), String> {
+        tokens.push(Token::Len(len));
+
+        if let Some((primitive, size)) = self.fixed_size_primitive(node_id) {
+            let byte_len = len
+                .checked_mul(size)
+                .ok_or_else(|| format!("Invalid length: {}", len))?;
+            let raw = take(input, byte_len)?;
+            if matches!(primitive, Primitive::Bool) && raw.iter().any(|byte| *byte > 1) {
+                return Err("Invalid bool".to_string());
+            }
+
+            tokens.push(Token::Raw(raw));
+        } else {
+            for _ in 0..len {
+                self.parse_node(node_id, input, tokens)?;
+            }
+        }
+
+        Ok(())
+    }
+
+    fn materialize_u8s<'py>(&self, py: Python<'py>, raw: &[u8]) -> PyResult<Bound<'py, PyAny>> {
+        if self.options.bytes_as_tuples {
+            return Ok(PyTuple::new(py, raw)?.into_any());
+        }
+        Ok(PyBytes::new(py, raw).into_any())
+    }
+
+    fn materialize_account_id<'py>(
+        &self,
+        py: Python<'py>,
+        account_ids: &AccountIdTable,
+        raw: &[u8],
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let key: [u8; 32] = raw.try_into().map_err(|_| out_of_sync())?;
+        if let Some(object) = account_ids.get(py, &key) {
+            return Ok(object.into_bound(py));
+        }
+
+        let object = self.materialize_u8s(py, raw)?.unbind();
+        Ok(account_ids.insert(py, key, object).into_bound(py))
+    }
+
+    fn materialize_node<'py>(
+        &self,
+        py: Python<'py>,
+        node_id: NodeId,
+        tokens: &mut std::slice::Iter<Token>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        match &self.nodes[node_id] {
+            Node::Primitive(_) => token_to_py(py, tokens.next().ok_or_else(out_of_sync)?),
+            Node::Compact { wrappers, .. } => {
+                let mut value = token_to_py(py, tokens.next().ok_or_else(out_of_sync)?)?;
+                for wrapper in wrappers.iter().rev() {
+                    value = match wrapper {
+                        Some(name) => {
+                            let dict = PyDict::new(py);
+                            dict.set_item(name.key.bind(py), value)?;
+                            dict.into_any()
+                        }
+                        None => PyTuple::new(py, [value])?.into_any(),
+                    };
+                }
+
+                Ok(value)
+            }
+            Node::Sequence(inner) | Node::Array(_, inner) => {
+                let len = match tokens.next() {
+                    Some(Token::Len(len)) => *len,
+                    _ => return Err(out_of_sync()),
+                };
+
+                let items = if let Some((primitive, size)) = self.fixed_size_primitive(*inner) {
+                    let raw = match tokens.next() {
+                        Some(Token::Raw(raw)) => *raw,
+                        _ => return Err(out_of_sync()),
+                    };
+                    if matches!(primitive, Primitive::U8) {
+                        return match (&self.nodes[node_id], &self.options.account_ids) {
+                            (Node::Array(32, _), Some(account_ids)) => {
+                                self.materialize_account_id(py, account_ids, raw)
+                            }
+                            _ => self.materialize_u8s(py, raw),
+                        };
+                    }
+
+                    raw.chunks_exact(size)
+                        .map(|item| raw_primitive_to_py(py, primitive, item))
+                        .collect::<PyResult<Vec<Bound<'py, PyAny>>>>()?
+                } else {
+                    (0..len)
+                        .map(|_| self.materialize_node(py, *inner, tokens))
+                        .collect::<PyResult<Vec<Bound<'py, PyAny>>>>()?
+                };
+
+                Ok(PyTuple::new(py, items)?.into_any())
+            }
+            Node::Tuple(inner) => {
+                let items = inner
+                    .iter()
+                    .map(|node_id| self.materialize_node(py, *node_id, tokens))
+                    .collect::<PyResult<Vec<Bound<'py, PyAny>>>>()?;
+
+                Ok(PyTuple::new(py, items)?.into_any())
+            }
+            Node::Composite(fields) => self.materialize_fields(py, fields, tokens),
+            Node::Variant(variants) => {
+                let variant = match tokens.next() {
+                    Some(Token::Variant(position)) => &variants[*position],
+                    _ => return Err(out_of_sync()),
+                };
+
+                match variant.kind {
+                    VariantKind::None => Ok(py.None().into_bound(py)),
+                    VariantKind::Some if variant.fields.len() == 1 => {
+                        self.materialize_node(py, variant.fields[0].node, tokens)
+                    }
+                    VariantKind::Some => self.materialize_fields(py, &variant.fields, tokens),
+                    VariantKind::Other => {
+                        let dict = PyDict::new(py);
+                        dict.set_item(
+                            variant.name.key.bind(py),
+                            self.materialize_fields(py, &variant.fields, tokens)?,
+                        )?;
+
+                        Ok(dict.into_any())
+                    }
+                }
+            }
+            Node::BitSequence { store, lsb0 } => match tokens.next() {
+                Some(Token::Bits(bit_count, words)) => {
+                    bits_to_py(py, *store, *lsb0, *bit_count, words)
+                }
+                _ => Err(out_of_sync()),
+            },
+        }
+    }
+
+    fn materialize_fields<'py>(
+        &self,
+        py: Python<'py>,
+        fields: &[Field],
+        tokens: &mut std::slice::Iter<Token>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        // With no fields, the composite is treated as unnamed
+        let named = !fields.is_empty() && fields.iter().all(|field| field.name.is_some());
+
+        if named {
+            let dict = PyDict::new(py);
+            for field in fields.iter() {
+                let value = self.materialize_node(py, field.node, tokens)?;
+                if let Some(name) = &field.name {
+                    dict.set_item(name.key.bind(py), value)?;
+                }
+            }
+
+            Ok(dict.into_any())
+        } else {
+            let items = fields
+                .iter()
+                .map(|field| self.materialize_node(py, field.node, tokens))
+                .collect::<PyResult<Vec<Bound<'py, PyAny>>>>()?;
+
+            Ok(PyTuple::new(py, items)?.into_any())
+        }
+    }
+}
+
+impl BitStore {
+    fn bits(&self) -> usize {
+        match self {
+            BitStore::U8 => 8,
+            BitStore::U16 => 16,
+            BitStore::U32 => 32,
+            BitStore::U64 => 64,
+        }
+    }
+}
+
+fn parse_primitive<'a>(primitive: Primitive, input: &mut &'a [u8]) -> Result<Token<'a>, String> {
+    let token = match primitive {
+        Primitive::Bool => Token::Bool(bool::decode(input).map_err(decode_error)?),
+        Primitive::Char => {
+            let code_point = u32::decode(input).map_err(decode_error)?;
+            Token::Char(
+                char::from_u32(code_point)
+                    .ok_or_else(|| format!("Invalid char: {}", code_point))?,
+            )
+        }
+        Primitive::Str => {
+            let len = decode_len(input)?;
+            Token::Str(
+                std::str::from_utf8(take(input, len)?)
+                    .map_err(|_e| "Invalid utf-8 in str".to_string())?,
+            )
+        }
+        Primitive::U8 => Token::Uint(u8::decode(input).map_err(decode_error)? as u128),
+        Primitive::U16 => Token::Uint(u16::decode(input).map_err(decode_error)? as u128),
+        Primitive::U32 => Token::Uint(u32::decode(input).map_err(decode_error)? as u128),
+        Primitive::U64 => Token::Uint(u64::decode(input).map_err(decode_error)? as u128),
+        Primitive::U128 => Token::Uint(u128::decode(input).map_err(decode_error)?),
+        Primitive::I8 => Token::Int(i8::decode(input).map_err(decode_error)? as i128),
+        Primitive::I16 => Token::Int(i16::decode(input).map_err(decode_error)? as i128),
+        Primitive::I32 => Token::Int(i32::decode(input).map_err(decode_error)? as i128),
+        Primitive::I64 => Token::Int(i64::decode(input).map_err(decode_error)? as i128),
+        Primitive::I128 => Token::Int(i128::decode(input).map_err(decode_error)?),
+        // 256-bit integers are passed through as their 32 raw bytes
+        Primitive::U256 | Primitive::I256 => Token::Raw(take(input, 32)?),
+    };
+
+    Ok(token)
+}
+
+fn parse_compact(width: CompactWidth, input: &mut &[u8]) -> Result<u128, String> {
+    let value = match width {
+        CompactWidth::U8 => Compact::<u8>::decode(input).map_err(decode_error)?.0 as u128,
+        CompactWidth::U16 => Compact::<u16>::decode(input).map_err(decode_error)?.0 as u128,
+        CompactWidth::U32 => Compact::<u32>::decode(input).map_err(decode_error)?.0 as u128,
+        CompactWidth::U64 => Compact::<u64>::decode(input).map_err(decode_error)?.0 as u128,
+        CompactWidth::U128 => Compact::<u128>::decode(input).map_err(decode_error)?.0,
+    };
+
+    Ok(value)
+}
+
+fn token_to_py<'py>(py: Python<'py>, token: &Token) -> PyResult<Bound<'py, PyAny>> {
+    let value = match token {
+        Token::Bool(value) => {
+            let bound = value.into_pyobject(py)?;
+            Bound::clone(&bound).into_any()
+        }
+        Token::Char(value) => value.into_pyobject(py)?.into_any(),
+        Token::Str(value) => PyString::new(py, value).into_any(),
+        Token::Uint(value) => value.into_pyobject(py)?.into_any(),
+        Token::Int(value) => value.into_pyobject(py)?.into_any(),
+        Token::Raw(value) => PyBytes::new(py, value).into_any(),
+        _ => return Err(out_of_sync()),
+    };
+
+    Ok(value)
+}
+
+/*
+ * Converts one little-endian item of a raw run of fixed-size primitives
+ */
+fn raw_primitive_to_py<'py>(
+    py: Python<'py>,
+    primitive: Primitive,
+    item: &[u8],
+) -> PyResult<Bound<'py, PyAny>> {
+    let mut value: u128 = 0;
+    for (i, byte) in item.iter().enumerate() {
+        value |= (*byte as u128) << (8 * i);
+    }
+
+    let value = match primitive {
+        Primitive::Bool => {
+            let bound = (value == 1).into_pyobject(py)?;
+            Bound::clone(&bound).into_any()
+        }
+        Primitive::I8 | Primitive::I16 | Primitive::I32 | Primitive::I64 | Primitive::I128 => {
+            // Sign-extend from the item's width
+            let shift = 128 - 8 * item.len();
+            (((value << shift) as i128) >> shift)
+                .into_pyobject(py)?
+                .into_any()
+        }
+        _ => value.into_pyobject(py)?.into_any(),
+    };
+
+    Ok(value)
+}
+
+/*
+ * A bit sequence is a Compact<u32> number of bits, followed by the store words holding them.
+ * Returns a list of bools, in bit order.
+ */
+fn bits_to_py<'py>(
+    py: Python<'py>,
+    store: BitStore,
+    lsb0: bool,
+    bit_count: usize,
+    words: &[u8],
+) -> PyResult<Bound<'py, PyAny>> {
+    let store_bits = store.bits();
+    let store_bytes = store_bits / 8;
+
+    let bits = (0..bit_count)
+        .map(|bit| {
+            let word = &words[(bit / store_bits) * store_bytes..][..store_bytes];
+            // Words are little endian
+            let mut value: u64 = 0;
+            for (i, byte) in word.iter().enumerate() {
+                value |= (*byte as u64) << (8 * i);
+            }
+
+            let shift = if lsb0 {
+                bit % store_bits
+            } else {
+                store_bits - 1 - bit % store_bits
+            };
+            (value >> shift) & 1 == 1
+        })
+        .collect::<Vec<bool>>();
+
+    Ok(PyList::new(py, bits)?.into_any())
+}
@@ -7,27 +7,26 @@ use std::collections::HashMap;
 use std::vec;
 
 /*
- * Get the sub type string from a type string
+ * Get the sub type string from a type string, or None if it is malformed
  * This handles the case of Vec<T>, (T1, T2, T3, ...), [T; N]
  */
-fn get_inner_string(type_string: &str) -> &str {
-    let type_chars: Vec<char> = type_string.chars().collect();
+fn get_inner_string(type_string: &str) -> Option<&str> {
     // last char of type is either >, ), or ]
-    let close_bracket_char = type_chars[type_chars.len() - 1];
+    let close_bracket_char = type_string.chars().last()?;
     let bracket_char = match close_bracket_char {
         // Get the corresponding open bracket
         '>' => '<',
         ')' => '(',
         ']' => '[',
-        _ => panic!("Invalid type string"),
+        _ => return None,
     };
 
     // Find start of sub type; starts after the first bracket
-    let start = type_chars.iter().position(|&x| x == bracket_char).unwrap();
+    let start = type_string.find(bracket_char)?;
     // Find end of sub type
-    let end = type_chars.len() - 1;
+    let end = type_string.len() - close_bracket_char.len_utf8();
 
-    &type_string[(start + 1)..end]
+    type_string.get((start + 1)..end)
 }
 
 fn primitive_to_type_string(primitive: &TypeDefPrimitive) -> String {
@@ -220,12 +219,15 @@ pub fn get_type_id_from_type_string(
 
     // Create a new type and add it to the registry, memoize it, and return the id
     let type_chars: Vec<char> = type_string.chars().collect();
+    if type_chars.is_empty() {
+        return None;
+    }
+
     if type_chars.len() >= 12 && type_chars[0..12].iter().collect::<String>() == "scale_info::" {
         // This is a special formatting which has the type id in the string
-        let type_id = type_string[12..]
-            .trim()
-            .parse::<u32>()
-            .unwrap_or_else(|_| panic!("Failed to parse type id from string: {}", type_string));
+        let type_id = type_string[12..].trim().parse::<u32>().ok()?;
+        // Insert to memo
+        memo.insert(type_string.to_string(), type_id);
 
         Some(type_id)
     } else if type_chars[type_chars.len() - 1] == '>'
@@ -233,7 +235,7 @@ pub fn get_type_id_from_type_string(
         && type_chars[0..4].iter().collect::<String>() == "Vec<"
     {
         // This is a Vec<T> type, which is a sequence of one type T
-        let sub_type_string = get_inner_string(type_string).trim();
+        let sub_type_string = get_inner_string(type_string)?.trim();
         let sub_type_id = get_type_id_from_type_string(memo, sub_type_string, registry)?;
 
         let type_def = TypeDef::Sequence(TypeDefSequence::<PortableForm>::new(sub_type_id.into()));
@@ -255,7 +257,7 @@ pub fn get_type_id_from_type_string(
     {
         // This is a tuple; (T1, T2, T3, ...)
         // Made of multiple sub types T1, T2, T3, possibly different
-        let inner_string = get_inner_string(type_string).trim();
+        let inner_string = get_inner_string(type_string)?.trim();
         let sub_types: Vec<String> = inner_string.split(',').map(|x| x.trim().into()).collect();
 
         let mut sub_type_ids = vec![];
@@ -287,14 +289,14 @@ pub fn get_type_id_from_type_string(
     } else if type_string != "[]" && type_chars[0] == '[' && type_chars[type_chars.len() - 1] == ']'
     {
         // Is an array; [T; N] where T is in the memo
-        let inner_string = get_inner_string(type_string).trim();
+        let inner_string = get_inner_string(type_string)?.trim();
         let semi_colon_index = inner_string.find(';')?;
         let sub_type_string = inner_string[..semi_colon_index].trim();
 
         let array_length = inner_string[semi_colon_index + 1..]
             .trim()
             .parse::<u32>()
-            .unwrap();
+            .ok()?;
 
         let sub_type_id = get_type_id_from_type_string(memo, sub_type_string, registry)?;
 
@@ -321,7 +323,7 @@ pub fn get_type_id_from_type_string(
         && type_chars[0..8].iter().collect::<String>() == "Compact<"
     {
         // This is a Compact<T> type, which is a compact encoding of one type T
-        let sub_type_string = get_inner_string(type_string).trim();
+        let sub_type_string = get_inner_string(type_string)?.trim();
         let sub_type_id = get_type_id_from_type_string(memo, sub_type_string, registry)?;
 
         let type_def = TypeDef::Compact(TypeDefCompact::<PortableForm>::new(sub_type_id.into()));
@@ -400,3 +402,40 @@ pub fn get_type_id_from_type_string(
         None
     }
 }
+
+/**
+ * A registry prepared for decoding/encoding by type string.
+ *
+ * Owns the type string -> type id memo, and the types synthesized from type strings
+ * (e.g. Vec<T>, (T1, T2, ...), [T; N], Compact<T>, Option<T>), so that both persist
+ * across calls instead of being rebuilt from a fresh clone of the registry every time.
+ */
+#[derive(Clone)]
+pub struct CompiledRegistry {
+    pub registry: PortableRegistry,
+    memo: HashMap<String, u32>,
+}
+
+impl CompiledRegistry {
+    pub fn new(registry: PortableRegistry) -> Self {
+        let mut memo = HashMap::<String, u32>::new();
+        fill_memo_using_well_known_types(&mut memo, &registry);
+
+        CompiledRegistry { registry, memo }
+    }
+
+    /*
+     * Returns the type id of a type string that has already been resolved, without
+     * touching the registry
+     */
+    pub fn lookup_type_string(&self, type_string: &str) -> Option<u32> {
+        self.memo.get(type_string).copied()
+    }
+
+    /*
+     * Returns the type id of the type string, adding any new types it requires to the registry
+     */
+    pub fn get_type_id(&mut self, type_string: &str) -> Option<u32> {
+        get_type_id_from_type_string(&mut self.memo, type_string, &mut self.registry)
+    }
+}
@@ -0,0 +1,236 @@
+use pyo3::buffer::PyBuffer;
+use pyo3::exceptions::PyValueError;
+use pyo3::marker::Ungil;
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyString};
+
+/*
+ * SCALE-encoded input, as passed from Python.
+ *
+ * Accepts bytes, or any C-contiguous buffer-protocol object (bytearray, memoryview, mmap,
+ * NumPy uint8 arrays), borrowed without copying. A str is taken as hex, with or without a
+ * 0x prefix, and decoded here. Anything else that extracts as a sequence of ints (e.g. a list)
+ * is copied, as before.
+ */
+pub enum Encoded<'py> {
+    Bytes(Bound<'py, PyBytes>),
+    Buffer(PyBuffer<u8>),
+    Owned(Vec<u8>),
+}
+
+impl<'py> FromPyObject<'py> for Encoded<'py> {
+    fn extract_bound(ob: &Bound<'py, PyAny>) -> PyResult<Self> {
+        if let Ok(bytes) = ob.downcast::<PyBytes>() {
+            return Ok(Encoded::Bytes(bytes.clone()));
+        }
+
+        if let Ok(string) = ob.downcast::<PyString>() {
+            let hex = string.to_str()?;
+            let hex = hex
+                .strip_prefix("0x")
+                .or_else(|| hex.strip_prefix("0X"))
+                .unwrap_or(hex);
+
+            // str is immutable, so large ones are decoded with the GIL released
+            let bytes = crate::parse_without_gil(ob.py(), hex.len(), || decode_hex(hex))
+                .map_err(PyErr::new::<PyValueError, _>)?;
+
+            return Ok(Encoded::Owned(bytes));
+        }
+
+        if let Ok(buffer) = PyBuffer::<u8>::get(ob) {
+            if !buffer.is_c_contiguous() {
+                return Err(PyErr::new::<PyValueError, _>(
+                    "Encoded buffer must be C-contiguous",
+                ));
+            }
+
+            return Ok(Encoded::Buffer(buffer));
+        }
+
+        Ok(Encoded::Owned(ob.extract::<Vec<u8>>()?))
+    }
+}
+
+impl Encoded<'_> {
+    pub fn as_bytes(&self) -> &[u8] {
+        match self {
+            Encoded::Bytes(bytes) => bytes.as_bytes(),
+            // SAFETY: the buffer is C-contiguous, of u8, and held (so not released or resized)
+            // for as long as self is borrowed.
+            Encoded::Buffer(buffer) => unsafe {
+                std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes())
+            },
+            Encoded::Owned(bytes) => bytes,
+        }
+    }
+
+    /*
+     * The bytes in [offset, offset + length), or from offset to the end without a length
+     */
+    pub fn slice(&self, offset: usize, length: Option<usize>) -> PyResult<&[u8]> {
+        let bytes = self.as_bytes();
+        let end = match length {
+            Some(length) => offset.checked_add(length),
+            None => Some(bytes.len()),
+        };
+
+        match end {
+            Some(end) if offset <= end && end <= bytes.len() => Ok(&bytes[offset..end]),
+            _ => Err(PyErr::new::<PyValueError, _>(format!(
+                "Range (offset: {}, length: {:?}) is out of bounds for {} encoded bytes",
+                offset,
+                length,
+                bytes.len()
+            ))),
+        }
+    }
+
+    /*
+     * Runs f on the bytes in range, with the GIL released for large inputs (see
+     * crate::parse_without_gil). Writable buffers could be changed by another Python thread
+     * while being read, so they are always parsed holding the GIL.
+     */
+    pub fn parse<'a, T, F>(
+        &'a self,
+        py: Python<'_>,
+        offset: usize,
+        length: Option<usize>,
+        f: F,
+    ) -> PyResult<T>
+    where
+        T: Ungil,
+        F: Ungil + FnOnce(&'a [u8]) -> T,
+    {
+        let bytes = self.slice(offset, length)?;
+
+        match self {
+            Encoded::Buffer(buffer) if !buffer.readonly() => Ok(f(bytes)),
+            _ => Ok(crate::parse_without_gil(py, bytes.len(), || f(bytes))),
+        }
+    }
+
+    pub fn is_readonly(&self) -> bool {
+        match self {
+            Encoded::Buffer(buffer) => buffer.readonly(),
+            _ => true,
+        }
+    }
+
+    /*
+     * Keeps the input past the call that received it, still without copying it
+     */
+    pub fn into_owned(self) -> EncodedOwned {
+        match self {
+            Encoded::Bytes(bytes) => EncodedOwned::Bytes(bytes.unbind()),
+            Encoded::Buffer(buffer) => EncodedOwned::Buffer(buffer),
+            Encoded::Owned(bytes) => EncodedOwned::Owned(bytes),
+        }
+    }
+}
+
+/*
+ * Encoded input held by a Python object (e.g. an iterator) rather than borrowed for one call
+ */
+pub enum EncodedOwned {
+    Bytes(Py<PyBytes>),
+    Buffer(PyBuffer<u8>),
+    Owned(Vec<u8>),
+}
+
+impl EncodedOwned {
+    pub fn as_bytes<'a>(&'a self, py: Python<'a>) -> &'a [u8] {
+        match self {
+            EncodedOwned::Bytes(bytes) => bytes.as_bytes(py),
+            // SAFETY: as in Encoded::as_bytes; the buffer is held for as long as self is.
+            EncodedOwned::Buffer(buffer) => unsafe {
+                std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes())
+            },
+            EncodedOwned::Owned(bytes) => bytes,
+        }
+    }
+}
+
+/*
+ * Copies bytes into a writable, C-contiguous buffer-protocol object, starting at offset.
+ * Returns the number of bytes written.
+ */
+pub fn write_to_buffer(buffer: &Bound<'_, PyAny>, offset: usize, bytes: &[u8]) -> PyResult<usize> {
+    let buffer = PyBuffer::<u8>::get(buffer)?;
+    if buffer.readonly() || !buffer.is_c_contiguous() {
+        return Err(PyErr::new::<PyValueError, _>(
+            "Buffer must be writable and C-contiguous",
+        ));
+    }
+
+    let end = offset.checked_add(bytes.len());
+    match end {
+        Some(end) if end <= buffer.len_bytes() => {
+            // SAFETY: the range is in bounds of the held, writable, C-contiguous u8 buffer.
+            // The GIL is held, so no other Python thread can touch it while copying.
+            unsafe {
+                std::ptr::copy_nonoverlapping(
+                    bytes.as_ptr(),
+                    (buffer.buf_ptr() as *mut u8).add(offset),
+                    bytes.len(),
+                );
+            }
+
+            Ok(bytes.len())
+        }
+        _ => Err(PyErr::new::<PyValueError, _>(format!(
+            "Buffer of {} bytes is too small to write {} bytes at offset {}",
+            buffer.len_bytes(),
+            bytes.len(),
+            offset
+        ))),
+    }
+}
+
+// Marks a byte that is not a hex digit; any value with the high nibble set works
+const NOT_HEX: u8 = 0xff;
+
+const HEX_DIGITS: [u8; 256] = {
+    let mut digits = [NOT_HEX; 256];
+    let mut i = 0;
+    while i < 10 {
+        digits[b'0' as usize + i] = i as u8;
+        i += 1;
+    }
+    let mut i = 0;
+    while i < 6 {
+        digits[b'a' as usize + i] = 10 + i as u8;
+        digits[b'A' as usize + i] = 10 + i as u8;
+        i += 1;
+    }
+    digits
+};
+
+/*
+ * Decodes a hex string (without prefix) to bytes.
+ * Invalid digits are collected without branching in the loop and checked once at the end,
+ * which lets the loop be vectorized.
+ */
+pub fn decode_hex(hex: &str) -> Result<Vec<u8>, String> {
+    let hex = hex.as_bytes();
+    if hex.len() % 2 != 0 {
+        return Err("Hex string has an odd number of digits".to_string());
+    }
+
+    let mut invalid: u8 = 0;
+    let bytes = hex
+        .chunks_exact(2)
+        .map(|pair| {
+            let high = HEX_DIGITS[pair[0] as usize];
+            let low = HEX_DIGITS[pair[1] as usize];
+            invalid |= high | low;
+            (high << 4) | low
+        })
+        .collect::<Vec<u8>>();
+
+    if invalid & 0xf0 != 0 {
+        return Err("Invalid hex string".to_string());
+    }
+
+    Ok(bytes)
+}
@@ -0,0 +1,148 @@
+use std::fmt::Display;
+
+use codec::Decode;
+use pyo3::create_exception;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+create_exception!(
+    bt_decode,
+    DecodeError,
+    PyValueError,
+    "Raised when SCALE-encoded bytes can't be decoded as the requested type.\n\n\
+     Has `type_path` (the type being decoded), `offset` (the byte where decoding stopped, \
+     relative to the start of the encoded input) and `remaining` (bytes left from there)."
+);
+
+/*
+ * Why and where decoding failed. Built without the GIL, then raised as a DecodeError.
+ */
+#[derive(Debug)]
+pub struct DecodeFailure {
+    type_path: String,
+    offset: usize,
+    remaining: usize,
+    reason: String,
+}
+
+impl DecodeFailure {
+    /*
+     * input is what was left of encoded when decoding stopped; base is the offset of encoded
+     * in the caller's input
+     */
+    pub fn new(
+        type_path: &str,
+        base: usize,
+        encoded: &[u8],
+        input: &[u8],
+        reason: impl Display,
+    ) -> Self {
+        DecodeFailure {
+            type_path: type_path.to_string(),
+            offset: base + encoded.len() - input.len(),
+            remaining: input.len(),
+            reason: reason.to_string(),
+        }
+    }
+
+    pub fn into_pyerr(self, py: Python<'_>) -> PyErr {
+        let err = DecodeError::new_err(format!(
+            "Failed to decode {} at byte {} ({} bytes remaining): {}",
+            self.type_path, self.offset, self.remaining, self.reason
+        ));
+
+        let value = err.value(py);
+        let attributes = value
+            .setattr("type_path", self.type_path)
+            .and_then(|_| value.setattr("offset", self.offset))
+            .and_then(|_| value.setattr("remaining", self.remaining));
+
+        match attributes {
+            Ok(()) => err,
+            Err(attributes_err) => attributes_err,
+        }
+    }
+}
+
+/*
+ * Decodes a T from the front of encoded, which starts at base in the caller's input
+ */
+pub fn decode_typed<T: Decode>(
+    encoded: &[u8],
+    base: usize,
+    type_path: &str,
+) -> Result<T, DecodeFailure> {
+    decode_prefix(encoded, base, type_path).map(|(value, _)| value)
+}
+
+/*
+ * As decode_typed, also returning the number of bytes the value took
+ */
+pub fn decode_prefix<T: Decode>(
+    encoded: &[u8],
+    base: usize,
+    type_path: &str,
+) -> Result<(T, usize), DecodeFailure> {
+    let mut input = encoded;
+    match T::decode(&mut input) {
+        Ok(value) => Ok((value, encoded.len() - input.len())),
+        Err(err) => Err(DecodeFailure::new(type_path, base, encoded, input, err)),
+    }
+}
+
+/*
+ * Fails if a value that took `consumed` bytes did not take all of encoded
+ */
+pub fn check_trailing_bytes(
+    encoded: &[u8],
+    consumed: usize,
+    base: usize,
+    type_path: &str,
+) -> Result<(), DecodeFailure> {
+    let input = &encoded[consumed..];
+    if input.is_empty() {
+        return Ok(());
+    }
+
+    Err(DecodeFailure::new(
+        type_path,
+        base,
+        encoded,
+        input,
+        format!("{} trailing bytes", input.len()),
+    ))
+}
+
+/*
+ * Decodes a Vec<T>, keeping the items decoded before the first failure, if any
+ */
+pub fn decode_vec_partial<T: Decode>(
+    encoded: &[u8],
+    base: usize,
+    type_path: &str,
+) -> (Vec<T>, Option<DecodeFailure>) {
+    let mut input = encoded;
+    let len = match codec::Compact::<u32>::decode(&mut input) {
+        Ok(len) => len.0 as usize,
+        Err(err) => {
+            return (
+                vec![],
+                Some(DecodeFailure::new(type_path, base, encoded, input, err)),
+            )
+        }
+    };
+
+    // Each item takes at least a byte, so a bad length can't allocate more than the input
+    let mut items = Vec::with_capacity(len.min(input.len()));
+    for _ in 0..len {
+        match T::decode(&mut input) {
+            Ok(item) => items.push(item),
+            Err(err) => {
+                let failure = DecodeFailure::new(type_path, base, encoded, input, err);
+                return (items, Some(failure));
+            }
+        }
+    }
+
+    (items, None)
+}
@@ -0,0 +1,127 @@
+use std::fmt;
+use std::ops::Deref;
+use std::sync::OnceLock;
+
+use codec::{Decode, Encode, Input, Output};
+use pyo3::prelude::*;
+use pyo3::BoundObject;
+
+/*
+ * A decoded field of a typed pyclass, converted to a Python object on first access only.
+ *
+ * The Python object is cached, so reading an attribute again returns the same object
+ * instead of converting (and cloning) the field again, and fields never read are never
+ * converted. Note that mutating a returned list is therefore visible on the next access.
+ */
+pub struct Lazy<T> {
+    value: T,
+    py_value: OnceLock<Py<PyAny>>,
+}
+
+impl<T> Lazy<T> {
+    pub fn new(value: T) -> Self {
+        Lazy {
+            value,
+            py_value: OnceLock::new(),
+        }
+    }
+
+    /*
+     * Sets the Python object returned on access, in place of converting the value, unless it
+     * was already converted
+     */
+    pub fn preset(&self, py_value: Py<PyAny>) {
+        let _ = self.py_value.set(py_value);
+    }
+}
+
+impl<T> Deref for Lazy<T> {
+    type Target = T;
+
+    fn deref(&self) -> &T {
+        &self.value
+    }
+}
+
+// Clones get their own Python object
+impl<T: Clone> Clone for Lazy<T> {
+    fn clone(&self) -> Self {
+        Lazy::new(self.value.clone())
+    }
+}
+
+impl<T: fmt::Debug> fmt::Debug for Lazy<T> {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        self.value.fmt(f)
+    }
+}
+
+impl<T: Encode> Encode for Lazy<T> {
+    fn size_hint(&self) -> usize {
+        self.value.size_hint()
+    }
+
+    fn encode_to<W: Output + ?Sized>(&self, dest: &mut W) {
+        self.value.encode_to(dest)
+    }
+}
+
+impl<T: Decode> Decode for Lazy<T> {
+    fn decode<I: Input>(input: &mut I) -> Result<Self, codec::Error> {
+        Ok(Lazy::new(T::decode(input)?))
+    }
+}
+
+impl<'py, T> IntoPyObject<'py> for &Lazy<T>
+where
+    T: Clone + IntoPyObject<'py>,
+{
+    type Target = PyAny;
+    type Output = Bound<'py, PyAny>;
+    type Error = PyErr;
+
+    fn into_pyobject(self, py: Python<'py>) -> Result<Self::Output, Self::Error> {
+        if let Some(py_value) = self.py_value.get() {
+            return Ok(py_value.bind(py).clone());
+        }
+
+        let py_value = self
+            .value
+            .clone()
+            .into_pyobject(py)
+            .map_err(Into::into)?
+            .into_bound()
+            .into_any()
+            .unbind();
+        // Another thread may have converted it first; either way, return the cached object
+        let _ = self.py_value.set(py_value);
+
+        Ok(self
+            .py_value
+            .get()
+            .expect("Lazy value was just set")
+            .bind(py)
+            .clone())
+    }
+}
+
+impl<'py, T> IntoPyObject<'py> for Lazy<T>
+where
+    T: IntoPyObject<'py>,
+{
+    type Target = PyAny;
+    type Output = Bound<'py, PyAny>;
+    type Error = PyErr;
+
+    fn into_pyobject(self, py: Python<'py>) -> Result<Self::Output, Self::Error> {
+        match self.py_value.into_inner() {
+            Some(py_value) => Ok(py_value.into_bound(py)),
+            None => Ok(self
+                .value
+                .into_pyobject(py)
+                .map_err(Into::into)?
+                .into_bound()
+                .into_any()),
+        }
+    }
+}
@@ -1,8 +1,7 @@
 use codec::{Decode, Encode};
-use custom_derive::pydecode;
+use custom_derive::{pydecode, AccountIds, Project};
 use frame_metadata::{RuntimeMetadata, RuntimeMetadataPrefixed};
 use log;
-use std::ffi::CString;
 
 use pyo3::prelude::*;
 use pyo3::types::PyAny;
@@ -30,28 +29,136 @@ macro_rules! impl_UnsignedCompactIntoPy {
 struct Compact<T>(pub codec::Compact<T>);
 impl_UnsignedCompactIntoPy!(u8, u16, u32, u64, u128);
 
-type AccountId = [u8; 32];
+// A 32-byte public key. Converted to Python as a [u8; 32] is, or as an SS58 address when
+// decoding with an ss58_format (see accountids::AccountIds).
+#[derive(Clone, Copy, Encode, Decode, Debug, PartialEq, Eq, Hash)]
+struct AccountId(pub [u8; 32]);
 
+impl std::ops::Deref for AccountId {
+    type Target = [u8; 32];
+
+    fn deref(&self) -> &[u8; 32] {
+        &self.0
+    }
+}
+
+impl<'py> IntoPyObject<'py> for AccountId {
+    type Target = PyAny;
+    type Output = Bound<'py, Self::Target>;
+    type Error = PyErr;
+
+    fn into_pyobject(self, py: Python<'py>) -> Result<Self::Output, Self::Error> {
+        Ok(self.0.into_pyobject(py)?.into_any())
+    }
+}
+
+// Inputs smaller than this are decoded while holding the GIL; releasing and reacquiring it
+// costs more than decoding them.
+const RELEASE_GIL_MIN_LEN: usize = 16 * 1024;
+
+/// Runs `f`, which must not touch Python, with the GIL released if the input is large
+/// enough for other Python threads to make progress in the meantime.
+fn parse_without_gil<T, F>(py: Python<'_>, input_len: usize, f: F) -> T
+where
+    T: pyo3::marker::Ungil,
+    F: pyo3::marker::Ungil + FnOnce() -> T,
+{
+    if input_len < RELEASE_GIL_MIN_LEN {
+        f()
+    } else {
+        py.detach(f)
+    }
+}
+
+// Builds NeuronColumns from a Vec of NeuronInfo or NeuronInfoLite, which share these fields.
+macro_rules! neuron_columns {
+    ($neurons:expr) => {{
+        let neurons = $neurons;
+        let n = neurons.len();
+        let mut columns = NeuronColumns {
+            hotkey: Vec::with_capacity(n * 32),
+            coldkey: Vec::with_capacity(n * 32),
+            ..Default::default()
+        };
+
+        for neuron in neurons.iter() {
+            columns.hotkey.extend_from_slice(&neuron.hotkey[..]);
+            columns.coldkey.extend_from_slice(&neuron.coldkey[..]);
+            columns.uid.push(neuron.uid.0 .0);
+            columns.netuid.push(neuron.netuid.0 .0);
+            columns.active.push(neuron.active);
+            columns.stake.push(
+                neuron
+                    .stake
+                    .iter()
+                    .fold(0u64, |total, (_, stake)| total.saturating_add(stake.0 .0)),
+            );
+            columns.rank.push(neuron.rank.0 .0);
+            columns.emission.push(neuron.emission.0 .0);
+            columns.incentive.push(neuron.incentive.0 .0);
+            columns.consensus.push(neuron.consensus.0 .0);
+            columns.trust.push(neuron.trust.0 .0);
+            columns.validator_trust.push(neuron.validator_trust.0 .0);
+            columns.dividends.push(neuron.dividends.0 .0);
+            columns.last_update.push(neuron.last_update.0 .0);
+            columns.validator_permit.push(neuron.validator_permit);
+            columns.pruning_score.push(neuron.pruning_score.0 .0);
+        }
+
+        columns
+    }};
+}
+
+mod accountids;
+mod decodecache;
+mod decodeplan;
 mod dyndecoder;
+mod encoded;
+mod errors;
+mod lazy;
+mod projection;
+mod ss58;
+mod storage;
+mod veciter;
+
+use encoded::Encoded;
+use errors::{DecodeError, DecodeFailure};
+use lazy::Lazy;
+use veciter::{PyVecDecoder, PyVecIterator};
 
 #[pymodule(name = "bt_decode")]
 mod bt_decode {
     use std::collections::HashMap;
+    use std::ops::Deref;
+    use std::sync::{Arc, Mutex, RwLock};
 
-    use dyndecoder::{fill_memo_using_well_known_types, get_type_id_from_type_string};
+    use accountids::{AccountIdObjects, AccountIds};
+    use decodecache::DecodeCache;
+    use decodeplan::{DecodePlan, PlanOptions, Token};
+    use dyndecoder::CompiledRegistry;
     use frame_metadata::v15::RuntimeMetadataV15;
-    use pyo3::types::{PyDict, PyInt, PyList, PyTuple};
+    use numpy::{IntoPyArray, PyArrayMethods};
+    use pyo3::intern;
+    use pyo3::types::{PyBool, PyBytes, PyDict, PyInt, PyList, PyString, PyTuple};
+    use rayon::prelude::*;
     use scale_info::{form::PortableForm, TypeDefComposite};
     use scale_value::{
-        self,
-        scale::{decode_as_type, encode_as_type},
-        Composite, Primitive, Value, ValueDef, Variant,
+        self, scale::encode_as_type, Composite, Primitive, Value, ValueDef, Variant,
     };
+    use storage::StorageKeyLayout;
 
     use super::*;
 
+    #[pymodule_export]
+    use super::{PyVecDecoder, PyVecIterator};
+
+    #[pymodule_init]
+    fn init(m: &Bound<'_, PyModule>) -> PyResult<()> {
+        m.add("DecodeError", m.py().get_type::<DecodeError>())
+    }
+
     #[pyclass(name = "AxonInfo", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct AxonInfo {
         ///  Axon serving block.
         pub block: u64,
@@ -76,7 +183,7 @@ mod bt_decode {
     impl AxonInfo {}
 
     #[pyclass(name = "PrometheusInfo", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct PrometheusInfo {
         /// Prometheus serving block.
         pub block: u64,
@@ -95,16 +202,16 @@ mod bt_decode {
     impl PrometheusInfo {}
 
     #[pyclass(name = "NeuronInfo", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct NeuronInfo {
-        hotkey: AccountId,
-        coldkey: AccountId,
+        hotkey: Lazy<AccountId>,
+        coldkey: Lazy<AccountId>,
         uid: Compact<u16>,
         netuid: Compact<u16>,
         active: bool,
-        axon_info: AxonInfo,
-        prometheus_info: PrometheusInfo,
-        stake: Vec<(AccountId, Compact<u64>)>, // map of coldkey to stake on this neuron/hotkey (includes delegations)
+        axon_info: Lazy<AxonInfo>,
+        prometheus_info: Lazy<PrometheusInfo>,
+        stake: Lazy<Vec<(AccountId, Compact<u64>)>>, // map of coldkey to stake on this neuron/hotkey (includes delegations)
         rank: Compact<u16>,
         emission: Compact<u64>,
         incentive: Compact<u16>,
@@ -114,26 +221,56 @@ mod bt_decode {
         dividends: Compact<u16>,
         last_update: Compact<u64>,
         validator_permit: bool,
-        weights: Vec<(Compact<u16>, Compact<u16>)>, // Vec of (uid, weight)
-        bonds: Vec<(Compact<u16>, Compact<u16>)>,   // Vec of (uid, bond)
+        weights: Lazy<Vec<(Compact<u16>, Compact<u16>)>>, // Vec of (uid, weight)
+        bonds: Lazy<Vec<(Compact<u16>, Compact<u16>)>>,   // Vec of (uid, bond)
         pruning_score: Compact<u16>,
     }
 
     #[pydecode]
     #[pymethods]
-    impl NeuronInfo {}
+    impl NeuronInfo {
+        #[pyo3(name = "decode_vec_columnar")]
+        #[staticmethod]
+        #[pyo3(signature = (encoded, offset=0, length=None))]
+        fn py_decode_vec_columnar<'py>(
+            py: Python<'py>,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+        ) -> PyResult<Bound<'py, PyDict>> {
+            let (columns, weights, bonds) = encoded
+                .parse(py, offset, length, |encoded| {
+                    errors::decode_typed::<Vec<NeuronInfo>>(encoded, offset, "Vec<NeuronInfo>").map(
+                        |neurons| {
+                            (
+                                neuron_columns!(neurons),
+                                CsrMatrix::from_rows(neurons.iter().map(|neuron| &*neuron.weights)),
+                                CsrMatrix::from_rows(neurons.iter().map(|neuron| &*neuron.bonds)),
+                            )
+                        },
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+
+            let dict = columns.into_py_dict(py)?;
+            dict.set_item("weights", weights.into_py_tuple(py)?)?;
+            dict.set_item("bonds", bonds.into_py_tuple(py)?)?;
+
+            Ok(dict)
+        }
+    }
 
     #[pyclass(name = "NeuronInfoLite", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct NeuronInfoLite {
-        hotkey: AccountId,
-        coldkey: AccountId,
+        hotkey: Lazy<AccountId>,
+        coldkey: Lazy<AccountId>,
         uid: Compact<u16>,
         netuid: Compact<u16>,
         active: bool,
-        axon_info: AxonInfo,
-        prometheus_info: PrometheusInfo,
-        stake: Vec<(AccountId, Compact<u64>)>, // map of coldkey to stake on this neuron/hotkey (includes delegations)
+        axon_info: Lazy<AxonInfo>,
+        prometheus_info: Lazy<PrometheusInfo>,
+        stake: Lazy<Vec<(AccountId, Compact<u64>)>>, // map of coldkey to stake on this neuron/hotkey (includes delegations)
         rank: Compact<u16>,
         emission: Compact<u64>,
         incentive: Compact<u16>,
@@ -149,16 +286,130 @@ mod bt_decode {
 
     #[pydecode]
     #[pymethods]
-    impl NeuronInfoLite {}
+    impl NeuronInfoLite {
+        #[pyo3(name = "decode_vec_columnar")]
+        #[staticmethod]
+        #[pyo3(signature = (encoded, offset=0, length=None))]
+        fn py_decode_vec_columnar<'py>(
+            py: Python<'py>,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+        ) -> PyResult<Bound<'py, PyDict>> {
+            encoded
+                .parse(py, offset, length, |encoded| {
+                    errors::decode_typed::<Vec<NeuronInfoLite>>(
+                        encoded,
+                        offset,
+                        "Vec<NeuronInfoLite>",
+                    )
+                    .map(|neurons| neuron_columns!(neurons))
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?
+                .into_py_dict(py)
+        }
+    }
+
+    /// The scalar fields of a list of neurons, one column per field and one row per neuron.
+    /// Hotkeys and coldkeys are stored row-major, 32 bytes per neuron.
+    #[derive(Default)]
+    struct NeuronColumns {
+        hotkey: Vec<u8>,
+        coldkey: Vec<u8>,
+        uid: Vec<u16>,
+        netuid: Vec<u16>,
+        active: Vec<bool>,
+        // Total stake on the neuron, summed over its coldkeys
+        stake: Vec<u64>,
+        rank: Vec<u16>,
+        emission: Vec<u64>,
+        incentive: Vec<u16>,
+        consensus: Vec<u16>,
+        trust: Vec<u16>,
+        validator_trust: Vec<u16>,
+        dividends: Vec<u16>,
+        last_update: Vec<u64>,
+        validator_permit: Vec<bool>,
+        pruning_score: Vec<u16>,
+    }
+
+    /// A sparse matrix in CSR form, one row per neuron.
+    /// Row i holds columns indices[indptr[i]..indptr[i + 1]], with the matching values.
+    struct CsrMatrix {
+        indptr: Vec<u32>,
+        indices: Vec<u16>,
+        values: Vec<u16>,
+    }
+
+    impl CsrMatrix {
+        fn from_rows<'a>(
+            rows: impl Iterator<Item = &'a Vec<(Compact<u16>, Compact<u16>)>>,
+        ) -> Self {
+            let mut matrix = CsrMatrix {
+                indptr: vec![0],
+                indices: Vec::new(),
+                values: Vec::new(),
+            };
+
+            for row in rows {
+                for (index, value) in row.iter() {
+                    matrix.indices.push(index.0 .0);
+                    matrix.values.push(value.0 .0);
+                }
+                matrix.indptr.push(matrix.indices.len() as u32);
+            }
+
+            matrix
+        }
+
+        // Returns (indptr, indices, values) as NumPy arrays
+        fn into_py_tuple(self, py: Python<'_>) -> PyResult<Bound<'_, PyTuple>> {
+            PyTuple::new(
+                py,
+                [
+                    self.indptr.into_pyarray(py).into_any(),
+                    self.indices.into_pyarray(py).into_any(),
+                    self.values.into_pyarray(py).into_any(),
+                ],
+            )
+        }
+    }
+
+    impl NeuronColumns {
+        // Returns a dict of NumPy arrays, keyed by field name
+        fn into_py_dict(self, py: Python<'_>) -> PyResult<Bound<'_, PyDict>> {
+            let n = self.uid.len();
+            let dict = PyDict::new(py);
+
+            dict.set_item("hotkey", self.hotkey.into_pyarray(py).reshape([n, 32])?)?;
+            dict.set_item("coldkey", self.coldkey.into_pyarray(py).reshape([n, 32])?)?;
+            dict.set_item("uid", self.uid.into_pyarray(py))?;
+            dict.set_item("netuid", self.netuid.into_pyarray(py))?;
+            dict.set_item("active", self.active.into_pyarray(py))?;
+            dict.set_item("stake", self.stake.into_pyarray(py))?;
+            dict.set_item("rank", self.rank.into_pyarray(py))?;
+            dict.set_item("emission", self.emission.into_pyarray(py))?;
+            dict.set_item("incentive", self.incentive.into_pyarray(py))?;
+            dict.set_item("consensus", self.consensus.into_pyarray(py))?;
+            dict.set_item("trust", self.trust.into_pyarray(py))?;
+            dict.set_item("validator_trust", self.validator_trust.into_pyarray(py))?;
+            dict.set_item("dividends", self.dividends.into_pyarray(py))?;
+            dict.set_item("last_update", self.last_update.into_pyarray(py))?;
+            dict.set_item("validator_permit", self.validator_permit.into_pyarray(py))?;
+            dict.set_item("pruning_score", self.pruning_score.into_pyarray(py))?;
+
+            Ok(dict)
+        }
+    }
 
     #[pyclass(name = "SubnetIdentity", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct SubnetIdentity {
-        subnet_name: Vec<u8>,
+        subnet_name: Lazy<Vec<u8>>,
         /// The github repository associated with the chain identity
-        github_repo: Vec<u8>,
+        github_repo: Lazy<Vec<u8>>,
         /// The subnet's contact
-        subnet_contact: Vec<u8>,
+        subnet_contact: Lazy<Vec<u8>>,
     }
 
     #[pydecode]
@@ -166,7 +417,7 @@ mod bt_decode {
     impl SubnetIdentity {}
 
     #[pyclass(name = "SubnetInfo", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct SubnetInfo {
         netuid: Compact<u16>,
         rho: Compact<u16>,
@@ -182,10 +433,10 @@ mod bt_decode {
         blocks_since_last_step: Compact<u64>,
         tempo: Compact<u16>,
         network_modality: Compact<u16>,
-        network_connect: Vec<[u16; 2]>,
+        network_connect: Lazy<Vec<[u16; 2]>>,
         emission_values: Compact<u64>,
         burn: Compact<u64>,
-        owner: AccountId,
+        owner: Lazy<AccountId>,
     }
 
     #[pydecode]
@@ -193,14 +444,37 @@ mod bt_decode {
     impl SubnetInfo {
         #[pyo3(name = "decode_vec_option")]
         #[staticmethod]
-        fn py_decode_vec_option(encoded: &[u8]) -> Vec<Option<SubnetInfo>> {
-            Vec::<Option<SubnetInfo>>::decode(&mut &encoded[..])
-                .expect("Failed to decode Vec<Option<SubnetInfo>>")
+        #[pyo3(signature = (
+            encoded,
+            offset=0,
+            length=None,
+            ss58_format=None,
+            intern_account_ids=false
+        ))]
+        fn py_decode_vec_option(
+            py: Python<'_>,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Vec<Option<SubnetInfo>>> {
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    errors::decode_typed::<Vec<Option<SubnetInfo>>>(
+                        encoded,
+                        offset,
+                        "Vec<Option<SubnetInfo>>",
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+            accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+            Ok(decoded)
         }
     }
 
     #[pyclass(name = "SubnetInfoV2", get_all)]
-    #[derive(Clone, Encode, Decode)]
+    #[derive(Clone, Encode, Decode, Project, AccountIds)]
     struct SubnetInfoV2 {
         netuid: Compact<u16>,
         rho: Compact<u16>,
@@ -216,11 +490,11 @@ mod bt_decode {
         blocks_since_last_step: Compact<u64>,
         tempo: Compact<u16>,
         network_modality: Compact<u16>,
-        network_connect: Vec<[u16; 2]>,
+        network_connect: Lazy<Vec<[u16; 2]>>,
         emission_values: Compact<u64>,
         burn: Compact<u64>,
-        owner: AccountId,
-        identity: Option<SubnetIdentity>,
+        owner: Lazy<AccountId>,
+        identity: Lazy<Option<SubnetIdentity>>,
     }
 
     #[pydecode]
@@ -228,14 +502,37 @@ mod bt_decode {
     impl SubnetInfoV2 {
         #[pyo3(name = "decode_vec_option")]
         #[staticmethod]
-        fn py_decode_vec_option(encoded: &[u8]) -> Vec<Option<SubnetInfoV2>> {
-            Vec::<Option<SubnetInfoV2>>::decode(&mut &encoded[..])
-                .expect("Failed to decode Vec<Option<SubnetInfoV2>>")
+        #[pyo3(signature = (
+            encoded,
+            offset=0,
+            length=None,
+            ss58_format=None,
+            intern_account_ids=false
+        ))]
+        fn py_decode_vec_option(
+            py: Python<'_>,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Vec<Option<SubnetInfoV2>>> {
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    errors::decode_typed::<Vec<Option<SubnetInfoV2>>>(
+                        encoded,
+                        offset,
+                        "Vec<Option<SubnetInfoV2>>",
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+            accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+            Ok(decoded)
         }
     }
 
     #[pyclass(name = "SubnetHyperparameters", get_all)]
-    #[derive(Decode, Encode, Clone, Debug)]
+    #[derive(Decode, Encode, Clone, Debug, Project, AccountIds)]
     pub struct SubnetHyperparams {
         rho: Compact<u16>,
         kappa: Compact<u16>,
@@ -271,10 +568,10 @@ mod bt_decode {
     impl SubnetHyperparams {}
 
     #[pyclass(get_all)]
-    #[derive(Decode, Encode, Clone, Debug)]
+    #[derive(Decode, Encode, Clone, Debug, Project, AccountIds)]
     struct StakeInfo {
-        hotkey: AccountId,
-        coldkey: AccountId,
+        hotkey: Lazy<AccountId>,
+        coldkey: Lazy<AccountId>,
         stake: Compact<u64>,
     }
 
@@ -283,21 +580,48 @@ mod bt_decode {
     impl StakeInfo {
         #[pyo3(name = "decode_vec_tuple_vec")]
         #[staticmethod]
-        fn py_decode_vec_tuple_vec(encoded: &[u8]) -> Vec<(AccountId, Vec<StakeInfo>)> {
-            Vec::<(AccountId, Vec<StakeInfo>)>::decode(&mut &encoded[..])
-                .expect("Failed to decode Vec<(AccountId, Vec<StakeInfo>)>")
+        #[pyo3(signature = (
+            encoded,
+            offset=0,
+            length=None,
+            ss58_format=None,
+            intern_account_ids=false
+        ))]
+        fn py_decode_vec_tuple_vec(
+            py: Python<'_>,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Py<PyAny>> {
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    errors::decode_typed::<Vec<(AccountId, Vec<StakeInfo>)>>(
+                        encoded,
+                        offset,
+                        "Vec<(AccountId, Vec<StakeInfo>)>",
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+
+            // The coldkeys aren't Lazy, so the whole list is converted here
+            match AccountIdObjects::new(ss58_format, intern_account_ids)? {
+                Some(mut account_ids) => decoded.to_object_with(py, &mut account_ids),
+                None => Ok(decoded.into_pyobject(py)?.into_any().unbind()),
+            }
         }
     }
 
     #[pyclass(get_all)]
-    #[derive(Decode, Encode, Clone, Debug)]
+    #[derive(Decode, Encode, Clone, Debug, Project, AccountIds)]
     struct DelegateInfo {
-        delegate_ss58: AccountId,
+        delegate_ss58: Lazy<AccountId>,
         take: Compact<u16>,
-        nominators: Vec<(AccountId, Compact<u64>)>, // map of nominator_ss58 to stake amount
-        owner_ss58: AccountId,
-        registrations: Vec<Compact<u16>>, // Vec of netuid this delegate is registered on
-        validator_permits: Vec<Compact<u16>>, // Vec of netuid this delegate has validator permit on
+        nominators: Lazy<Vec<(AccountId, Compact<u64>)>>, // map of nominator_ss58 to stake amount
+        owner_ss58: Lazy<AccountId>,
+        registrations: Lazy<Vec<Compact<u16>>>, // Vec of netuid this delegate is registered on
+        validator_permits: Lazy<Vec<Compact<u16>>>, // Vec of netuid this delegate has validator permit on
         return_per_1000: Compact<u64>, // Delegators current daily return per 1000 TAO staked minus take fee
         total_daily_return: Compact<u64>, // Delegators current daily return
     }
@@ -307,9 +631,32 @@ mod bt_decode {
     impl DelegateInfo {
         #[pyo3(name = "decode_delegated")]
         #[staticmethod]
-        fn py_decode_delegated(encoded: &[u8]) -> Vec<(DelegateInfo, Compact<u64>)> {
-            Vec::<(DelegateInfo, Compact<u64>)>::decode(&mut &encoded[..])
-                .expect("Failed to decode Vec<(DelegateInfo, Compact<u64>)>")
+        #[pyo3(signature = (
+            encoded,
+            offset=0,
+            length=None,
+            ss58_format=None,
+            intern_account_ids=false
+        ))]
+        fn py_decode_delegated(
+            py: Python<'_>,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            ss58_format: Option<u16>,
+            intern_account_ids: bool,
+        ) -> PyResult<Vec<(DelegateInfo, Compact<u64>)>> {
+            let decoded = encoded
+                .parse(py, offset, length, |encoded| {
+                    errors::decode_typed::<Vec<(DelegateInfo, Compact<u64>)>>(
+                        encoded,
+                        offset,
+                        "Vec<(DelegateInfo, Compact<u64>)>",
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?;
+            accountids::preset_account_ids(py, &decoded, ss58_format, intern_account_ids)?;
+            Ok(decoded)
         }
     }
 
@@ -332,19 +679,40 @@ mod bt_decode {
         }
 
         #[staticmethod]
-        fn decode_from_metadata_option(encoded_metadata_v15: &[u8]) -> Self {
-            let option_vec = Option::<Vec<u8>>::decode(&mut &encoded_metadata_v15[..])
-                .ok()
-                .flatten()
-                .expect("Failed to Option metadata");
-
-            let metadata_v15 = RuntimeMetadataPrefixed::decode(&mut &option_vec[..])
-                .expect("Failed to decode metadata")
+        #[pyo3(signature = (encoded_metadata_v15, offset=0, length=None))]
+        fn decode_from_metadata_option(
+            py: Python<'_>,
+            encoded_metadata_v15: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+        ) -> PyResult<Self> {
+            let metadata = encoded_metadata_v15
+                .parse(py, offset, length, |encoded| {
+                    let mut input = encoded;
+                    let failed = |input: &[u8], reason: &dyn std::fmt::Display| {
+                        DecodeFailure::new("Option<Vec<u8>>", offset, encoded, input, reason)
+                    };
+                    let option_vec = Option::<Vec<u8>>::decode(&mut input)
+                        .map_err(|err| failed(input, &err))?
+                        .ok_or_else(|| failed(input, &"metadata is None"))?;
+
+                    // The metadata bytes end where the option does
+                    let metadata_offset = offset + encoded.len() - input.len() - option_vec.len();
+                    errors::decode_typed::<RuntimeMetadataPrefixed>(
+                        &option_vec,
+                        metadata_offset,
+                        "RuntimeMetadataPrefixed",
+                    )
+                })?
+                .map_err(|failure| failure.into_pyerr(py))?
                 .1;
 
-            match metadata_v15 {
-                RuntimeMetadata::V15(metadata) => PyMetadataV15 { metadata },
-                _ => panic!("Invalid metadata version"),
+            match metadata {
+                RuntimeMetadata::V15(metadata) => Ok(PyMetadataV15 { metadata }),
+                _ => Err(DecodeError::new_err(format!(
+                    "Expected V15 metadata, found version {}",
+                    metadata.version()
+                ))),
             }
         }
 
@@ -359,14 +727,23 @@ mod bt_decode {
     #[derive(Clone, Decode, Encode, Debug)]
     pub struct PyPortableRegistry {
         pub registry: scale_info::PortableRegistry,
+        // Whether the type-string functions given this registry decode u8 sequences and
+        // arrays as tuples of ints, as before, rather than bytes
+        #[codec(skip)]
+        #[pyo3(get, set)]
+        pub bytes_as_tuples: bool,
     }
 
     #[pymethods]
     impl PyPortableRegistry {
         #[staticmethod]
-        fn from_json(json: &str) -> Self {
+        #[pyo3(signature = (json, bytes_as_tuples=false))]
+        fn from_json(json: &str, bytes_as_tuples: bool) -> Self {
             let registry: scale_info::PortableRegistry = serde_json::from_str(json).unwrap();
-            PyPortableRegistry { registry }
+            PyPortableRegistry {
+                registry,
+                bytes_as_tuples,
+            }
         }
 
         #[getter]
@@ -375,139 +752,442 @@ mod bt_decode {
         }
 
         #[staticmethod]
-        fn from_metadata_v15(metadata: PyMetadataV15) -> Self {
-            let registry = metadata.metadata.types;
-            PyPortableRegistry { registry }
+        #[pyo3(signature = (metadata, bytes_as_tuples=false))]
+        fn from_metadata_v15(metadata: &PyMetadataV15, bytes_as_tuples: bool) -> Self {
+            let registry = metadata.metadata.types.clone();
+            PyPortableRegistry {
+                registry,
+                bytes_as_tuples,
+            }
+        }
+
+        /*
+         * SCALE-encoded registry, much smaller and faster to load than the JSON one
+         */
+        fn to_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+            PyBytes::new(py, &self.registry.encode())
+        }
+
+        #[staticmethod]
+        #[pyo3(signature = (encoded, bytes_as_tuples=false))]
+        fn from_bytes(py: Python, encoded: Encoded<'_>, bytes_as_tuples: bool) -> PyResult<Self> {
+            encoded
+                .parse(py, 0, None, |encoded| {
+                    let (registry, consumed) =
+                        errors::decode_prefix(encoded, 0, "PortableRegistry")?;
+                    errors::check_trailing_bytes(encoded, consumed, 0, "PortableRegistry")?;
+                    Ok::<_, DecodeFailure>(PyPortableRegistry {
+                        registry,
+                        bytes_as_tuples,
+                    })
+                })?
+                .map_err(|failure| failure.into_pyerr(py))
         }
     }
 
-    fn composite_to_py_object<'py>(
-        py: Python<'py>,
-        value: Composite<u32>,
-    ) -> PyResult<Bound<'py, PyAny>> {
-        match value {
-            Composite::Named(inner_) => {
-                let dict = PyDict::new(py);
-                for (key, val) in inner_.iter() {
-                    let val_py = value_to_pyobject(py, val.clone())?;
-                    dict.set_item(key, val_py)?;
-                }
+    #[pyclass(name = "CompiledRegistry", frozen)]
+    pub struct PyCompiledRegistry {
+        // Readers take a snapshot and drop the lock at once, so no guard is held while
+        // Python code runs (which needs the GIL another thread may hold while waiting for
+        // the lock). Adding a type string copies the registry if a snapshot is still in use.
+        inner: RwLock<Arc<CompiledRegistry>>,
+        // Decode plans by type id, built on first use
+        plans: Mutex<HashMap<u32, Arc<DecodePlan>>>,
+        // Decoded values by type id and payload, once enable_decode_cache is called
+        decode_cache: Mutex<Option<DecodeCache>>,
+        // Shared by every decode plan built from the registry
+        plan_options: PlanOptions,
+    }
 
-                Ok(dict.into_pyobject(py)?.into_any())
+    impl PyCompiledRegistry {
+        fn new(registry: scale_info::PortableRegistry, plan_options: PlanOptions) -> Self {
+            PyCompiledRegistry {
+                inner: RwLock::new(Arc::new(CompiledRegistry::new(registry))),
+                plans: Mutex::new(HashMap::new()),
+                decode_cache: Mutex::new(None),
+                plan_options,
             }
-            Composite::Unnamed(inner_) => {
-                let tuple = PyTuple::new(
-                    py,
-                    inner_
-                        .iter()
-                        .map(|val| value_to_pyobject(py, val.clone()))
-                        .collect::<PyResult<Vec<Bound<'py, PyAny>>>>()?,
-                );
+        }
+
+        fn lock_decode_cache(&self) -> std::sync::MutexGuard<'_, Option<DecodeCache>> {
+            self.decode_cache
+                .lock()
+                .expect("CompiledRegistry lock poisoned")
+        }
 
-                Ok(tuple.unwrap().into_any())
+        /*
+         * Returns the cached value of the type decoded from encoded, or decodes and caches it.
+         * The lock is not held while decoding, which may release the GIL.
+         */
+        fn decode_cached(
+            &self,
+            py: Python,
+            type_id: u32,
+            encoded: &[u8],
+            decode: impl FnOnce() -> PyResult<Py<PyAny>>,
+        ) -> PyResult<Py<PyAny>> {
+            let key = DecodeCache::key(type_id, encoded);
+            let cached = self
+                .lock_decode_cache()
+                .as_mut()
+                .map(|cache| cache.get(py, key, encoded));
+            match cached {
+                Some(Some(value)) => return Ok(value),
+                Some(None) => {}
+                None => return decode(),
             }
+
+            let value = decode()?;
+            // Evicted values are released once the lock is
+            let _evicted = match self.lock_decode_cache().as_mut() {
+                Some(cache) => cache.insert(key, encoded, value.clone_ref(py)),
+                None => Vec::new(),
+            };
+
+            Ok(value)
         }
-    }
 
-    fn value_to_pyobject<'py>(py: Python<'py>, value: Value<u32>) -> PyResult<Bound<'py, PyAny>> {
-        match value.value {
-            ValueDef::<u32>::Primitive(inner) => {
-                let value = match inner {
-                    Primitive::U128(value) => value.into_pyobject(py)?.into_any(),
-                    Primitive::U256(value) => value.into_pyobject(py)?.into_any(),
-                    Primitive::I128(value) => value.into_pyobject(py)?.into_any(),
-                    Primitive::I256(value) => value.into_pyobject(py)?.into_any(),
-                    Primitive::Bool(value) => {
-                        let bound = value.into_pyobject(py)?;
-                        Bound::clone(&bound).into_any()
-                    }
-                    Primitive::Char(value) => value.into_pyobject(py)?.into_any(),
-                    Primitive::String(value) => value.into_pyobject(py)?.into_any(),
-                };
+        /*
+         * Returns the decode plan for the type id, building and caching it if needed
+         */
+        fn decode_plan(&self, py: Python, type_id: u32) -> PyResult<Arc<DecodePlan>> {
+            if let Some(plan) = self
+                .plans
+                .lock()
+                .expect("CompiledRegistry lock poisoned")
+                .get(&type_id)
+            {
+                return Ok(plan.clone());
+            }
 
-                Ok(value)
+            let registry = self.read();
+            let plan = DecodePlan::new(py, &registry.registry, type_id, self.plan_options.clone())
+                .map_err(|e| {
+                    PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                        "Failed to build decode plan for type id: {:?}: {}",
+                        type_id, e
+                    ))
+                })?;
+
+            // Another thread may have built the plan meanwhile; the first one is kept, and
+            // ours is dropped after the lock is released
+            let plan = Arc::new(plan);
+            let cached = self
+                .plans
+                .lock()
+                .expect("CompiledRegistry lock poisoned")
+                .entry(type_id)
+                .or_insert_with(|| plan.clone())
+                .clone();
+
+            Ok(cached)
+        }
+
+        /*
+         * A snapshot of the registry, which stays valid while type strings are added
+         */
+        fn read(&self) -> Arc<CompiledRegistry> {
+            self.inner
+                .read()
+                .expect("CompiledRegistry lock poisoned")
+                .clone()
+        }
+
+        /*
+         * Returns the type id of the type string.
+         * Type strings seen before only take the read lock; new ones are added to the registry.
+         */
+        fn type_id_from_type_string(&self, type_string: &str) -> PyResult<u32> {
+            if let Some(type_id) = self.read().lookup_type_string(type_string) {
+                return Ok(type_id);
             }
-            ValueDef::<u32>::BitSequence(inner) => {
-                let value = inner.to_vec().into_pyobject(py)?.into_any();
 
-                Ok(value)
+            let mut inner = self.inner.write().expect("CompiledRegistry lock poisoned");
+            Arc::make_mut(&mut inner)
+                .get_type_id(type_string)
+                .ok_or(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                    "Failed to get type id from type string: {:?}",
+                    type_string
+                )))
+        }
+    }
+
+    fn plan_options(bytes_as_tuples: bool, intern_account_ids: bool) -> PlanOptions {
+        PlanOptions {
+            bytes_as_tuples,
+            account_ids: intern_account_ids.then(Default::default),
+        }
+    }
+
+    #[pymethods]
+    impl PyCompiledRegistry {
+        #[staticmethod]
+        #[pyo3(signature = (portable_registry, bytes_as_tuples=None, intern_account_ids=false))]
+        fn from_portable_registry(
+            portable_registry: &PyPortableRegistry,
+            bytes_as_tuples: Option<bool>,
+            intern_account_ids: bool,
+        ) -> Self {
+            // Unless given, as set on the PortableRegistry
+            let bytes_as_tuples = bytes_as_tuples.unwrap_or(portable_registry.bytes_as_tuples);
+            PyCompiledRegistry::new(
+                portable_registry.registry.clone(),
+                plan_options(bytes_as_tuples, intern_account_ids),
+            )
+        }
+
+        #[staticmethod]
+        #[pyo3(signature = (metadata, bytes_as_tuples=false, intern_account_ids=false))]
+        fn from_metadata_v15(
+            metadata: &PyMetadataV15,
+            bytes_as_tuples: bool,
+            intern_account_ids: bool,
+        ) -> Self {
+            PyCompiledRegistry::new(
+                metadata.metadata.types.clone(),
+                plan_options(bytes_as_tuples, intern_account_ids),
+            )
+        }
+
+        /*
+         * Drops the objects kept for interned AccountIds, if interning
+         */
+        fn clear_interned_account_ids(&self) {
+            if let Some(account_ids) = &self.plan_options.account_ids {
+                account_ids.clear();
             }
-            ValueDef::<u32>::Composite(inner) => {
-                let value = composite_to_py_object(py, inner)?;
+        }
 
-                Ok(value)
+        #[getter]
+        fn get_registry(&self) -> String {
+            serde_json::to_string(&self.read().registry).unwrap()
+        }
+
+        #[pyo3(signature = (max_bytes=64 * 1024 * 1024, max_entries=4096))]
+        fn enable_decode_cache(&self, max_bytes: usize, max_entries: usize) {
+            *self.lock_decode_cache() = Some(DecodeCache::new(max_bytes, max_entries));
+        }
+
+        fn disable_decode_cache(&self) {
+            *self.lock_decode_cache() = None;
+        }
+
+        fn clear_decode_cache(&self) {
+            if let Some(cache) = self.lock_decode_cache().as_mut() {
+                cache.clear();
             }
-            ValueDef::<u32>::Variant(inner) => {
-                if inner.name == "None" || inner.name == "Some" {
-                    match inner.name.as_str() {
-                        "None" => Ok(py.None().into_bound(py)),
-                        "Some" => {
-                            let some = composite_to_py_object(py, inner.values.clone())?;
-                            if inner.values.len() == 1 {
-                                let tuple = some
-                                    .downcast::<PyTuple>()
-                                    .expect("Failed to downcast back to a tuple");
-                                Ok(tuple.get_item(0).expect("Failed to get item from tuple"))
-                            } else {
-                                Ok(some.into_pyobject(py)?.into_any())
-                            }
-                        }
-                        _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
-                            "Invalid variant name: {} for Option",
-                            inner.name
-                        ))),
-                    }
-                } else {
-                    let value = PyDict::new(py);
-                    value.set_item(
-                        inner.name.clone(),
-                        composite_to_py_object(py, inner.values)?,
-                    )?;
+        }
 
-                    Ok(value.into_pyobject(py)?.into_any())
-                }
+        fn decode_cache_info<'py>(&self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyDict>>> {
+            self.lock_decode_cache()
+                .as_ref()
+                .map(|cache| cache.info(py))
+                .transpose()
+        }
+    }
+
+    /// The registry argument of the type-string functions.
+    /// A PortableRegistry is compiled for the duration of the call,
+    /// a CompiledRegistry is reused as-is.
+    #[derive(FromPyObject)]
+    enum RegistryArg<'py> {
+        Compiled(PyRef<'py, PyCompiledRegistry>),
+        Portable(PyRef<'py, PyPortableRegistry>),
+    }
+
+    enum CompiledRef<'a> {
+        Borrowed(&'a PyCompiledRegistry),
+        Owned(PyCompiledRegistry),
+    }
+
+    impl Deref for CompiledRef<'_> {
+        type Target = PyCompiledRegistry;
+
+        fn deref(&self) -> &PyCompiledRegistry {
+            match self {
+                CompiledRef::Borrowed(compiled) => compiled,
+                CompiledRef::Owned(compiled) => compiled,
             }
         }
     }
 
-    fn py_isinstance(py: Python, value: &Py<PyAny>, type_name: &str) -> PyResult<bool> {
-        let locals = PyDict::new(py);
-        locals.set_item("value", value)?;
+    impl RegistryArg<'_> {
+        fn compiled(&self) -> CompiledRef<'_> {
+            match self {
+                RegistryArg::Compiled(compiled) => CompiledRef::Borrowed(&**compiled),
+                RegistryArg::Portable(portable) => CompiledRef::Owned(PyCompiledRegistry::new(
+                    portable.registry.clone(),
+                    plan_options(portable.bytes_as_tuples, false),
+                )),
+            }
+        }
 
-        let code = CString::new(format!("ret = isinstance(value, {})", type_name))
-            .expect("CString conversion failed");
-        py.run(&code, None, Some(&locals)).map_err(|e| {
-            PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
-                "Error checking isinstance of: {}: {:?}",
-                type_name, e
-            ))
-        })?;
-        let ret = locals.get_item("ret").unwrap().unwrap();
-        let result = ret.extract::<bool>()?;
+        /*
+         * Returns a CompiledRegistry that can be kept beyond the call
+         */
+        fn into_shared(self, py: Python<'_>) -> PyResult<Py<PyCompiledRegistry>> {
+            match self {
+                RegistryArg::Compiled(compiled) => Ok(compiled.into()),
+                RegistryArg::Portable(portable) => Py::new(
+                    py,
+                    PyCompiledRegistry::new(
+                        portable.registry.clone(),
+                        plan_options(portable.bytes_as_tuples, false),
+                    ),
+                ),
+            }
+        }
+    }
 
-        Ok(result)
+    /// A type string compiled against a registry.
+    /// Holds the resolved type id and a decode plan, so decoding skips type-string parsing
+    /// and type id resolution entirely.
+    #[pyclass(name = "CompiledType", frozen)]
+    struct PyCompiledType {
+        type_string: String,
+        type_id: u32,
+        registry: Py<PyCompiledRegistry>,
+        plan: Arc<DecodePlan>,
     }
 
-    fn py_is_positive(py: Python, value: &Py<PyInt>) -> PyResult<bool> {
-        let locals = PyDict::new(py);
-        locals.set_item("value", value)?;
+    impl PyCompiledType {
+        fn encode_bytes(&self, py: Python, to_encode: &Py<PyAny>) -> PyResult<Vec<u8>> {
+            let registry = self.registry.get().read();
 
-        py.run(c"ret = value >= 0", None, Some(&locals))?;
-        let ret = locals.get_item("ret").unwrap().unwrap();
-        let result = ret.extract::<bool>()?;
+            encode_type_id(
+                py,
+                &registry.registry,
+                &self.type_string,
+                self.type_id,
+                to_encode,
+            )
+        }
 
-        Ok(result)
+        fn materialize(
+            &self,
+            py: Python,
+            parsed: &Result<Vec<Token>, String>,
+        ) -> PyResult<Py<PyAny>> {
+            parsed
+                .as_ref()
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e.clone()))
+                .and_then(|tokens| self.plan.materialize(py, tokens))
+                .map(|value| value.unbind())
+                .map_err(|e| {
+                    PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                        "Failed to decode type: {:?} with type id: {:?}: {}",
+                        self.type_string, self.type_id, e
+                    ))
+                })
+        }
     }
 
-    fn py_has_dict_method(py: Python, value: &Py<PyAny>) -> PyResult<bool> {
-        let locals = PyDict::new(py);
-        locals.set_item("value", value)?;
+    #[pymethods]
+    impl PyCompiledType {
+        #[getter]
+        fn type_string(&self) -> &str {
+            &self.type_string
+        }
+
+        #[getter]
+        fn type_id(&self) -> u32 {
+            self.type_id
+        }
+
+        #[pyo3(signature = (encoded, offset=0, length=None, strict=true, allow_trailing_bytes=true))]
+        fn decode(
+            &self,
+            py: Python,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+            strict: bool,
+            allow_trailing_bytes: bool,
+        ) -> PyResult<Py<PyAny>> {
+            decode_cached_with_plan(
+                py,
+                self.registry.get(),
+                self.type_id,
+                &self.plan,
+                &self.type_string,
+                &encoded,
+                offset,
+                length,
+                strict,
+                allow_trailing_bytes,
+            )
+        }
 
-        py.run(c"ret = hasattr(value, '__dict__')", None, Some(&locals))?;
-        let ret = locals.get_item("ret").unwrap().unwrap();
-        let result = ret.extract::<bool>()?;
+        #[pyo3(signature = (encoded, offset=0))]
+        fn decode_with_offset(
+            &self,
+            py: Python,
+            encoded: Encoded<'_>,
+            offset: usize,
+        ) -> PyResult<(Py<PyAny>, usize)> {
+            decode_prefix_with_plan(py, &self.plan, &self.type_string, &encoded, offset)
+        }
 
-        Ok(result)
+        #[pyo3(signature = (encoded, offset=0, length=None))]
+        fn decode_iter(
+            &self,
+            py: Python,
+            encoded: Encoded<'_>,
+            offset: usize,
+            length: Option<usize>,
+        ) -> PyResult<PyVecIterator> {
+            PyVecIterator::from_plan(
+                py,
+                encoded,
+                offset,
+                length,
+                self.plan.clone(),
+                &self.type_string,
+            )
+        }
+
+        #[pyo3(signature = (list_encoded, workers=None))]
+        fn decode_many(
+            &self,
+            py: Python,
+            list_encoded: Vec<Encoded<'_>>,
+            workers: Option<usize>,
+        ) -> PyResult<Vec<Py<PyAny>>> {
+            let jobs = list_encoded
+                .iter()
+                .map(|encoded| (self.plan.as_ref(), encoded.as_bytes()))
+                .collect::<Vec<(&DecodePlan, &[u8])>>();
+            let release_gil = list_encoded.iter().all(|encoded| encoded.is_readonly());
+
+            parse_many(py, &jobs, workers, release_gil)?
+                .iter()
+                .map(|parsed| self.materialize(py, parsed))
+                .collect()
+        }
+
+        #[pyo3(signature = (to_encode, as_list=false))]
+        fn encode(&self, py: Python, to_encode: Py<PyAny>, as_list: bool) -> PyResult<Py<PyAny>> {
+            let encoded = self.encode_bytes(py, &to_encode)?;
+
+            encoded_to_py(py, &encoded, as_list)
+        }
+
+        #[pyo3(signature = (to_encode, buffer, offset=0))]
+        fn encode_into(
+            &self,
+            py: Python,
+            to_encode: Py<PyAny>,
+            buffer: &Bound<'_, PyAny>,
+            offset: usize,
+        ) -> PyResult<usize> {
+            let encoded = self.encode_bytes(py, &to_encode)?;
+
+            encoded::write_to_buffer(buffer, offset, &encoded)
+        }
+
+        fn __repr__(&self) -> String {
+            format!("CompiledType({:?})", self.type_string)
+        }
     }
 
     fn py_to_dict<'py>(py: Python<'py>, value: &Py<PyAny>) -> PyResult<Bound<'py, PyDict>> {
@@ -524,8 +1204,8 @@ mod bt_decode {
         ty: &scale_info::Type<PortableForm>,
         type_id: u32,
     ) -> PyResult<Value<u32>> {
-        if py_is_positive(py, py_int)? {
-            let value = py_int.extract::<u128>(py)?;
+        // Non-negative ints fit in u128 (or are too large for any type); only negative ones don't
+        if let Ok(value) = py_int.extract::<u128>(py) {
             match &ty.type_def {
                 scale_info::TypeDef::Primitive(scale_info::TypeDefPrimitive::U128) => {
                     let value =
@@ -593,12 +1273,79 @@ mod bt_decode {
         }
     }
 
+    /*
+     * Whether ty is a [u8; 32], or a composite around a single one, e.g. AccountId32
+     */
+    fn is_public_key_type(
+        ty: &scale_info::Type<PortableForm>,
+        registry: &scale_info::PortableRegistry,
+    ) -> bool {
+        match &ty.type_def {
+            scale_info::TypeDef::Array(inner) => {
+                inner.len == 32
+                    && matches!(
+                        registry
+                            .resolve(inner.type_param.id)
+                            .map(|item| &item.type_def),
+                        Some(scale_info::TypeDef::Primitive(
+                            scale_info::TypeDefPrimitive::U8
+                        ))
+                    )
+            }
+            scale_info::TypeDef::Composite(TypeDefComposite { fields }) => {
+                match fields.as_slice() {
+                    [field] => registry
+                        .resolve(field.ty.id)
+                        .is_some_and(|inner| is_public_key_type(inner, registry)),
+                    _ => false,
+                }
+            }
+            _ => false,
+        }
+    }
+
+    /*
+     * Encodes an item of a list or tuple. An int for an unsigned primitive, e.g. the u16s of a
+     * weights payload, becomes its Value directly; anything else takes the full conversion.
+     */
+    fn item_to_value(
+        py: Python,
+        item: &Bound<'_, PyAny>,
+        ty: &scale_info::Type<PortableForm>,
+        type_id: u32,
+        registry: &scale_info::PortableRegistry,
+    ) -> PyResult<Value<u32>> {
+        if matches!(
+            ty.type_def,
+            scale_info::TypeDef::Primitive(
+                scale_info::TypeDefPrimitive::U8
+                    | scale_info::TypeDefPrimitive::U16
+                    | scale_info::TypeDefPrimitive::U32
+                    | scale_info::TypeDefPrimitive::U64
+                    | scale_info::TypeDefPrimitive::U128
+            )
+        ) && item.is_exact_instance_of::<PyInt>()
+        {
+            if let Ok(value) = item.extract::<u128>() {
+                return Ok(Value::with_context(
+                    ValueDef::Primitive(Primitive::U128(value)),
+                    type_id,
+                ));
+            }
+        }
+
+        pyobject_to_value(py, item.as_unbound(), ty, type_id, registry)
+    }
+
+    /*
+     * Encodes a list or tuple, iterated in place
+     */
     fn pylist_to_value(
         py: Python,
-        py_list: &Bound<'_, PyList>,
+        py_list: &Bound<'_, PyAny>,
         ty: &scale_info::Type<PortableForm>,
         type_id: u32,
-        portable_registry: &PyPortableRegistry,
+        registry: &scale_info::PortableRegistry,
     ) -> PyResult<Value<u32>> {
         log::debug!(target: "btdecode", "encoding a list-like type {:?}", py_list);
         log::debug!(target: "btdecode", "type_id: {:?}", type_id);
@@ -606,8 +1353,7 @@ mod bt_decode {
             scale_info::TypeDef::Array(inner) => {
                 let ty_param = inner.type_param;
                 let ty_param_id: u32 = ty_param.id;
-                let ty_ = portable_registry
-                    .registry
+                let ty_ = registry
                     .resolve(ty_param_id)
                     .unwrap_or_else(|| panic!("Failed to resolve type (1): {:?}", ty_param));
                 log::debug!(target: "btdecode", "ty_param: {:?}", ty_param);
@@ -615,16 +1361,8 @@ mod bt_decode {
                 log::debug!(target: "btdecode", "ty_: {:?}", ty_);
 
                 let items = py_list
-                    .iter()
-                    .map(|item| {
-                        pyobject_to_value(
-                            py,
-                            item.as_any().as_unbound(),
-                            ty_,
-                            ty_param_id,
-                            portable_registry,
-                        )
-                    })
+                    .try_iter()?
+                    .map(|item| item_to_value(py, &item?, ty_, ty_param_id, registry))
                     .collect::<PyResult<Vec<Value<u32>>>>()?;
 
                 let value =
@@ -632,23 +1370,15 @@ mod bt_decode {
                 Ok(value)
             }
             scale_info::TypeDef::Tuple(_inner) => {
-                dbg!(_inner, py_list);
                 let items = py_list
-                    .iter()
-                    .zip(_inner.fields.clone())
+                    .try_iter()?
+                    .zip(_inner.fields.iter())
                     .map(|(item, ty_)| {
                         let ty_id: u32 = ty_.id;
-                        let ty_ = portable_registry
-                            .registry
+                        let ty_ = registry
                             .resolve(ty_id)
                             .unwrap_or_else(|| panic!("Failed to resolve type (1): {:?}", ty_));
-                        pyobject_to_value(
-                            py,
-                            item.as_any().as_unbound(),
-                            ty_,
-                            ty_id,
-                            portable_registry,
-                        )
+                        item_to_value(py, &item?, ty_, ty_id, registry)
                     })
                     .collect::<PyResult<Vec<Value<u32>>>>()?;
 
@@ -659,22 +1389,13 @@ mod bt_decode {
             scale_info::TypeDef::Sequence(inner) => {
                 let ty_param = inner.type_param;
                 let ty_param_id: u32 = ty_param.id;
-                let ty_ = portable_registry
-                    .registry
+                let ty_ = registry
                     .resolve(ty_param_id)
                     .unwrap_or_else(|| panic!("Failed to resolve type (1): {:?}", ty_param));
 
                 let items = py_list
-                    .iter()
-                    .map(|item| {
-                        pyobject_to_value(
-                            py,
-                            item.as_any().as_unbound(),
-                            ty_,
-                            ty_param_id,
-                            portable_registry,
-                        )
-                    })
+                    .try_iter()?
+                    .map(|item| item_to_value(py, &item?, ty_, ty_param_id, registry))
                     .collect::<PyResult<Vec<Value<u32>>>>()?;
 
                 let value =
@@ -691,25 +1412,15 @@ mod bt_decode {
 
                 let vals = fields
                     .iter()
-                    .zip(py_list)
+                    .zip(py_list.try_iter()?)
                     .map(|(field, item)| {
-                        let ty_ = portable_registry
-                            .registry
-                            .resolve(field.ty.id)
-                            .unwrap_or_else(|| {
-                                panic!("Failed to resolve type for field: {:?}", field)
-                            });
-
-                        pyobject_to_value(
-                            py,
-                            item.as_any().as_unbound(),
-                            ty_,
-                            field.ty.id,
-                            portable_registry,
-                        )
-                        .unwrap()
+                        let ty_ = registry.resolve(field.ty.id).unwrap_or_else(|| {
+                            panic!("Failed to resolve type for field: {:?}", field)
+                        });
+
+                        item_to_value(py, &item?, ty_, field.ty.id, registry)
                     })
-                    .collect::<Vec<Value<u32>>>();
+                    .collect::<PyResult<Vec<Value<u32>>>>()?;
 
                 let value =
                     Value::with_context(ValueDef::Composite(Composite::Unnamed(vals)), type_id);
@@ -727,7 +1438,7 @@ mod bt_decode {
         to_encode: &Py<PyAny>,
         ty: &scale_info::Type<PortableForm>,
         type_id: u32,
-        portable_registry: &PyPortableRegistry,
+        registry: &scale_info::PortableRegistry,
     ) -> PyResult<Value<u32>> {
         log::debug!(target: "btdecode", "encoding a non-option type {:?} {:?}", ty, to_encode);
         log::debug!(target: "btdecode", "type_id: {:?}", type_id);
@@ -740,9 +1451,11 @@ mod bt_decode {
             )));
         }
 
-        if py_isinstance(py, to_encode, "bool")? {
+        let bound = to_encode.bind(py);
+
+        if bound.is_instance_of::<PyBool>() {
             log::debug!(target: "btdecode", "encoding to bool");
-            let value = to_encode.extract::<bool>(py)?;
+            let value = bound.downcast::<PyBool>()?.is_true();
 
             match ty.type_def {
                 scale_info::TypeDef::Primitive(scale_info::TypeDefPrimitive::Bool) => {
@@ -755,7 +1468,7 @@ mod bt_decode {
                     value
                 ))),
             }
-        } else if py_isinstance(py, to_encode, "str")? {
+        } else if bound.is_instance_of::<PyString>() {
             log::debug!(target: "btdecode", "encoding to str");
             if to_encode.extract::<char>(py).is_ok()
                 && matches!(
@@ -778,6 +1491,13 @@ mod bt_decode {
                         return Ok(value);
                     }
                     _ => {
+                        // An SS58 address, for an AccountId32 or other 32-byte public key
+                        if is_public_key_type(ty, registry) {
+                            if let Ok((public_key, _)) = ss58::ss58_decode(&str_value) {
+                                let public_key = PyBytes::new(py, &public_key).into_any().unbind();
+                                return pyobject_to_value(py, &public_key, ty, type_id, registry);
+                            }
+                        }
                         return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                             "Invalid type for string data: {}",
                             str_value
@@ -790,14 +1510,14 @@ mod bt_decode {
                     to_encode
                 )));
             }
-        } else if py_isinstance(py, to_encode, "int")?
+        } else if bound.is_instance_of::<PyInt>()
             && matches!(&ty.type_def, scale_info::TypeDef::Primitive(_))
         {
             log::debug!(target: "btdecode", "encoding as primitive int");
             let as_py_int = to_encode.downcast_bound::<PyInt>(py)?.as_unbound();
 
             return int_type_def_to_value(py, as_py_int, ty, type_id);
-        } else if py_isinstance(py, to_encode, "int")?
+        } else if bound.is_instance_of::<PyInt>()
             && matches!(&ty.type_def, scale_info::TypeDef::Compact(_))
         {
             log::debug!(target: "btdecode", "encoding as compact int");
@@ -806,7 +1526,7 @@ mod bt_decode {
 
             if let scale_info::TypeDef::Compact(inner) = &ty.type_def {
                 let inner_type_id = inner.type_param.id;
-                let inner_type_ = portable_registry.registry.resolve(inner_type_id);
+                let inner_type_ = registry.resolve(inner_type_id);
                 if let Some(inner_type) = inner_type_ {
                     let mut inner_value =
                         int_type_def_to_value(py, as_py_int, inner_type, inner_type_id)?;
@@ -819,28 +1539,27 @@ mod bt_decode {
                 "Invalid type for u128 data: {}",
                 to_encode
             )));
-        } else if py_isinstance(py, to_encode, "tuple")? {
+        } else if bound.is_instance_of::<PyTuple>() {
             log::debug!(target: "btdecode", "encoding as tuple");
             let tuple_value = to_encode.downcast_bound::<PyTuple>(py)?;
-            let as_list = tuple_value.to_list();
 
-            pylist_to_value(py, &as_list, ty, type_id, portable_registry).map_err(|_e| {
+            pylist_to_value(py, tuple_value.as_any(), ty, type_id, registry).map_err(|_e| {
                 PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                     "Invalid type for tuple data: {}",
                     tuple_value
                 ))
             })
-        } else if py_isinstance(py, to_encode, "list")? {
+        } else if bound.is_instance_of::<PyList>() {
             log::debug!(target: "btdecode", "encoding as list");
             let as_list = to_encode.downcast_bound::<PyList>(py)?;
 
-            pylist_to_value(py, as_list, ty, type_id, portable_registry).map_err(|_e| {
+            pylist_to_value(py, as_list.as_any(), ty, type_id, registry).map_err(|_e| {
                 PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                     "Invalid type for list data: {}",
                     as_list
                 ))
             })
-        } else if py_isinstance(py, to_encode, "dict")? {
+        } else if bound.is_instance_of::<PyDict>() {
             log::debug!(target: "btdecode", "encoding as dict");
             let py_dict = to_encode.downcast_bound::<PyDict>(py)?;
 
@@ -871,22 +1590,19 @@ mod bt_decode {
                             )
                             ))?;
 
-                        let inner_type = portable_registry
-                            .registry
-                            .resolve(field.ty.id)
-                            .unwrap_or_else(|| {
-                                panic!(
-                                    "Inner type: {:?} was not in registry after being registered",
-                                    field.ty
-                                )
-                            });
+                        let inner_type = registry.resolve(field.ty.id).unwrap_or_else(|| {
+                            panic!(
+                                "Inner type: {:?} was not in registry after being registered",
+                                field.ty
+                            )
+                        });
 
                         let as_value = pyobject_to_value(
                             py,
                             value_from_dict.as_unbound(),
                             inner_type,
                             field.ty.id,
-                            portable_registry,
+                            registry,
                         )?;
 
                         dict.push((field_name, as_value));
@@ -903,9 +1619,62 @@ mod bt_decode {
                     )));
                 }
             }
+        } else if let Ok(py_bytes) = bound.downcast::<PyBytes>() {
+            // A composite around a single field, e.g. AccountId32, encodes from the field's bytes
+            if let scale_info::TypeDef::Composite(TypeDefComposite { fields }) = &ty.type_def {
+                if let [field] = fields.as_slice() {
+                    let Some(inner_type) = registry.resolve(field.ty.id) else {
+                        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                            "Failed to resolve type for field: {:?}",
+                            field
+                        )));
+                    };
+                    let inner =
+                        pyobject_to_value(py, to_encode, inner_type, field.ty.id, registry)?;
+                    let composite = match &field.name {
+                        Some(name) => Composite::Named(vec![(name.clone(), inner)]),
+                        None => Composite::Unnamed(vec![inner]),
+                    };
+                    return Ok(Value::with_context(ValueDef::Composite(composite), type_id));
+                }
+            }
+
+            // Decoded u8 sequences and arrays are bytes, so each byte is a u8 item
+            let item_type_id = match &ty.type_def {
+                scale_info::TypeDef::Sequence(inner) => Some(inner.type_param.id),
+                scale_info::TypeDef::Array(inner) => Some(inner.type_param.id),
+                _ => None,
+            };
+            if let Some(item_type_id) = item_type_id {
+                if let Some(scale_info::TypeDef::Primitive(scale_info::TypeDefPrimitive::U8)) =
+                    registry
+                        .resolve(item_type_id)
+                        .map(|item_type| &item_type.type_def)
+                {
+                    log::debug!(target: "btdecode", "encoding bytes as u8 items");
+                    let items = py_bytes
+                        .as_bytes()
+                        .iter()
+                        .map(|byte| {
+                            Value::with_context(
+                                ValueDef::Primitive(Primitive::U128(*byte as u128)),
+                                item_type_id,
+                            )
+                        })
+                        .collect::<Vec<Value<u32>>>();
+                    return Ok(Value::with_context(
+                        ValueDef::Composite(Composite::Unnamed(items)),
+                        type_id,
+                    ));
+                }
+            }
 
-        //} else if let Ok(value) = to_encode.downcast_bound::<PyBytes>(py) {
-        } else if py_has_dict_method(py, to_encode)? {
+            log::debug!(target: "btdecode", "encoding bytes as list");
+            // Other types, e.g. Vec<u16>, take the bytes as a list of ints
+            let as_list = PyList::new(py, py_bytes.as_bytes())?;
+
+            pylist_to_value(py, as_list.as_any(), ty, type_id, registry)
+        } else if bound.hasattr(intern!(py, "__dict__"))? {
             log::debug!(target: "btdecode", "encoding object as dict");
             // Convert object to dict
             let py_dict = py_to_dict(py, to_encode)?;
@@ -936,22 +1705,19 @@ mod bt_decode {
                             )
                             ))?;
 
-                        let inner_type = portable_registry
-                            .registry
-                            .resolve(field.ty.id)
-                            .unwrap_or_else(|| {
-                                panic!(
-                                    "Inner type: {:?} was not in registry after being registered",
-                                    field.ty
-                                )
-                            });
+                        let inner_type = registry.resolve(field.ty.id).unwrap_or_else(|| {
+                            panic!(
+                                "Inner type: {:?} was not in registry after being registered",
+                                field.ty
+                            )
+                        });
 
                         let as_value = pyobject_to_value(
                             py,
                             value_from_dict.as_unbound(),
                             inner_type,
                             field.ty.id,
-                            portable_registry,
+                            registry,
                         )?;
 
                         dict.push((field_name, as_value));
@@ -983,7 +1749,7 @@ mod bt_decode {
         to_encode: &Py<PyAny>,
         ty: &scale_info::Type<PortableForm>,
         type_id: u32,
-        portable_registry: &PyPortableRegistry,
+        registry: &scale_info::PortableRegistry,
     ) -> PyResult<Value<u32>> {
         // Check if the expected type is an option
         if let scale_info::TypeDef::Variant(inner) = &ty.type_def {
@@ -1012,8 +1778,7 @@ mod bt_decode {
                     // Some
                     // Get inner type
                     let inner_type_id: u32 = inner.variants[1].fields[0].ty.id;
-                    let inner_type: &scale_info::Type<PortableForm> = portable_registry
-                        .registry
+                    let inner_type: &scale_info::Type<PortableForm> = registry
                         .resolve(inner_type_id)
                         .ok_or(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                             "Could not find inner_type: {:?} for Option: {:?}",
@@ -1024,7 +1789,7 @@ mod bt_decode {
                         to_encode,
                         inner_type,
                         inner_type_id,
-                        portable_registry,
+                        registry,
                     )?;
                     let some_variant: scale_value::Variant<u32> =
                         Variant::unnamed_fields("Some", vec![inner_value]); // No fields because it's None
@@ -1037,114 +1802,401 @@ mod bt_decode {
             } // else: Regular conversion
         }
 
-        pyobject_to_value_no_option_check(py, to_encode, ty, type_id, portable_registry)
+        pyobject_to_value_no_option_check(py, to_encode, ty, type_id, registry)
     }
 
-    #[pyfunction(name = "decode")]
-    fn py_decode(
+    /*
+     * Parses a value of the plan's type from the front of encoded, which starts at base in the
+     * caller's input. Returns its tokens and the number of bytes it took.
+     */
+    fn parse_prefix<'a>(
+        plan: &DecodePlan,
+        type_string: &str,
+        encoded: &'a [u8],
+        base: usize,
+    ) -> Result<(Vec<Token<'a>>, usize), DecodeFailure> {
+        let mut input = encoded;
+        match plan.parse(&mut input) {
+            Ok(tokens) => Ok((tokens, encoded.len() - input.len())),
+            Err(err) => Err(DecodeFailure::new(type_string, base, encoded, input, err)),
+        }
+    }
+
+    /*
+     * Decodes a value of the plan's type from the encoded range.
+     * Without strict, returns (value, error), where error is a DecodeError or None; on error,
+     * value is the list of items decoded before it for sequences, and None otherwise.
+     */
+    fn decode_with_plan(
         py: Python,
+        plan: &DecodePlan,
         type_string: &str,
-        portable_registry: &PyPortableRegistry,
-        encoded: &[u8],
+        encoded: &Encoded<'_>,
+        offset: usize,
+        length: Option<usize>,
+        strict: bool,
+        allow_trailing_bytes: bool,
     ) -> PyResult<Py<PyAny>> {
-        // Create a memoization table for the type string to type id conversion
-        let mut memo = HashMap::<String, u32>::new();
+        let parsed = encoded.parse(py, offset, length, |encoded| {
+            let (tokens, consumed) = parse_prefix(plan, type_string, encoded, offset)?;
+            let trailing = match allow_trailing_bytes {
+                true => Ok(()),
+                false => errors::check_trailing_bytes(encoded, consumed, offset, type_string),
+            };
+            Ok::<_, DecodeFailure>((tokens, trailing))
+        })?;
 
-        let mut curr_registry = portable_registry.registry.clone();
+        let (value, failure) = match parsed {
+            Ok((tokens, trailing)) => (plan.materialize(py, &tokens)?.unbind(), trailing.err()),
+            Err(failure) if strict => return Err(failure.into_pyerr(py)),
+            Err(failure) => (
+                decode_partial_sequence(py, plan, encoded, offset, length)?,
+                Some(failure),
+            ),
+        };
+
+        if strict {
+            return match failure {
+                Some(failure) => Err(failure.into_pyerr(py)),
+                None => Ok(value),
+            };
+        }
 
-        fill_memo_using_well_known_types(&mut memo, &curr_registry);
+        let error = failure.map(|failure| failure.into_pyerr(py).into_value(py));
+        Ok((value, error).into_pyobject(py)?.into_any().unbind())
+    }
 
-        let type_id: u32 = get_type_id_from_type_string(&mut memo, type_string, &mut curr_registry)
-            .ok_or(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
-                "Failed to get type id from type string: {:?}",
-                type_string
-            )))?;
+    /*
+     * decode_with_plan, through the registry's decode cache if enabled.
+     * Only strict decodes that allow trailing bytes are cached, as their result depends on
+     * nothing but the type and the bytes.
+     */
+    fn decode_cached_with_plan(
+        py: Python,
+        registry: &PyCompiledRegistry,
+        type_id: u32,
+        plan: &DecodePlan,
+        type_string: &str,
+        encoded: &Encoded<'_>,
+        offset: usize,
+        length: Option<usize>,
+        strict: bool,
+        allow_trailing_bytes: bool,
+    ) -> PyResult<Py<PyAny>> {
+        let decode = || {
+            decode_with_plan(
+                py,
+                plan,
+                type_string,
+                encoded,
+                offset,
+                length,
+                strict,
+                allow_trailing_bytes,
+            )
+        };
+
+        if !(strict && allow_trailing_bytes) {
+            return decode();
+        }
 
-        let decoded = decode_as_type(&mut &encoded[..], type_id, &curr_registry).map_err(|_e| {
-            PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
-                "Failed to decode type: {:?} with type id: {:?}",
-                type_string, type_id
-            ))
-        })?;
+        registry.decode_cached(py, type_id, encoded.slice(offset, length)?, decode)
+    }
 
-        value_to_pyobject(py, decoded).map(|value| value.unbind())
+    /*
+     * Decodes a value of the plan's type starting at offset, returning it with the number of
+     * bytes it took
+     */
+    fn decode_prefix_with_plan(
+        py: Python,
+        plan: &DecodePlan,
+        type_string: &str,
+        encoded: &Encoded<'_>,
+        offset: usize,
+    ) -> PyResult<(Py<PyAny>, usize)> {
+        let (tokens, consumed) = encoded
+            .parse(py, offset, None, |encoded| {
+                parse_prefix(plan, type_string, encoded, offset)
+            })?
+            .map_err(|failure| failure.into_pyerr(py))?;
+
+        Ok((plan.materialize(py, &tokens)?.unbind(), consumed))
     }
 
-    #[pyfunction(name = "decode_list")]
-    fn py_decode_list(
+    /*
+     * The items of a sequence decoded before the first one that fails, or None for other types
+     */
+    fn decode_partial_sequence(
         py: Python,
+        plan: &DecodePlan,
+        encoded: &Encoded<'_>,
+        offset: usize,
+        length: Option<usize>,
+    ) -> PyResult<Py<PyAny>> {
+        let Some(item) = plan.sequence_item() else {
+            return Ok(py.None());
+        };
+
+        let mut input = encoded.slice(offset, length)?;
+        let items = PyList::empty(py);
+        if let Ok(len) = codec::Compact::<u32>::decode(&mut input) {
+            for _ in 0..len.0 {
+                match plan.parse_at(item, &mut input) {
+                    Ok(tokens) => items.append(plan.materialize_at(py, item, &tokens)?)?,
+                    Err(_) => break,
+                }
+            }
+        }
+
+        Ok(items.into_any().unbind())
+    }
+
+    #[pyfunction(name = "decode")]
+    #[pyo3(signature = (
+        type_string,
+        portable_registry,
+        encoded,
+        offset=0,
+        length=None,
+        strict=true,
+        allow_trailing_bytes=true,
+    ))]
+    fn py_decode<'py>(
+        py: Python<'py>,
+        type_string: &str,
+        portable_registry: RegistryArg<'py>,
+        encoded: Encoded<'py>,
+        offset: usize,
+        length: Option<usize>,
+        strict: bool,
+        allow_trailing_bytes: bool,
+    ) -> PyResult<Py<PyAny>> {
+        let compiled = portable_registry.compiled();
+
+        let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+        let plan = compiled.decode_plan(py, type_id)?;
+
+        decode_cached_with_plan(
+            py,
+            &compiled,
+            type_id,
+            &plan,
+            type_string,
+            &encoded,
+            offset,
+            length,
+            strict,
+            allow_trailing_bytes,
+        )
+    }
+
+    #[pyfunction(name = "decode_with_offset")]
+    #[pyo3(signature = (type_string, portable_registry, encoded, offset=0))]
+    fn py_decode_with_offset<'py>(
+        py: Python<'py>,
+        type_string: &str,
+        portable_registry: RegistryArg<'py>,
+        encoded: Encoded<'py>,
+        offset: usize,
+    ) -> PyResult<(Py<PyAny>, usize)> {
+        let compiled = portable_registry.compiled();
+
+        let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+        let plan = compiled.decode_plan(py, type_id)?;
+
+        decode_prefix_with_plan(py, &plan, type_string, &encoded, offset)
+    }
+
+    #[pyfunction(name = "decode_sequence")]
+    #[pyo3(signature = (
+        list_type_strings,
+        portable_registry,
+        encoded,
+        offset=0,
+        allow_trailing_bytes=true,
+    ))]
+    fn py_decode_sequence<'py>(
+        py: Python<'py>,
         list_type_strings: Vec<String>,
-        portable_registry: &PyPortableRegistry,
-        list_encoded: Vec<Vec<u8>>,
+        portable_registry: RegistryArg<'py>,
+        encoded: Encoded<'py>,
+        offset: usize,
+        allow_trailing_bytes: bool,
     ) -> PyResult<Vec<Py<PyAny>>> {
-        // Create a memoization table for the type string to type id conversion
-        let mut memo = HashMap::<String, u32>::new();
+        let compiled = portable_registry.compiled();
+
+        let plans = list_type_strings
+            .iter()
+            .map(|type_string| {
+                let type_id = compiled.type_id_from_type_string(type_string)?;
+                compiled.decode_plan(py, type_id)
+            })
+            .collect::<PyResult<Vec<Arc<DecodePlan>>>>()?;
+
+        let parsed = encoded
+            .parse(py, offset, None, |encoded| {
+                let mut position = 0;
+                let mut values = Vec::with_capacity(plans.len());
+                for (plan, type_string) in plans.iter().zip(&list_type_strings) {
+                    let (tokens, consumed) =
+                        parse_prefix(plan, type_string, &encoded[position..], offset + position)?;
+                    values.push(tokens);
+                    position += consumed;
+                }
 
-        let mut curr_registry = portable_registry.registry.clone();
+                if !allow_trailing_bytes {
+                    let type_path = format!("({})", list_type_strings.join(", "));
+                    errors::check_trailing_bytes(encoded, position, offset, &type_path)?;
+                }
 
-        fill_memo_using_well_known_types(&mut memo, &curr_registry);
+                Ok::<_, DecodeFailure>(values)
+            })?
+            .map_err(|failure| failure.into_pyerr(py))?;
 
-        let mut decoded_list = Vec::<Py<PyAny>>::new();
+        plans
+            .iter()
+            .zip(&parsed)
+            .map(|(plan, tokens)| Ok(plan.materialize(py, tokens)?.unbind()))
+            .collect()
+    }
 
-        for (type_string, encoded) in list_type_strings.iter().zip(list_encoded.iter()) {
-            let type_id: u32 =
-                get_type_id_from_type_string(&mut memo, type_string, &mut curr_registry).ok_or(
-                    PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
-                        "Failed to get type id from type string: {:?}",
-                        type_string
-                    )),
-                )?;
+    #[pyfunction(name = "decode_iter")]
+    #[pyo3(signature = (type_string, portable_registry, encoded, offset=0, length=None))]
+    fn py_decode_iter<'py>(
+        py: Python<'py>,
+        type_string: &str,
+        portable_registry: RegistryArg<'py>,
+        encoded: Encoded<'py>,
+        offset: usize,
+        length: Option<usize>,
+    ) -> PyResult<PyVecIterator> {
+        let compiled = portable_registry.compiled();
+
+        let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+        let plan = compiled.decode_plan(py, type_id)?;
+
+        PyVecIterator::from_plan(py, encoded, offset, length, plan, type_string)
+    }
+
+    /*
+     * Maps f over the jobs, concurrently with more than one worker.
+     * Every call shares rayon's global pool (one thread per CPU); the jobs are split into at
+     * most `workers` chunks, so a call keeps no more than that many of its threads busy.
+     * The results are in the same order as the jobs.
+     */
+    fn map_jobs<J, R, F>(jobs: &[J], workers: Option<usize>, f: F) -> PyResult<Vec<R>>
+    where
+        J: Sync,
+        R: Send,
+        F: Fn(&J) -> R + Send + Sync,
+    {
+        match workers {
+            None | Some(1) => Ok(jobs.iter().map(f).collect()),
+            Some(0) => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "workers must be at least 1",
+            )),
+            Some(workers) => {
+                let chunk_len = jobs.len().div_ceil(workers).max(1);
+                let chunks = jobs
+                    .par_chunks(chunk_len)
+                    .map(|chunk| chunk.iter().map(&f).collect::<Vec<R>>())
+                    .collect::<Vec<Vec<R>>>();
+                Ok(chunks.into_iter().flatten().collect())
+            }
+        }
+    }
 
-            let decoded =
-                decode_as_type(&mut &encoded[..], type_id, &curr_registry).map_err(|_e| {
+    /*
+     * Parses each payload with its plan, without the GIL if release_gil is set.
+     * With more than one worker, payloads are parsed concurrently on a thread pool.
+     * The results are in the same order as the jobs.
+     */
+    fn parse_many<'a>(
+        py: Python,
+        jobs: &[(&DecodePlan, &'a [u8])],
+        workers: Option<usize>,
+        release_gil: bool,
+    ) -> PyResult<Vec<Result<Vec<Token<'a>>, String>>> {
+        let parse = |&(plan, encoded): &(&DecodePlan, &'a [u8])| plan.parse(&mut &encoded[..]);
+        let parse_all = || map_jobs(jobs, workers, parse);
+
+        if !release_gil {
+            // Writable buffers could be changed by other Python threads while being read
+            return parse_all();
+        }
+
+        let total_len = jobs.iter().map(|(_, encoded)| encoded.len()).sum();
+        parse_without_gil(py, total_len, parse_all)
+    }
+
+    #[pyfunction(name = "decode_list")]
+    #[pyo3(signature = (list_type_strings, portable_registry, list_encoded, workers=None))]
+    fn py_decode_list<'py>(
+        py: Python<'py>,
+        list_type_strings: Vec<String>,
+        portable_registry: RegistryArg<'py>,
+        list_encoded: Vec<Encoded<'py>>,
+        workers: Option<usize>,
+    ) -> PyResult<Vec<Py<PyAny>>> {
+        let compiled = portable_registry.compiled();
+
+        // Resolve every type up front; parsing doesn't need the registry
+        let mut plans = Vec::<(u32, Arc<DecodePlan>)>::new();
+        for type_string in list_type_strings.iter().take(list_encoded.len()) {
+            let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+            plans.push((type_id, compiled.decode_plan(py, type_id)?));
+        }
+
+        let jobs = plans
+            .iter()
+            .zip(list_encoded.iter())
+            .map(|((_, plan), encoded)| (plan.as_ref(), encoded.as_bytes()))
+            .collect::<Vec<(&DecodePlan, &[u8])>>();
+        let release_gil = list_encoded.iter().all(|encoded| encoded.is_readonly());
+
+        let mut decoded_list = Vec::<Py<PyAny>>::with_capacity(jobs.len());
+
+        for ((type_string, (type_id, plan)), tokens) in list_type_strings
+            .iter()
+            .zip(plans.iter())
+            .zip(parse_many(py, &jobs, workers, release_gil)?.iter())
+        {
+            let decoded = tokens
+                .as_ref()
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e.clone()))
+                .and_then(|tokens| plan.materialize(py, tokens))
+                .map_err(|_e| {
                     PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                         "Failed to decode type: {:?} with type id: {:?}",
                         type_string, type_id
                     ))
                 })?;
 
-            decoded_list.push(value_to_pyobject(py, decoded).map(|value| value.unbind())?);
+            decoded_list.push(decoded.unbind());
         }
 
         Ok(decoded_list)
     }
 
-    #[pyfunction(name = "encode")]
-    fn py_encode(
+    fn encode_type_id(
         py: Python,
+        registry: &scale_info::PortableRegistry,
         type_string: &str,
-        portable_registry: &PyPortableRegistry,
-        to_encode: Py<PyAny>,
+        type_id: u32,
+        to_encode: &Py<PyAny>,
     ) -> PyResult<Vec<u8>> {
-        // Initialize logging
-        let _ = pyo3_log::try_init();
-
-        // Create a memoization table for the type string to type id conversion
-        let mut memo = HashMap::<String, u32>::new();
-
-        let mut curr_registry = portable_registry.registry.clone();
+        let ty =
+            registry
+                .resolve(type_id)
+                .ok_or(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                    "Failed to resolve type (0): {:?}",
+                    type_string
+                )))?;
 
-        fill_memo_using_well_known_types(&mut memo, &curr_registry);
-
-        let type_id: u32 = get_type_id_from_type_string(&mut memo, type_string, &mut curr_registry)
-            .ok_or(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
-                "Failed to get type id from type string: {:?}",
-                type_string
-            )))?;
-
-        let ty = curr_registry.resolve(type_id).ok_or(PyErr::new::<
-            pyo3::exceptions::PyValueError,
-            _,
-        >(format!(
-            "Failed to resolve type (0): {:?}",
-            type_string
-        )))?;
-
-        let as_value: Value<u32> =
-            pyobject_to_value(py, &to_encode, ty, type_id, portable_registry)?;
+        let as_value: Value<u32> = pyobject_to_value(py, to_encode, ty, type_id, registry)?;
 
         let mut encoded: Vec<u8> = Vec::<u8>::new();
-        encode_as_type(&as_value, type_id, &curr_registry, &mut encoded).map_err(|_e| {
+        encode_as_type(&as_value, type_id, registry, &mut encoded).map_err(|_e| {
             PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                 "Failed to encode type: {:?} with type id: {:?}",
                 type_string, type_id
@@ -1153,4 +2205,339 @@ mod bt_decode {
 
         Ok(encoded)
     }
+
+    /*
+     * Encoded output as bytes, or as a list of ints for callers relying on the old list output
+     */
+    fn encoded_to_py(py: Python, encoded: &[u8], as_list: bool) -> PyResult<Py<PyAny>> {
+        if as_list {
+            Ok(PyList::new(py, encoded.iter().copied())?
+                .into_any()
+                .unbind())
+        } else {
+            Ok(PyBytes::new(py, encoded).into_any().unbind())
+        }
+    }
+
+    #[pyfunction(name = "encode")]
+    #[pyo3(signature = (type_string, portable_registry, to_encode, as_list=false))]
+    fn py_encode<'py>(
+        py: Python<'py>,
+        type_string: &str,
+        portable_registry: RegistryArg<'py>,
+        to_encode: Py<PyAny>,
+        as_list: bool,
+    ) -> PyResult<Py<PyAny>> {
+        // Initialize logging
+        let _ = pyo3_log::try_init();
+
+        let compiled = portable_registry.compiled();
+
+        let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+
+        let registry = compiled.read();
+        let encoded = encode_type_id(py, &registry.registry, type_string, type_id, &to_encode)?;
+
+        encoded_to_py(py, &encoded, as_list)
+    }
+
+    #[pyfunction(name = "encode_list")]
+    #[pyo3(signature = (list_type_strings, portable_registry, list_to_encode, concatenate=false))]
+    fn py_encode_list<'py>(
+        py: Python<'py>,
+        list_type_strings: Vec<String>,
+        portable_registry: RegistryArg<'py>,
+        list_to_encode: Vec<Py<PyAny>>,
+        concatenate: bool,
+    ) -> PyResult<Py<PyAny>> {
+        let compiled = portable_registry.compiled();
+
+        // Resolve every type first, so the registry is only read once for the whole batch
+        let type_ids = list_type_strings
+            .iter()
+            .take(list_to_encode.len())
+            .map(|type_string| compiled.type_id_from_type_string(type_string))
+            .collect::<PyResult<Vec<u32>>>()?;
+
+        let registry = compiled.read();
+
+        if concatenate {
+            // One buffer, and the offset each value starts at, followed by the total length
+            let mut encoded = Vec::<u8>::new();
+            let mut offsets = vec![0];
+
+            for ((type_string, type_id), to_encode) in list_type_strings
+                .iter()
+                .zip(type_ids.iter())
+                .zip(list_to_encode.iter())
+            {
+                encoded.extend(encode_type_id(
+                    py,
+                    &registry.registry,
+                    type_string,
+                    *type_id,
+                    to_encode,
+                )?);
+                offsets.push(encoded.len());
+            }
+
+            let result = (PyBytes::new(py, &encoded), offsets);
+            return Ok(result.into_pyobject(py)?.into_any().unbind());
+        }
+
+        let encoded_list = list_type_strings
+            .iter()
+            .zip(type_ids.iter())
+            .zip(list_to_encode.iter())
+            .map(|((type_string, type_id), to_encode)| {
+                let encoded =
+                    encode_type_id(py, &registry.registry, type_string, *type_id, to_encode)?;
+                Ok(PyBytes::new(py, &encoded))
+            })
+            .collect::<PyResult<Vec<Bound<'py, PyBytes>>>>()?;
+
+        Ok(PyList::new(py, encoded_list)?.into_any().unbind())
+    }
+
+    #[pyfunction(name = "encode_into")]
+    #[pyo3(signature = (type_string, portable_registry, to_encode, buffer, offset=0))]
+    fn py_encode_into<'py>(
+        py: Python<'py>,
+        type_string: &str,
+        portable_registry: RegistryArg<'py>,
+        to_encode: Py<PyAny>,
+        buffer: &Bound<'py, PyAny>,
+        offset: usize,
+    ) -> PyResult<usize> {
+        let compiled = portable_registry.compiled();
+
+        let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+
+        let registry = compiled.read();
+        let encoded = encode_type_id(py, &registry.registry, type_string, type_id, &to_encode)?;
+
+        encoded::write_to_buffer(buffer, offset, &encoded)
+    }
+
+    #[pyfunction(name = "compile")]
+    fn py_compile<'py>(
+        py: Python<'py>,
+        type_string: &str,
+        portable_registry: RegistryArg<'py>,
+    ) -> PyResult<PyCompiledType> {
+        let registry = portable_registry.into_shared(py)?;
+
+        let compiled = registry.get();
+        let type_id: u32 = compiled.type_id_from_type_string(type_string)?;
+        let plan = compiled.decode_plan(py, type_id)?;
+
+        Ok(PyCompiledType {
+            type_string: type_string.to_string(),
+            type_id,
+            registry,
+            plan,
+        })
+    }
+
+    /*
+     * The storage key of an entry for the given keys, each SCALE-encoded as its key type and
+     * hashed. Fewer keys than the entry takes give the prefix shared by the keys starting
+     * with them, e.g. to iterate over a map.
+     */
+    fn storage_key_bytes(
+        py: Python,
+        registry: &scale_info::PortableRegistry,
+        layout: &StorageKeyLayout,
+        keys: &[Py<PyAny>],
+    ) -> PyResult<Vec<u8>> {
+        if keys.len() > layout.hashers.len() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Storage entry {} takes {} keys, got {}",
+                layout.name,
+                layout.hashers.len(),
+                keys.len()
+            )));
+        }
+
+        let mut storage_key = layout.prefix.clone();
+        for ((hasher, type_id), key) in layout
+            .hashers
+            .iter()
+            .zip(layout.key_type_ids.iter())
+            .zip(keys.iter())
+        {
+            let encoded = encode_type_id(py, registry, &layout.name, *type_id, key)?;
+            storage::hash_into(hasher, &encoded, &mut storage_key);
+        }
+
+        Ok(storage_key)
+    }
+
+    fn storage_key_layout(
+        metadata: &PyMetadataV15,
+        pallet: &str,
+        entry: &str,
+    ) -> PyResult<StorageKeyLayout> {
+        StorageKeyLayout::new(&metadata.metadata, pallet, entry)
+            .map_err(PyErr::new::<pyo3::exceptions::PyValueError, _>)
+    }
+
+    #[pyfunction(name = "storage_key")]
+    #[pyo3(signature = (metadata, pallet, entry, keys=Vec::new()))]
+    fn py_storage_key<'py>(
+        py: Python<'py>,
+        metadata: &PyMetadataV15,
+        pallet: &str,
+        entry: &str,
+        keys: Vec<Py<PyAny>>,
+    ) -> PyResult<Bound<'py, PyBytes>> {
+        let layout = storage_key_layout(metadata, pallet, entry)?;
+        let storage_key = storage_key_bytes(py, &metadata.metadata.types, &layout, &keys)?;
+
+        Ok(PyBytes::new(py, &storage_key))
+    }
+
+    #[pyfunction(name = "storage_keys")]
+    fn py_storage_keys<'py>(
+        py: Python<'py>,
+        metadata: &PyMetadataV15,
+        pallet: &str,
+        entry: &str,
+        keys_list: Vec<Vec<Py<PyAny>>>,
+    ) -> PyResult<Vec<Bound<'py, PyBytes>>> {
+        // The entry is looked up once for the whole batch
+        let layout = storage_key_layout(metadata, pallet, entry)?;
+
+        keys_list
+            .iter()
+            .map(|keys| {
+                let storage_key = storage_key_bytes(py, &metadata.metadata.types, &layout, keys)?;
+                Ok(PyBytes::new(py, &storage_key))
+            })
+            .collect()
+    }
+
+    #[pyfunction(name = "decode_storage_keys")]
+    #[pyo3(signature = (metadata, pallet, entry, storage_keys, workers=None))]
+    fn py_decode_storage_keys<'py>(
+        py: Python<'py>,
+        metadata: &PyMetadataV15,
+        pallet: &str,
+        entry: &str,
+        storage_keys: Vec<Encoded<'py>>,
+        workers: Option<usize>,
+    ) -> PyResult<Vec<Bound<'py, PyTuple>>> {
+        let layout = storage_key_layout(metadata, pallet, entry)?;
+        let plans = layout
+            .key_type_ids
+            .iter()
+            .map(|type_id| {
+                DecodePlan::new(
+                    py,
+                    &metadata.metadata.types,
+                    *type_id,
+                    PlanOptions::default(),
+                )
+            })
+            .collect::<Result<Vec<DecodePlan>, String>>()
+            .map_err(PyErr::new::<pyo3::exceptions::PyValueError, _>)?;
+
+        let jobs = storage_keys
+            .iter()
+            .map(Encoded::as_bytes)
+            .collect::<Vec<&[u8]>>();
+        let parse_all = || {
+            map_jobs(&jobs, workers, |&storage_key| {
+                layout.parse_keys(storage_key, |index, input| plans[index].parse(input))
+            })
+        };
+
+        let parsed = if storage_keys.iter().all(|encoded| encoded.is_readonly()) {
+            let total_len = jobs.iter().map(|storage_key| storage_key.len()).sum();
+            parse_without_gil(py, total_len, parse_all)?
+        } else {
+            // Writable buffers could be changed by other Python threads while being read
+            parse_all()?
+        };
+
+        parsed
+            .iter()
+            .enumerate()
+            .map(|(index, keys)| {
+                let keys = keys.as_ref().map_err(|e| {
+                    PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                        "Storage key at index {}: {}",
+                        index, e
+                    ))
+                })?;
+                let keys = keys
+                    .iter()
+                    .zip(plans.iter())
+                    .map(|(tokens, plan)| match tokens {
+                        Some(tokens) => plan.materialize(py, tokens),
+                        None => Ok(py.None().into_bound(py)),
+                    })
+                    .collect::<PyResult<Vec<Bound<'py, PyAny>>>>()?;
+                PyTuple::new(py, keys)
+            })
+            .collect()
+    }
+
+    #[pyfunction(name = "ss58_encode_many")]
+    #[pyo3(signature = (public_keys, ss58_format=42))]
+    fn py_ss58_encode_many(
+        py: Python<'_>,
+        public_keys: Encoded<'_>,
+        ss58_format: u16,
+    ) -> PyResult<Vec<String>> {
+        ss58::check_ss58_format(ss58_format)?;
+
+        let bytes = public_keys.as_bytes();
+        if bytes.len() % 32 != 0 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Expected 32-byte public keys, got {} bytes",
+                bytes.len()
+            )));
+        }
+
+        public_keys.parse(py, 0, None, |bytes| {
+            bytes
+                .chunks_exact(32)
+                .map(|public_key| {
+                    let public_key = public_key.try_into().expect("chunks are 32 bytes");
+                    ss58::ss58_encode(public_key, ss58_format)
+                })
+                .collect()
+        })
+    }
+
+    #[pyfunction(name = "ss58_decode_many")]
+    #[pyo3(signature = (addresses, ss58_format=None))]
+    fn py_ss58_decode_many<'py>(
+        py: Python<'py>,
+        addresses: Vec<String>,
+        ss58_format: Option<u16>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let n = addresses.len();
+        let input_len = addresses.iter().map(String::len).sum();
+
+        let public_keys = parse_without_gil(py, input_len, || {
+            let mut public_keys = Vec::with_capacity(n * 32);
+            for (i, address) in addresses.iter().enumerate() {
+                let (public_key, format) = ss58::ss58_decode(address)
+                    .map_err(|e| format!("Address at index {}: {}", i, e))?;
+                if let Some(expected) = ss58_format.filter(|expected| *expected != format) {
+                    return Err(format!(
+                        "Address at index {} has SS58 format {}, expected {}",
+                        i, format, expected
+                    ));
+                }
+                public_keys.extend_from_slice(&public_key);
+            }
+            Ok(public_keys)
+        })
+        .map_err(PyErr::new::<pyo3::exceptions::PyValueError, _>)?;
+
+        Ok(public_keys.into_pyarray(py).reshape([n, 32])?.into_any())
+    }
 }
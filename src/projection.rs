@@ -0,0 +1,274 @@
+use codec::{Decode, Error};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList, PyString};
+use pyo3::BoundObject;
+
+use crate::accountids::{AccountIdObjects, AccountIds};
+use crate::errors::DecodeFailure;
+use crate::{AccountId, Compact, Encoded, Lazy};
+
+/*
+ * Walks over one SCALE-encoded value without decoding it: only length prefixes, option and
+ * compact tags are read, and nothing is allocated.
+ *
+ * Implemented for the field types of the typed pyclasses; structs get it from
+ * #[derive(Project)].
+ */
+pub trait Skip {
+    // Encoded size, if it is the same for every value
+    const FIXED_SIZE: Option<usize> = None;
+
+    fn skip(input: &mut &[u8]) -> Result<(), Error>;
+}
+
+fn advance(input: &mut &[u8], len: usize) -> Result<(), Error> {
+    if input.len() < len {
+        return Err("Not enough data to skip".into());
+    }
+    *input = &input[len..];
+    Ok(())
+}
+
+// Sum of the fixed sizes of a struct's fields, if they all have one
+pub const fn fixed_size_sum(sizes: &[Option<usize>]) -> Option<usize> {
+    let mut total = 0;
+    let mut i = 0;
+    while i < sizes.len() {
+        match sizes[i] {
+            Some(size) => total += size,
+            None => return None,
+        }
+        i += 1;
+    }
+    Some(total)
+}
+
+macro_rules! impl_FixedSizeSkip {
+    ($($type:ty),+) => {
+        $(
+            impl Skip for $type {
+                const FIXED_SIZE: Option<usize> = Some(std::mem::size_of::<$type>());
+
+                fn skip(input: &mut &[u8]) -> Result<(), Error> {
+                    advance(input, std::mem::size_of::<$type>())
+                }
+            }
+        )+
+    };
+}
+
+impl_FixedSizeSkip!(bool, u8, u16, u32, u64, u128, i8, i16, i32, i64, i128);
+
+impl Skip for AccountId {
+    const FIXED_SIZE: Option<usize> = Some(32);
+
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        advance(input, 32)
+    }
+}
+
+impl<T: Skip, const N: usize> Skip for [T; N] {
+    const FIXED_SIZE: Option<usize> = match T::FIXED_SIZE {
+        Some(size) => Some(size * N),
+        None => None,
+    };
+
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        match Self::FIXED_SIZE {
+            Some(size) => advance(input, size),
+            None => (0..N).try_for_each(|_| T::skip(input)),
+        }
+    }
+}
+
+impl<T> Skip for codec::Compact<T> {
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        let first = *input.first().ok_or("Not enough data to skip")?;
+        // The low two bits give the mode: 1, 2 or 4 bytes, or (first >> 2) + 4 bytes after
+        // the first one
+        let len = match first & 0b11 {
+            0b00 => 1,
+            0b01 => 2,
+            0b10 => 4,
+            _ => 1 + (first >> 2) as usize + 4,
+        };
+        advance(input, len)
+    }
+}
+
+impl<T> Skip for Compact<T> {
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        codec::Compact::<T>::skip(input)
+    }
+}
+
+impl<T: Skip> Skip for Vec<T> {
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        let len = codec::Compact::<u32>::decode(input)?.0 as usize;
+        match T::FIXED_SIZE {
+            Some(size) => advance(input, len.checked_mul(size).ok_or("Vec length overflow")?),
+            None => (0..len).try_for_each(|_| T::skip(input)),
+        }
+    }
+}
+
+impl<T: Skip> Skip for Option<T> {
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        match u8::decode(input)? {
+            0 => Ok(()),
+            1 => T::skip(input),
+            _ => Err("Invalid Option tag".into()),
+        }
+    }
+}
+
+impl<A: Skip, B: Skip> Skip for (A, B) {
+    const FIXED_SIZE: Option<usize> = fixed_size_sum(&[A::FIXED_SIZE, B::FIXED_SIZE]);
+
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        A::skip(input)?;
+        B::skip(input)
+    }
+}
+
+impl<T: Skip> Skip for Lazy<T> {
+    const FIXED_SIZE: Option<usize> = T::FIXED_SIZE;
+
+    fn skip(input: &mut &[u8]) -> Result<(), Error> {
+        T::skip(input)
+    }
+}
+
+/*
+ * A decoded field, converted to Python once the GIL is held again, with its AccountIds
+ * taken from account_ids if given (see AccountIdObjects).
+ */
+pub trait IntoPyAny: Send {
+    fn into_py_any(
+        self: Box<Self>,
+        py: Python<'_>,
+        account_ids: Option<&mut AccountIdObjects>,
+    ) -> PyResult<Py<PyAny>>;
+}
+
+impl<T> IntoPyAny for T
+where
+    T: Send + AccountIds + for<'py> IntoPyObject<'py>,
+{
+    fn into_py_any(
+        self: Box<Self>,
+        py: Python<'_>,
+        account_ids: Option<&mut AccountIdObjects>,
+    ) -> PyResult<Py<PyAny>> {
+        if let (Some(account_ids), true) = (account_ids, T::HAS_ACCOUNT_ID) {
+            return self.to_object_with(py, account_ids);
+        }
+
+        Ok((*self)
+            .into_pyobject(py)
+            .map_err(Into::into)?
+            .into_bound()
+            .into_any()
+            .unbind())
+    }
+}
+
+/*
+ * Decodes only some fields of a struct, skipping the others (see Skip).
+ * Implemented by #[derive(Project)].
+ */
+pub trait Project: Skip {
+    const NAME: &'static str;
+
+    // Field names, in encoding order
+    const FIELDS: &'static [&'static str];
+
+    // Decodes the fields where selected[i] is set, in FIELDS order, and skips the rest
+    fn decode_projected(
+        input: &mut &[u8],
+        selected: &[bool],
+    ) -> Result<Vec<Box<dyn IntoPyAny>>, Error>;
+}
+
+/*
+ * Decodes a Vec<T> into a list of dicts holding only the named fields of each T.
+ * Without strict, returns the items decoded before an error along with the error (or None).
+ */
+pub fn decode_vec_projected<T: Project>(
+    py: Python<'_>,
+    encoded: &Encoded<'_>,
+    offset: usize,
+    length: Option<usize>,
+    fields: &[String],
+    strict: bool,
+    ss58_format: Option<u16>,
+    intern_account_ids: bool,
+) -> PyResult<Py<PyAny>> {
+    let mut account_ids = AccountIdObjects::new(ss58_format, intern_account_ids)?;
+
+    let mut selected = vec![false; T::FIELDS.len()];
+    for field in fields {
+        match T::FIELDS.iter().position(|name| name == field) {
+            Some(index) => selected[index] = true,
+            None => {
+                return Err(PyErr::new::<PyValueError, _>(format!(
+                    "Unknown field '{}', expected one of: {}",
+                    field,
+                    T::FIELDS.join(", ")
+                )))
+            }
+        }
+    }
+
+    let type_path = format!("Vec<{}>", T::NAME);
+    let (items, failure) = encoded.parse(py, offset, length, |encoded| {
+        let mut input = &encoded[..];
+        let failed = |input: &[u8], err: Error| {
+            Some(DecodeFailure::new(&type_path, offset, encoded, input, err))
+        };
+
+        let len = match codec::Compact::<u32>::decode(&mut input) {
+            Ok(len) => len.0 as usize,
+            Err(err) => return (vec![], failed(input, err)),
+        };
+
+        let mut items = Vec::with_capacity(len.min(input.len()));
+        for _ in 0..len {
+            match T::decode_projected(&mut input, &selected) {
+                Ok(values) => items.push(values),
+                Err(err) => return (items, failed(input, err)),
+            }
+        }
+
+        (items, None)
+    })?;
+
+    let failure = match (strict, failure) {
+        (true, Some(failure)) => return Err(failure.into_pyerr(py)),
+        (_, failure) => failure,
+    };
+
+    let keys = T::FIELDS
+        .iter()
+        .zip(&selected)
+        .filter(|(_, selected)| **selected)
+        .map(|(name, _)| PyString::intern(py, name))
+        .collect::<Vec<_>>();
+
+    let list = PyList::empty(py);
+    for values in items {
+        let dict = PyDict::new(py);
+        for (key, value) in keys.iter().zip(values) {
+            dict.set_item(key, value.into_py_any(py, account_ids.as_mut())?)?;
+        }
+        list.append(dict)?;
+    }
+
+    if strict {
+        return Ok(list.into_any().unbind());
+    }
+
+    let error = failure.map(|failure| failure.into_pyerr(py).into_value(py));
+    Ok((list, error).into_pyobject(py)?.into_any().unbind())
+}
@@ -0,0 +1,79 @@
+use base58::{FromBase58, ToBase58};
+use blake2::{Blake2b512, Digest};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+// Formats above this don't fit the two-byte SS58 prefix
+const MAX_SS58_FORMAT: u16 = 0x3fff;
+
+fn checksum(payload: &[u8]) -> [u8; 2] {
+    let mut hasher = Blake2b512::new();
+    hasher.update(b"SS58PRE");
+    hasher.update(payload);
+    let hash = hasher.finalize();
+    [hash[0], hash[1]]
+}
+
+pub fn check_ss58_format(ss58_format: u16) -> PyResult<()> {
+    if ss58_format > MAX_SS58_FORMAT {
+        return Err(PyErr::new::<PyValueError, _>(format!(
+            "Invalid SS58 format {}, expected at most {}",
+            ss58_format, MAX_SS58_FORMAT
+        )));
+    }
+    Ok(())
+}
+
+/*
+ * SS58 address of a public key. The format must be checked with check_ss58_format.
+ */
+pub fn ss58_encode(public_key: &[u8; 32], ss58_format: u16) -> String {
+    let mut payload = Vec::with_capacity(2 + 32 + 2);
+    if ss58_format < 64 {
+        payload.push(ss58_format as u8);
+    } else {
+        payload.push((((ss58_format & 0b1111_1100) >> 2) as u8) | 0b0100_0000);
+        payload.push(((ss58_format >> 8) as u8) | (((ss58_format & 0b11) as u8) << 6));
+    }
+    payload.extend_from_slice(public_key);
+
+    let checksum = checksum(&payload);
+    payload.extend_from_slice(&checksum);
+    payload.to_base58()
+}
+
+/*
+ * Public key and format of an SS58 address
+ */
+pub fn ss58_decode(address: &str) -> Result<([u8; 32], u16), String> {
+    let payload = address
+        .from_base58()
+        .map_err(|_| format!("Invalid base58 in SS58 address {:?}", address))?;
+
+    let (ss58_format, prefix_len) = match payload.first() {
+        Some(&first) if first < 64 => (first as u16, 1),
+        Some(&first) if first < 128 && payload.len() > 1 => {
+            let second = payload[1];
+            let lower = (first << 2) | (second >> 6);
+            let upper = second & 0b0011_1111;
+            (lower as u16 | (upper as u16) << 8, 2)
+        }
+        _ => return Err(format!("Invalid SS58 prefix in address {:?}", address)),
+    };
+
+    if payload.len() != prefix_len + 32 + 2 {
+        return Err(format!(
+            "Invalid SS58 address {:?}, expected a 32-byte public key",
+            address
+        ));
+    }
+
+    let (body, expected) = payload.split_at(prefix_len + 32);
+    if checksum(body) != expected {
+        return Err(format!("Invalid checksum in SS58 address {:?}", address));
+    }
+
+    let mut public_key = [0u8; 32];
+    public_key.copy_from_slice(&body[prefix_len..]);
+    Ok((public_key, ss58_format))
+}
@@ -0,0 +1,157 @@
+use blake2::digest::consts::{U16, U32};
+use blake2::{Blake2b, Digest};
+use frame_metadata::v15::{RuntimeMetadataV15, StorageEntryType, StorageHasher};
+use scale_info::TypeDef;
+use xxhash_rust::xxh64::xxh64;
+
+// xxh64 with seeds 0..words, concatenated little-endian, as Substrate's twox hashers
+fn twox(data: &[u8], words: u64, out: &mut Vec<u8>) {
+    for seed in 0..words {
+        out.extend_from_slice(&xxh64(data, seed).to_le_bytes());
+    }
+}
+
+/*
+ * Appends the hash of data to out, followed by data itself for the *_concat hashers
+ */
+pub fn hash_into(hasher: &StorageHasher, data: &[u8], out: &mut Vec<u8>) {
+    match hasher {
+        StorageHasher::Blake2_128 => out.extend_from_slice(&Blake2b::<U16>::digest(data)),
+        StorageHasher::Blake2_256 => out.extend_from_slice(&Blake2b::<U32>::digest(data)),
+        StorageHasher::Blake2_128Concat => {
+            out.extend_from_slice(&Blake2b::<U16>::digest(data));
+            out.extend_from_slice(data);
+        }
+        StorageHasher::Twox128 => twox(data, 2, out),
+        StorageHasher::Twox256 => twox(data, 4, out),
+        StorageHasher::Twox64Concat => {
+            twox(data, 1, out);
+            out.extend_from_slice(data);
+        }
+        StorageHasher::Identity => out.extend_from_slice(data),
+    }
+}
+
+/*
+ * The length of the hash a hasher puts before a key, and whether the key itself follows it
+ */
+fn hash_len(hasher: &StorageHasher) -> (usize, bool) {
+    match hasher {
+        StorageHasher::Blake2_128 | StorageHasher::Twox128 => (16, false),
+        StorageHasher::Blake2_256 | StorageHasher::Twox256 => (32, false),
+        StorageHasher::Blake2_128Concat => (16, true),
+        StorageHasher::Twox64Concat => (8, true),
+        StorageHasher::Identity => (0, true),
+    }
+}
+
+/*
+ * How the keys of a storage entry are laid out: the prefix every key starts with, then one
+ * hashed key per hasher, each of the matching key type.
+ */
+pub struct StorageKeyLayout {
+    // twox128 of the pallet's storage prefix, then of the entry name
+    pub prefix: Vec<u8>,
+    pub hashers: Vec<StorageHasher>,
+    pub key_type_ids: Vec<u32>,
+    // e.g. "SubtensorModule.Stake", for errors
+    pub name: String,
+}
+
+impl StorageKeyLayout {
+    pub fn new(metadata: &RuntimeMetadataV15, pallet: &str, entry: &str) -> Result<Self, String> {
+        let storage = metadata
+            .pallets
+            .iter()
+            .find(|pallet_metadata| pallet_metadata.name == pallet)
+            .ok_or_else(|| format!("Unknown pallet: {:?}", pallet))?
+            .storage
+            .as_ref()
+            .ok_or_else(|| format!("Pallet {:?} has no storage", pallet))?;
+        let entry_metadata = storage
+            .entries
+            .iter()
+            .find(|entry_metadata| entry_metadata.name == entry)
+            .ok_or_else(|| format!("Pallet {:?} has no storage entry {:?}", pallet, entry))?;
+
+        let mut prefix = Vec::with_capacity(32);
+        twox(storage.prefix.as_bytes(), 2, &mut prefix);
+        twox(entry.as_bytes(), 2, &mut prefix);
+
+        let (hashers, key_type_ids) = match &entry_metadata.ty {
+            StorageEntryType::Plain(_) => (vec![], vec![]),
+            StorageEntryType::Map { hashers, key, .. } if hashers.len() == 1 => {
+                (hashers.clone(), vec![key.id])
+            }
+            // Double maps and NMaps have a tuple key, one field per hasher
+            StorageEntryType::Map { hashers, key, .. } => match metadata
+                .types
+                .resolve(key.id)
+                .map(|ty| &ty.type_def)
+            {
+                Some(TypeDef::Tuple(tuple)) if tuple.fields.len() == hashers.len() => (
+                    hashers.clone(),
+                    tuple.fields.iter().map(|field| field.id).collect(),
+                ),
+                _ => {
+                    return Err(format!(
+                        "Storage entry {}.{} has {} hashers but its key type {} is not a tuple of as many keys",
+                        pallet,
+                        entry,
+                        hashers.len(),
+                        key.id
+                    ))
+                }
+            },
+        };
+
+        Ok(StorageKeyLayout {
+            prefix,
+            hashers,
+            key_type_ids,
+            name: format!("{}.{}", pallet, entry),
+        })
+    }
+
+    /*
+     * Splits a full storage key of the entry into its keys. parse_key is called with the
+     * index of each key and the input at it, which it must advance past the key. Keys behind
+     * a hasher that doesn't keep them (e.g. Blake2_128) can't be recovered and are None.
+     */
+    pub fn parse_keys<'a, T>(
+        &self,
+        storage_key: &'a [u8],
+        mut parse_key: impl FnMut(usize, &mut &'a [u8]) -> Result<T, String>,
+    ) -> Result<Vec<Option<T>>, String> {
+        let mut input = storage_key
+            .strip_prefix(self.prefix.as_slice())
+            .ok_or_else(|| format!("Not a storage key of {}", self.name))?;
+
+        let mut keys = Vec::with_capacity(self.hashers.len());
+        for (index, hasher) in self.hashers.iter().enumerate() {
+            let (hash_len, concat) = hash_len(hasher);
+            if input.len() < hash_len {
+                return Err(format!(
+                    "Storage key of {} ends within the hash of key {}",
+                    self.name, index
+                ));
+            }
+            input = &input[hash_len..];
+
+            keys.push(match concat {
+                true => Some(parse_key(index, &mut input)?),
+                false => None,
+            });
+        }
+
+        if !input.is_empty() {
+            return Err(format!(
+                "{} trailing bytes after the keys of {}",
+                input.len(),
+                self.name
+            ));
+        }
+
+        Ok(keys)
+    }
+}
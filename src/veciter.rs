@@ -0,0 +1,392 @@
+use std::sync::Arc;
+
+use codec::{Decode, Input};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::BoundObject;
+
+use crate::decodeplan::{DecodePlan, NodeId};
+use crate::encoded::EncodedOwned;
+use crate::errors::DecodeFailure;
+use crate::projection::Project;
+use crate::Encoded;
+
+enum VecItem {
+    // Decodes one item of a typed pyclass, at the given offset, and converts it to Python
+    Typed(fn(Python<'_>, &mut &[u8], usize) -> PyResult<Py<PyAny>>),
+    // The type string of the Vec, its plan and the plan's item node
+    Plan(String, Arc<DecodePlan>, NodeId),
+}
+
+fn decode_item<T>(py: Python<'_>, input: &mut &[u8], offset: usize) -> PyResult<Py<PyAny>>
+where
+    T: Project + Decode + for<'py> IntoPyObject<'py>,
+{
+    let bytes = *input;
+    let item = T::decode(input)
+        .map_err(|err| DecodeFailure::new(T::NAME, offset, bytes, input, err).into_pyerr(py))?;
+
+    Ok(item
+        .into_pyobject(py)
+        .map_err(Into::into)?
+        .into_bound()
+        .into_any()
+        .unbind())
+}
+
+/// Iterator over the items of a SCALE-encoded Vec, decoding one item per step.
+///
+/// Holds the encoded input (without copying bytes or buffers) and a position in it, so only
+/// the current item is ever decoded in memory.
+#[pyclass(name = "VecIterator")]
+pub struct PyVecIterator {
+    encoded: EncodedOwned,
+    position: usize,
+    end: usize,
+    remaining: usize,
+    item: VecItem,
+}
+
+impl PyVecIterator {
+    fn new(
+        py: Python<'_>,
+        encoded: Encoded<'_>,
+        offset: usize,
+        length: Option<usize>,
+        type_path: &str,
+        item: VecItem,
+    ) -> PyResult<Self> {
+        let bytes = encoded.slice(offset, length)?;
+        let mut input = bytes;
+        let remaining = codec::Compact::<u32>::decode(&mut input)
+            .map_err(|err| DecodeFailure::new(type_path, offset, bytes, input, err).into_pyerr(py))?
+            .0 as usize;
+        let position = offset + bytes.len() - input.len();
+        let end = offset + bytes.len();
+
+        Ok(PyVecIterator {
+            encoded: encoded.into_owned(),
+            position,
+            end,
+            remaining,
+            item,
+        })
+    }
+
+    /*
+     * Iterates over a Vec<T> of a typed pyclass
+     */
+    pub fn typed<T>(
+        py: Python<'_>,
+        encoded: Encoded<'_>,
+        offset: usize,
+        length: Option<usize>,
+    ) -> PyResult<Self>
+    where
+        T: Project + Decode + for<'py> IntoPyObject<'py>,
+    {
+        PyVecIterator::new(
+            py,
+            encoded,
+            offset,
+            length,
+            &format!("Vec<{}>", T::NAME),
+            VecItem::Typed(decode_item::<T>),
+        )
+    }
+
+    /*
+     * Iterates over a sequence type of the registry, given its decode plan
+     */
+    pub fn from_plan(
+        py: Python<'_>,
+        encoded: Encoded<'_>,
+        offset: usize,
+        length: Option<usize>,
+        plan: Arc<DecodePlan>,
+        type_string: &str,
+    ) -> PyResult<Self> {
+        let item = plan.sequence_item().ok_or_else(|| {
+            PyErr::new::<PyValueError, _>(format!(
+                "Can only iterate over a sequence type, not {:?}",
+                type_string
+            ))
+        })?;
+
+        let item = VecItem::Plan(type_string.to_string(), plan, item);
+        PyVecIterator::new(py, encoded, offset, length, type_string, item)
+    }
+
+    fn decode_next(&self, py: Python<'_>) -> PyResult<(Py<PyAny>, usize)> {
+        let bytes = self
+            .encoded
+            .as_bytes(py)
+            .get(self.position..self.end)
+            .ok_or_else(|| PyErr::new::<PyValueError, _>("Encoded buffer was resized"))?;
+        let mut input = bytes;
+
+        let value = match &self.item {
+            VecItem::Typed(decode) => decode(py, &mut input, self.position)?,
+            VecItem::Plan(type_string, plan, node_id) => {
+                let tokens = plan.parse_at(*node_id, &mut input).map_err(|err| {
+                    DecodeFailure::new(type_string, self.position, bytes, input, err).into_pyerr(py)
+                })?;
+                plan.materialize_at(py, *node_id, &tokens)?.unbind()
+            }
+        };
+
+        Ok((value, bytes.len() - input.len()))
+    }
+}
+
+#[pymethods]
+impl PyVecIterator {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<Py<PyAny>>> {
+        if self.remaining == 0 {
+            return Ok(None);
+        }
+
+        match self.decode_next(py) {
+            Ok((value, consumed)) => {
+                self.position += consumed;
+                self.remaining -= 1;
+                Ok(Some(value))
+            }
+            Err(err) => {
+                // The position of the next item is unknown, so stop here
+                self.remaining = 0;
+                Err(err)
+            }
+        }
+    }
+
+    fn __length_hint__(&self) -> usize {
+        // The length prefix is untrusted; the bytes left bound it, as with decode_vec_partial
+        self.remaining.min(self.end - self.position)
+    }
+}
+
+/*
+ * Input over the bytes received so far, which records how many bytes a read past the end
+ * needed, to tell an incomplete item from an invalid one.
+ */
+struct PartialInput<'a> {
+    input: &'a [u8],
+    consumed: usize,
+    needed: Option<usize>,
+}
+
+impl Input for PartialInput<'_> {
+    // Unknown, so decoders don't reject lengths that only exceed the bytes received so far
+    fn remaining_len(&mut self) -> Result<Option<usize>, codec::Error> {
+        Ok(None)
+    }
+
+    fn read(&mut self, into: &mut [u8]) -> Result<(), codec::Error> {
+        if into.len() > self.input.len() {
+            self.needed = Some(self.consumed + into.len());
+            return Err("Not enough data to fill buffer".into());
+        }
+
+        into.copy_from_slice(&self.input[..into.len()]);
+        self.input = &self.input[into.len()..];
+        self.consumed += into.len();
+        Ok(())
+    }
+}
+
+enum Partial<T> {
+    Complete(T, usize),
+    // At least this many bytes are needed
+    Incomplete(usize),
+}
+
+/*
+ * Decodes a T from the front of bytes, which start at offset in the stream
+ */
+fn decode_partial<T: Decode>(
+    bytes: &[u8],
+    offset: usize,
+    type_path: &str,
+) -> Result<Partial<T>, DecodeFailure> {
+    let mut input = PartialInput {
+        input: bytes,
+        consumed: 0,
+        needed: None,
+    };
+
+    match T::decode(&mut input) {
+        Ok(value) => Ok(Partial::Complete(value, input.consumed)),
+        Err(err) => match input.needed {
+            Some(needed) => Ok(Partial::Incomplete(needed)),
+            None => Err(DecodeFailure::new(
+                type_path,
+                offset,
+                bytes,
+                &bytes[input.consumed..],
+                err,
+            )),
+        },
+    }
+}
+
+fn decode_partial_item<T>(
+    py: Python<'_>,
+    bytes: &[u8],
+    offset: usize,
+) -> PyResult<Partial<Py<PyAny>>>
+where
+    T: Project + Decode + for<'py> IntoPyObject<'py>,
+{
+    let decoded =
+        decode_partial::<T>(bytes, offset, T::NAME).map_err(|failure| failure.into_pyerr(py))?;
+
+    match decoded {
+        Partial::Complete(item, consumed) => Ok(Partial::Complete(
+            item.into_pyobject(py)
+                .map_err(Into::into)?
+                .into_bound()
+                .into_any()
+                .unbind(),
+            consumed,
+        )),
+        Partial::Incomplete(needed) => Ok(Partial::Incomplete(needed)),
+    }
+}
+
+/// Resumable decoder for a SCALE-encoded Vec received in chunks.
+///
+/// `feed` appends the next chunk; `drain` returns every item whose bytes have all arrived
+/// since the last call, keeping the bytes of an incomplete item for the next chunk.
+/// Once an item fails to decode, the position of the next one is unknown, so every later
+/// `drain` raises the same error. Once every item is decoded, `feed` raises, and the bytes
+/// past the Vec are left in `trailing`.
+#[pyclass(name = "VecDecoder")]
+pub struct PyVecDecoder {
+    buffer: Vec<u8>,
+    // Items left to decode, once the length prefix has arrived
+    remaining: Option<usize>,
+    // Bytes of the buffer needed before the next item can be complete
+    needed: usize,
+    // Offset of the buffer in the stream, i.e. the bytes drained so far
+    offset: usize,
+    // Set once the stream fails to decode
+    error: Option<PyErr>,
+    decode_item: fn(Python<'_>, &[u8], usize) -> PyResult<Partial<Py<PyAny>>>,
+}
+
+impl PyVecDecoder {
+    /*
+     * Decoder for a Vec<T> of a typed pyclass
+     */
+    pub fn typed<T>() -> Self
+    where
+        T: Project + Decode + for<'py> IntoPyObject<'py>,
+    {
+        PyVecDecoder {
+            buffer: Vec::new(),
+            remaining: None,
+            needed: 1,
+            offset: 0,
+            error: None,
+            decode_item: decode_partial_item::<T>,
+        }
+    }
+}
+
+#[pymethods]
+impl PyVecDecoder {
+    fn feed(&mut self, chunk: Encoded<'_>) -> PyResult<()> {
+        if self.done() {
+            return Err(PyErr::new::<PyValueError, _>(
+                "Every item of the Vec has been decoded",
+            ));
+        }
+
+        // Past a failure, the bytes can never be decoded, so they aren't kept
+        if self.error.is_none() {
+            self.buffer.extend_from_slice(chunk.as_bytes());
+        }
+        Ok(())
+    }
+
+    fn drain(&mut self, py: Python<'_>) -> PyResult<Vec<Py<PyAny>>> {
+        if let Some(error) = &self.error {
+            return Err(error.clone_ref(py));
+        }
+
+        let mut items = Vec::new();
+        let mut position = 0;
+        let mut error = None;
+
+        while self.buffer.len() - position >= self.needed {
+            let bytes = &self.buffer[position..];
+
+            let Some(remaining) = self.remaining else {
+                let offset = self.offset + position;
+                match decode_partial::<codec::Compact<u32>>(bytes, offset, "Vec length") {
+                    Ok(Partial::Complete(len, consumed)) => {
+                        self.remaining = Some(len.0 as usize);
+                        self.needed = 1;
+                        position += consumed;
+                    }
+                    Ok(Partial::Incomplete(needed)) => self.needed = needed,
+                    Err(failure) => {
+                        error = Some(failure.into_pyerr(py));
+                        break;
+                    }
+                }
+                continue;
+            };
+
+            if remaining == 0 {
+                break;
+            }
+
+            match (self.decode_item)(py, bytes, self.offset + position) {
+                Ok(Partial::Complete(item, consumed)) => {
+                    items.push(item);
+                    self.remaining = Some(remaining - 1);
+                    self.needed = 1;
+                    position += consumed;
+                }
+                Ok(Partial::Incomplete(needed)) => self.needed = needed,
+                Err(err) => {
+                    error = Some(err);
+                    break;
+                }
+            }
+        }
+
+        // Only the bytes of the incomplete item (or past the end) are kept
+        self.buffer.drain(..position);
+        self.offset += position;
+
+        // The items decoded before a failure are still returned; the error is raised by
+        // this call if there are none, else by the next one
+        if let Some(error) = error {
+            self.error = Some(error.clone_ref(py));
+            if items.is_empty() {
+                return Err(error);
+            }
+        }
+
+        Ok(items)
+    }
+
+    /// Whether every item of the Vec has been decoded
+    #[getter]
+    fn done(&self) -> bool {
+        self.remaining == Some(0)
+    }
+
+    /// The bytes fed after the last item of the Vec, or None until it is done
+    #[getter]
+    fn trailing(&self) -> Option<&[u8]> {
+        self.done().then_some(&self.buffer[..])
+    }
+}
@@ -1,9 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Tuple
 
 import pytest
 
 import bt_decode
 
+from . import get_file_bytes
+
 
 TEST_TYPE_STRING_SCALE_INFO_DECODING: Dict[str, Tuple[str, Any]] = {
     "scale_info::2": ("01", 1),  # u8
@@ -11,75 +14,13 @@ TEST_TYPE_STRING_SCALE_INFO_DECODING: Dict[str, Tuple[str, Any]] = {
         "c40352ca71e26e83b6c86058fd4d3c9643ea5dc11f120a7c80f47ec5770b457d8853018ca894cb3d02aaf9b96741c831a3970cf250a58ec46e6a66f269be0b4b040400ba94330000000000c7020000e0aaf22c000000000000000000000000ad240404000000000000000000000000000000000000000000000000000000000000000000048853018ca894cb3d02aaf9b96741c831a3970cf250a58ec46e6a66f269be0b4b6220f458c056ce4900c0bc4276030000006e1e9b00000404feff0300009d03",
         {
             "hotkey": (
-                (
-                    196,
-                    3,
-                    82,
-                    202,
-                    113,
-                    226,
-                    110,
-                    131,
-                    182,
-                    200,
-                    96,
-                    88,
-                    253,
-                    77,
-                    60,
-                    150,
-                    67,
-                    234,
-                    93,
-                    193,
-                    31,
-                    18,
-                    10,
-                    124,
-                    128,
-                    244,
-                    126,
-                    197,
-                    119,
-                    11,
-                    69,
-                    125,
+                bytes.fromhex(
+                    "c40352ca71e26e83b6c86058fd4d3c9643ea5dc11f120a7c80f47ec5770b457d"
                 ),
             ),
             "coldkey": (
-                (
-                    136,
-                    83,
-                    1,
-                    140,
-                    168,
-                    148,
-                    203,
-                    61,
-                    2,
-                    170,
-                    249,
-                    185,
-                    103,
-                    65,
-                    200,
-                    49,
-                    163,
-                    151,
-                    12,
-                    242,
-                    80,
-                    165,
-                    142,
-                    196,
-                    110,
-                    106,
-                    102,
-                    242,
-                    105,
-                    190,
-                    11,
-                    75,
+                bytes.fromhex(
+                    "8853018ca894cb3d02aaf9b96741c831a3970cf250a58ec46e6a66f269be0b4b"
                 ),
             ),
             "uid": 1,
@@ -105,39 +46,8 @@ TEST_TYPE_STRING_SCALE_INFO_DECODING: Dict[str, Tuple[str, Any]] = {
             "stake": (
                 (
                     (
-                        (
-                            136,
-                            83,
-                            1,
-                            140,
-                            168,
-                            148,
-                            203,
-                            61,
-                            2,
-                            170,
-                            249,
-                            185,
-                            103,
-                            65,
-                            200,
-                            49,
-                            163,
-                            151,
-                            12,
-                            242,
-                            80,
-                            165,
-                            142,
-                            196,
-                            110,
-                            106,
-                            102,
-                            242,
-                            105,
-                            190,
-                            11,
-                            75,
+                        bytes.fromhex(
+                            "8853018ca894cb3d02aaf9b96741c831a3970cf250a58ec46e6a66f269be0b4b"
                         ),
                     ),
                     373098520,
@@ -180,9 +90,10 @@ TEST_TYPE_STRING_PLAIN_DECODING: Dict[str, Tuple[str, Any]] = {
     "Option<u32>": ("00", None),
     "Option<u32> ": ("0101000000", 1),  # Returns a tuple
     "()": ("", ()),
-    "[u8; 4]": ("62616265", (98, 97, 98, 101)),
-    "Vec<u8>": ("0c010203", (1, 2, 3)),
-    "Vec<u8> ": ("00", ()),
+    "[u8; 4]": ("62616265", b"babe"),
+    "Vec<u8>": ("0c010203", b"\x01\x02\x03"),
+    "Vec<u8> ": ("00", b""),
+    "[u16; 2]": ("01000200", (1, 2)),
     "str": ("0c666f6f", "foo"),
 }
 
@@ -211,6 +122,20 @@ class TestDecodeByPlainTypeString:
         actual = bt_decode.decode(type_string, self.registry, test_bytes)
         assert actual == expected
 
+    def test_decode_registry_from_bytes(
+        self, type_string: str, test_hex: str, expected: Any
+    ):
+        type_string = type_string.strip()
+
+        registry = bt_decode.PortableRegistry.from_bytes(self.registry.to_bytes())
+        assert registry.registry == self.registry.registry
+
+        test_bytes = bytes.fromhex(test_hex)
+        assert bt_decode.decode(type_string, registry, test_bytes) == expected
+
+        with pytest.raises(bt_decode.DecodeError):
+            bt_decode.PortableRegistry.from_bytes(self.registry.to_bytes() + b"\x00")
+
 
 @pytest.mark.parametrize(
     "type_string,test_hex,expected",
@@ -234,3 +159,432 @@ class TestDecodeByScaleInfoTypeString:
         actual = bt_decode.decode(type_string, self.registry, test_bytes)
         print(actual)
         assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "type_string,test_hex,expected",
+    [(x, y, z) for x, (y, z) in TEST_TYPE_STRING_PLAIN_DECODING.items()],
+)
+class TestDecodeByPlainTypeStringCompiledRegistry:
+    # Test the same type strings against a CompiledRegistry that is reused across calls
+    registry: bt_decode.CompiledRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.CompiledRegistry.from_portable_registry(
+            bt_decode.PortableRegistry.from_json(types_json_str)
+        )
+
+    def test_decode_values(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex)
+        # Decode twice to use the memoized type string
+        assert bt_decode.decode(type_string, self.registry, test_bytes) == expected
+        assert bt_decode.decode(type_string, self.registry, test_bytes) == expected
+
+    def test_decode_list_values(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex)
+        actual = bt_decode.decode_list(
+            [type_string, type_string], self.registry, [test_bytes, test_bytes]
+        )
+        assert actual == [expected, expected]
+
+    def test_decode_with_offset(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex)
+        framed = b"\xff" * 3 + test_bytes + b"\xff"
+        assert bt_decode.decode_with_offset(
+            type_string, self.registry, framed, offset=3
+        ) == (expected, len(test_bytes))
+
+    def test_decode_sequence(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex)
+        assert bt_decode.decode_sequence(
+            [type_string, type_string],
+            self.registry,
+            test_bytes * 2,
+            allow_trailing_bytes=False,
+        ) == [expected, expected]
+
+        with pytest.raises(bt_decode.DecodeError):
+            bt_decode.decode_sequence(
+                [type_string],
+                self.registry,
+                test_bytes + b"\x00",
+                allow_trailing_bytes=False,
+            )
+
+    def test_decode_trailing_bytes(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex) + b"\x00"
+        assert bt_decode.decode(type_string, self.registry, test_bytes) == expected
+        with pytest.raises(bt_decode.DecodeError) as exc_info:
+            bt_decode.decode(
+                type_string, self.registry, test_bytes, allow_trailing_bytes=False
+            )
+        assert exc_info.value.remaining == 1
+
+    def test_decode_cache(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+        with open(TEST_TYPES_JSON, "r") as f:
+            registry = bt_decode.CompiledRegistry.from_portable_registry(
+                bt_decode.PortableRegistry.from_json(f.read())
+            )
+        assert registry.decode_cache_info() is None
+
+        registry.enable_decode_cache(max_entries=1)
+        test_bytes = bytes.fromhex(test_hex)
+        first = bt_decode.decode(type_string, registry, test_bytes)
+        assert first == expected
+        assert bt_decode.decode(type_string, registry, test_bytes) is first
+        # The payload is the same, with or without a prefix
+        assert bt_decode.decode(type_string, registry, b"\x00" + test_bytes, offset=1) is first
+
+        info = registry.decode_cache_info()
+        assert (info["hits"], info["misses"], info["entries"]) == (2, 1, 1)
+        assert info["bytes"] == len(test_bytes)
+
+        # Evicted past max_entries
+        bt_decode.decode("u16", registry, b"\xfe\xca")
+        assert registry.decode_cache_info()["entries"] == 1
+        assert bt_decode.decode(type_string, registry, test_bytes) == expected
+        assert registry.decode_cache_info()["misses"] == 3
+
+        registry.clear_decode_cache()
+        assert registry.decode_cache_info()["entries"] == 0
+        registry.disable_decode_cache()
+        assert registry.decode_cache_info() is None
+
+
+@pytest.mark.parametrize(
+    "type_string,test_hex,expected",
+    [
+        (x, y, z)
+        for x, (y, z) in {
+            **TEST_TYPE_STRING_PLAIN_DECODING,
+            **TEST_TYPE_STRING_SCALE_INFO_DECODING,
+        }.items()
+    ],
+)
+class TestDecodeByCompiledType:
+    # Test decoding with a type string compiled ahead of time
+    registry: bt_decode.PortableRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.PortableRegistry.from_json(types_json_str)
+
+    def test_decode_values(self, type_string: str, test_hex: str, expected: Any):
+        compiled = bt_decode.compile(type_string.strip(), self.registry)
+
+        test_bytes = bytes.fromhex(test_hex)
+        assert compiled.decode(test_bytes) == expected
+        assert compiled.decode_many([test_bytes, test_bytes]) == [expected, expected]
+
+    def test_decode_hex_values(self, type_string: str, test_hex: str, expected: Any):
+        compiled = bt_decode.compile(type_string.strip(), self.registry)
+
+        assert compiled.decode(test_hex) == expected
+        assert compiled.decode("0x" + test_hex) == expected
+        assert bt_decode.decode(type_string, self.registry, "0x" + test_hex) == expected
+        assert bt_decode.decode_list(
+            [type_string], self.registry, ["0x" + test_hex.upper()]
+        ) == [expected]
+
+
+def bytes_to_tuples(value: Any) -> Any:
+    # The shape of a value decoded with bytes_as_tuples=True
+    if isinstance(value, bytes):
+        return tuple(value)
+    if isinstance(value, tuple):
+        return tuple(bytes_to_tuples(item) for item in value)
+    if isinstance(value, dict):
+        return {key: bytes_to_tuples(item) for key, item in value.items()}
+    return value
+
+
+@pytest.mark.parametrize(
+    "type_string,test_hex,expected",
+    [
+        (x, y, z)
+        for x, (y, z) in {
+            **TEST_TYPE_STRING_PLAIN_DECODING,
+            **TEST_TYPE_STRING_SCALE_INFO_DECODING,
+        }.items()
+    ],
+)
+class TestDecodeBytesAsTuples:
+    # Test the compatibility flag that decodes u8 sequences and arrays as tuples of ints
+    registry: bt_decode.CompiledRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.CompiledRegistry.from_portable_registry(
+            bt_decode.PortableRegistry.from_json(types_json_str), bytes_as_tuples=True
+        )
+
+    def test_decode_values(self, type_string: str, test_hex: str, expected: Any):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex)
+        assert bt_decode.decode(
+            type_string, self.registry, test_bytes
+        ) == bytes_to_tuples(expected)
+        assert bt_decode.compile(type_string, self.registry).decode(
+            test_bytes
+        ) == bytes_to_tuples(expected)
+
+    def test_decode_values_portable_registry(
+        self, type_string: str, test_hex: str, expected: Any
+    ):
+        type_string = type_string.strip()
+        with open(TEST_TYPES_JSON, "r") as f:
+            registry = bt_decode.PortableRegistry.from_json(
+                f.read(), bytes_as_tuples=True
+            )
+
+        test_bytes = bytes.fromhex(test_hex)
+        assert bt_decode.decode(type_string, registry, test_bytes) == bytes_to_tuples(
+            expected
+        )
+        assert bt_decode.decode_with_offset(type_string, registry, test_bytes) == (
+            bytes_to_tuples(expected),
+            len(test_bytes),
+        )
+        # Compiling keeps the flag of the PortableRegistry
+        compiled = bt_decode.CompiledRegistry.from_portable_registry(registry)
+        assert bt_decode.decode(type_string, compiled, test_bytes) == bytes_to_tuples(
+            expected
+        )
+
+        registry.bytes_as_tuples = False
+        assert bt_decode.decode(type_string, registry, test_bytes) == expected
+
+
+class TestDecodeDelegatesByTypeString:
+    # Test a large payload decoded by type string against the typed decoder
+    registry: bt_decode.CompiledRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.CompiledRegistry.from_portable_registry(
+            bt_decode.PortableRegistry.from_json(types_json_str)
+        )
+
+    def test_decode_matches_typed_decode(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+
+        actual = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+        expected = bt_decode.DelegateInfo.decode_vec(encoded)
+
+        assert len(actual) == len(expected)
+        for delegate, delegate_typed in zip(actual, expected):
+            # AccountId32 is a composite around [u8; 32], decoded as bytes on both paths
+            assert delegate["delegate_ss58"][0] == delegate_typed.delegate_ss58
+            assert delegate["owner_ss58"][0] == delegate_typed.owner_ss58
+            assert delegate["take"] == delegate_typed.take
+            assert [
+                (nominator[0], stake) for nominator, stake in delegate["nominators"]
+            ] == delegate_typed.nominators
+            assert list(delegate["registrations"]) == delegate_typed.registrations
+            assert (
+                list(delegate["validator_permits"]) == delegate_typed.validator_permits
+            )
+            assert delegate["return_per_1000"] == delegate_typed.return_per_1000
+            assert delegate["total_daily_return"] == delegate_typed.total_daily_return
+
+    def test_decode_intern_account_ids(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        with open(TEST_TYPES_JSON, "r") as f:
+            registry = bt_decode.CompiledRegistry.from_portable_registry(
+                bt_decode.PortableRegistry.from_json(f.read()), intern_account_ids=True
+            )
+
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+        actual = bt_decode.decode("Vec<DelegateInfo>", registry, encoded)
+        assert actual == expected
+
+        # Equal AccountId32s are the same object, within and across calls
+        again = bt_decode.decode("Vec<DelegateInfo>", registry, encoded)
+        shared = {}
+        for delegates in (actual, again):
+            for delegate in delegates:
+                for nominator, _ in delegate["nominators"]:
+                    assert shared.setdefault(nominator[0], nominator[0]) is nominator[0]
+
+        registry.clear_interned_account_ids()
+        cleared = bt_decode.decode("Vec<DelegateInfo>", registry, encoded)
+        assert cleared == expected
+        assert cleared[0]["owner_ss58"][0] is not actual[0]["owner_ss58"][0]
+
+    def test_decode_from_threads(self):
+        # Large payloads are parsed with the GIL released
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda _: bt_decode.decode(
+                        "Vec<DelegateInfo>", self.registry, encoded
+                    ),
+                    range(4),
+                )
+            )
+
+        assert results == [expected] * 4
+
+    def test_decode_cache_evicts_least_recently_used(self):
+        with open(TEST_TYPES_JSON, "r") as f:
+            registry = bt_decode.CompiledRegistry.from_portable_registry(
+                bt_decode.PortableRegistry.from_json(f.read())
+            )
+        registry.enable_decode_cache(max_entries=2)
+        encoded = get_file_bytes("tests/delegates_info.hex")
+
+        a = bt_decode.decode("Vec<DelegateInfo>", registry, encoded)
+        bt_decode.decode("u16", registry, b"\x01\x00")
+        # Using a makes b the least recently used, so c evicts b
+        assert bt_decode.decode("Vec<DelegateInfo>", registry, encoded) is a
+        bt_decode.decode("u16", registry, b"\x02\x00")
+
+        assert bt_decode.decode("Vec<DelegateInfo>", registry, encoded) is a
+        bt_decode.decode("u16", registry, b"\x01\x00")
+        info = registry.decode_cache_info()
+        assert (info["hits"], info["misses"], info["entries"]) == (2, 4, 2)
+
+    def test_new_type_strings_from_threads(self):
+        # Type strings are added to the registry while other threads decode and encode
+        with open(TEST_TYPES_JSON, "r") as f:
+            registry = bt_decode.CompiledRegistry.from_portable_registry(
+                bt_decode.PortableRegistry.from_json(f.read())
+            )
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+
+        def work(n: int):
+            type_string = f"[u16; {n + 1}]"
+            value = tuple(range(n + 1))
+            assert bt_decode.decode(
+                type_string, registry, bt_decode.encode(type_string, registry, value)
+            ) == value
+            return bt_decode.decode("Vec<DelegateInfo>", registry, encoded)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(work, range(16)))
+
+        assert results == [expected] * 16
+
+    def test_decode_list_with_workers(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+
+        actual = bt_decode.decode_list(
+            ["Vec<DelegateInfo>", "u8", "Vec<DelegateInfo>"],
+            self.registry,
+            [encoded, bytes.fromhex("01"), encoded],
+            workers=4,
+        )
+
+        assert actual == [expected, 1, expected]
+
+    def test_decode_many_with_workers(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        compiled = bt_decode.compile("Vec<DelegateInfo>", self.registry)
+        expected = compiled.decode(encoded)
+
+        assert compiled.decode_many([encoded] * 3, workers=2) == [expected] * 3
+
+    def test_decode_from_buffers(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+
+        for buffer in [bytearray(encoded), memoryview(encoded)]:
+            assert (
+                bt_decode.decode("Vec<DelegateInfo>", self.registry, buffer) == expected
+            )
+
+    def test_decode_range(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+
+        framed = b"\x00" * 7 + encoded + b"\xff" * 3
+        assert (
+            bt_decode.decode(
+                "Vec<DelegateInfo>",
+                self.registry,
+                memoryview(framed),
+                offset=7,
+                length=len(encoded),
+            )
+            == expected
+        )
+        last_byte = bt_decode.decode("u8", self.registry, framed, offset=len(framed) - 1)
+        assert last_byte == 255
+
+        with pytest.raises(ValueError):
+            bt_decode.decode("u8", self.registry, encoded, offset=len(encoded) + 1)
+
+    def test_decode_iter(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+
+        assert (
+            list(bt_decode.decode_iter("Vec<DelegateInfo>", self.registry, encoded))
+            == expected
+        )
+        compiled = bt_decode.compile("Vec<DelegateInfo>", self.registry)
+        assert list(compiled.decode_iter(bytearray(encoded))) == expected
+
+        with pytest.raises(ValueError):
+            bt_decode.decode_iter("u8", self.registry, encoded)
+
+    def test_decode_error(self):
+        encoded = get_file_bytes("tests/delegates_info.hex")
+        expected = bt_decode.decode("Vec<DelegateInfo>", self.registry, encoded)
+        truncated = encoded[: len(encoded) // 2]
+
+        with pytest.raises(bt_decode.DecodeError) as exc_info:
+            bt_decode.decode("Vec<DelegateInfo>", self.registry, truncated)
+        assert exc_info.value.type_path == "Vec<DelegateInfo>"
+        assert exc_info.value.offset + exc_info.value.remaining == len(truncated)
+
+        value, error = bt_decode.decode(
+            "Vec<DelegateInfo>", self.registry, truncated, strict=False
+        )
+        assert isinstance(error, bt_decode.DecodeError)
+        assert 0 < len(value) < len(expected)
+        assert value == expected[: len(value)]
+
+        value, error = bt_decode.decode("u64", self.registry, b"\x01", strict=False)
+        assert value is None
+        assert isinstance(error, bt_decode.DecodeError)
+
+    def test_decode_invalid_type_string(self):
+        for type_string in ["", "Vec<", "[u8; x]", "scale_info::x"]:
+            with pytest.raises(ValueError):
+                bt_decode.decode(type_string, self.registry, b"\x00")
+
+    def test_decode_invalid_hex(self):
+        for invalid_hex in ["0x0", "0xzz", "not hex"]:
+            with pytest.raises(ValueError):
+                bt_decode.decode("u8", self.registry, invalid_hex)
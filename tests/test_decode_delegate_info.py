@@ -1,6 +1,7 @@
 from typing import Callable, Dict, List, Tuple
 
 import dataclasses
+import pytest
 import unittest
 
 import bt_decode
@@ -139,3 +140,257 @@ class TestDecodeDelegateInfo(unittest.TestCase):
                         )
 
             self.assertGreater(attr_count, 0, "No attributes found")
+
+    def test_decode_vec_fields_are_cached(self):
+        delegates_info: List[bt_decode.DelegateInfo] = (
+            bt_decode.DelegateInfo.decode_vec(TEST_DELEGATE_INFO_HEX["vec normal"]())
+        )
+
+        for delegate_info in delegates_info[:10]:
+            # Converted on first access, then the same object is returned
+            self.assertIs(delegate_info.nominators, delegate_info.nominators)
+            self.assertIs(delegate_info.delegate_ss58, delegate_info.delegate_ss58)
+
+    def test_decode_vec_iter_matches_decode_vec(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        delegates_info = bt_decode.DelegateInfo.decode_vec(encoded)
+
+        iterator = bt_decode.DelegateInfo.decode_vec_iter(encoded)
+        self.assertEqual(iterator.__length_hint__(), len(delegates_info))
+
+        count = 0
+        for delegate_info, expected in zip(iterator, delegates_info):
+            count += 1
+            self.assertEqual(delegate_info.delegate_ss58, expected.delegate_ss58)
+            self.assertEqual(delegate_info.nominators, expected.nominators)
+            self.assertEqual(delegate_info.take, expected.take)
+
+        self.assertEqual(count, len(delegates_info))
+        self.assertEqual(list(iterator), [])
+
+    def test_decode_vec_iter_truncated_length_raises_decode_error(self):
+        # A two-byte compact length prefix, cut after its first byte
+        with self.assertRaises(bt_decode.DecodeError) as context:
+            bt_decode.DelegateInfo.decode_vec_iter(b"\x01")
+
+        self.assertEqual(context.exception.type_path, "Vec<DelegateInfo>")
+        self.assertEqual(
+            context.exception.offset + context.exception.remaining, 1
+        )
+
+    def test_decode_vec_iter_length_hint_is_bounded(self):
+        # A length prefix of 2**31 - 1 items, with only 10 bytes after it
+        encoded = b"\x03\xff\xff\xff\x7f" + bytes(10)
+        iterator = bt_decode.DelegateInfo.decode_vec_iter(encoded)
+
+        self.assertLessEqual(iterator.__length_hint__(), 10)
+
+    def test_vec_decoder_in_chunks(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        delegates_info = bt_decode.DelegateInfo.vec_decoder()
+        expected = bt_decode.DelegateInfo.decode_vec(encoded)
+
+        decoded = []
+        for start in range(0, len(encoded), 1000):
+            delegates_info.feed(encoded[start : start + 1000])
+            decoded.extend(delegates_info.drain())
+            self.assertEqual(delegates_info.done, len(decoded) == len(expected))
+
+        self.assertTrue(delegates_info.done)
+        self.assertEqual(len(decoded), len(expected))
+        for delegate_info, expected_info in zip(decoded, expected):
+            self.assertEqual(delegate_info.delegate_ss58, expected_info.delegate_ss58)
+            self.assertEqual(delegate_info.nominators, expected_info.nominators)
+
+    def test_vec_decoder_byte_by_byte(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()[:5000]
+        decoder = bt_decode.DelegateInfo.vec_decoder()
+
+        decoded = []
+        for byte in encoded:
+            decoder.feed(bytes([byte]))
+            decoded.extend(decoder.drain())
+
+        self.assertGreater(len(decoded), 0)
+        self.assertFalse(decoder.done)
+
+    def test_vec_decoder_trailing_bytes(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        expected = bt_decode.DelegateInfo.decode_vec(encoded)
+        decoder = bt_decode.DelegateInfo.vec_decoder()
+
+        decoder.feed(encoded + b"\x01\x02")
+        self.assertIsNone(decoder.trailing)
+        self.assertEqual(len(decoder.drain()), len(expected))
+        self.assertTrue(decoder.done)
+        self.assertEqual(decoder.trailing, b"\x01\x02")
+
+        with self.assertRaises(ValueError):
+            decoder.feed(b"\x03")
+        self.assertEqual(decoder.drain(), [])
+        self.assertEqual(decoder.trailing, b"\x01\x02")
+
+    def test_vec_decoder_invalid_item(self):
+        # delegate, take, no nominators, owner, registrations, permits and returns
+        item = bytes(32) + b"\x04" + b"\x00" + bytes(32) + b"\x00" * 4
+        # A Compact<u16> take in the big-integer mode of more than 4 bytes is invalid
+        invalid = bytes(32) + b"\x07" + item[33:]
+        decoder = bt_decode.DelegateInfo.vec_decoder()
+
+        decoder.feed(b"\x10" + item + item + invalid + item)
+        # The items before the invalid one are returned, once
+        self.assertEqual([d.take for d in decoder.drain()], [1, 1])
+        for _ in range(2):
+            with self.assertRaises(bt_decode.DecodeError):
+                decoder.drain()
+
+        decoder.feed(item)
+        with self.assertRaises(bt_decode.DecodeError):
+            decoder.drain()
+        self.assertFalse(decoder.done)
+
+    def test_decode_vec_truncated_raises_decode_error(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        truncated = encoded[: len(encoded) // 2]
+
+        with self.assertRaises(bt_decode.DecodeError) as context:
+            bt_decode.DelegateInfo.decode_vec(truncated)
+
+        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual(context.exception.type_path, "Vec<DelegateInfo>")
+        self.assertLessEqual(context.exception.offset, len(truncated))
+        self.assertEqual(
+            context.exception.offset + context.exception.remaining, len(truncated)
+        )
+
+    def test_decode_vec_not_strict(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        expected = bt_decode.DelegateInfo.decode_vec(encoded)
+
+        delegates_info, error = bt_decode.DelegateInfo.decode_vec(encoded, strict=False)
+        self.assertIsNone(error)
+        self.assertEqual(len(delegates_info), len(expected))
+
+        truncated = encoded[: len(encoded) // 2]
+        delegates_info, error = bt_decode.DelegateInfo.decode_vec(
+            truncated, strict=False
+        )
+        self.assertIsInstance(error, bt_decode.DecodeError)
+        self.assertGreater(len(delegates_info), 0)
+        self.assertLess(len(delegates_info), len(expected))
+        for delegate_info, expected_info in zip(delegates_info, expected):
+            self.assertEqual(delegate_info.delegate_ss58, expected_info.delegate_ss58)
+
+    def test_decode_trailing_bytes(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        delegate_info = bt_decode.DelegateInfo.decode_vec(encoded)[0]
+        # The first delegate, followed by the rest of the Vec, after the compact length
+        prefix_length = {0: 1, 1: 2, 2: 4}[encoded[0] & 0b11]
+        encoded_first = encoded[prefix_length:]
+
+        decoded = bt_decode.DelegateInfo.decode(encoded_first)
+        self.assertEqual(decoded.delegate_ss58, delegate_info.delegate_ss58)
+
+        with self.assertRaises(bt_decode.DecodeError):
+            bt_decode.DelegateInfo.decode(encoded_first, allow_trailing_bytes=False)
+
+    def test_decode_vec_ss58_format(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        delegates_info = bt_decode.DelegateInfo.decode_vec(encoded)
+        delegates_info_ss58 = bt_decode.DelegateInfo.decode_vec(encoded, ss58_format=42)
+
+        for delegate_info, delegate_info_ss58 in zip(
+            delegates_info[:10], delegates_info_ss58
+        ):
+            self.assertEqual(
+                delegate_info_ss58.delegate_ss58,
+                bittensor.u8_key_to_ss58(delegate_info.delegate_ss58),
+            )
+            self.assertEqual(
+                delegate_info_ss58.nominators,
+                [
+                    (bittensor.u8_key_to_ss58(nominator), stake)
+                    for nominator, stake in delegate_info.nominators
+                ],
+            )
+            self.assertEqual(delegate_info_ss58.take, delegate_info.take)
+
+        projected = bt_decode.DelegateInfo.decode_vec(
+            encoded, fields=["owner_ss58"], ss58_format=42
+        )
+        self.assertEqual(
+            projected[0]["owner_ss58"], delegates_info_ss58[0].owner_ss58
+        )
+
+    def test_decode_vec_intern_account_ids(self):
+        encoded = TEST_DELEGATE_INFO_HEX["vec normal"]()
+        delegates_info = bt_decode.DelegateInfo.decode_vec(encoded)
+
+        for kwargs in ({"intern_account_ids": True}, {"ss58_format": 42}):
+            delegates_info_interned = bt_decode.DelegateInfo.decode_vec(
+                encoded, **kwargs
+            )
+            account_ids = [
+                account_id
+                for delegate_info in delegates_info_interned
+                for account_id in (
+                    delegate_info.delegate_ss58,
+                    delegate_info.owner_ss58,
+                    *(nominator for nominator, _ in delegate_info.nominators),
+                )
+            ]
+            self.assertGreater(len(account_ids), len(set(account_ids)))
+            # Equal AccountIds are the same object
+            shared = {}
+            for account_id in account_ids:
+                self.assertIs(shared.setdefault(account_id, account_id), account_id)
+
+        self.assertEqual(
+            [
+                delegate_info.nominators
+                for delegate_info in bt_decode.DelegateInfo.decode_vec(
+                    encoded, intern_account_ids=True
+                )
+            ],
+            [delegate_info.nominators for delegate_info in delegates_info],
+        )
+
+    def test_ss58_encode_decode_many(self):
+        delegates_info = bt_decode.DelegateInfo.decode_vec(
+            TEST_DELEGATE_INFO_HEX["vec normal"]()
+        )
+        public_keys = [
+            bytes(nominator)
+            for delegate_info in delegates_info
+            for nominator, _ in delegate_info.nominators
+        ]
+
+        addresses = bt_decode.ss58_encode_many(b"".join(public_keys))
+        self.assertEqual(
+            addresses, [bittensor.u8_key_to_ss58(key) for key in public_keys]
+        )
+
+        # ss58_decode_many returns a NumPy array
+        pytest.importorskip("numpy")
+        decoded = bt_decode.ss58_decode_many(addresses, ss58_format=42)
+        self.assertEqual(decoded.shape, (len(public_keys), 32))
+        self.assertEqual(decoded.tobytes(), b"".join(public_keys))
+        # A (n, 32) array is encoded as is
+        self.assertEqual(bt_decode.ss58_encode_many(decoded), addresses)
+
+    def test_ss58_known_address(self):
+        alice = bytes.fromhex(
+            "d43593c715fdd31c61141abd04a99fd6822c8558854ccde39a5684e7a56da27d"
+        )
+        address = "5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY"
+
+        self.assertEqual(bt_decode.ss58_encode_many(alice), [address])
+        with self.assertRaises(ValueError):
+            bt_decode.ss58_encode_many(alice[:31])
+
+        pytest.importorskip("numpy")
+        self.assertEqual(bt_decode.ss58_decode_many([address]).tobytes(), alice)
+        with self.assertRaises(ValueError):
+            bt_decode.ss58_decode_many([address], ss58_format=0)
+        with self.assertRaises(ValueError):
+            bt_decode.ss58_decode_many([address[:-1] + "Z"])
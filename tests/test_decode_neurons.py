@@ -2,6 +2,7 @@ from typing import Callable, Dict, List
 
 import dataclasses
 import netaddr
+import pytest
 import unittest
 
 import bittensor
@@ -46,6 +47,22 @@ FIELD_FIXES: Dict[str, Callable] = {
     "weights": lambda x: [[e[0], e[1]] for e in x],
 }
 
+COLUMNAR_SCALAR_FIELDS = [
+    "uid",
+    "netuid",
+    "active",
+    "rank",
+    "emission",
+    "incentive",
+    "consensus",
+    "trust",
+    "validator_trust",
+    "dividends",
+    "last_update",
+    "validator_permit",
+    "pruning_score",
+]
+
 
 def fix_field(key, value, parent_key=None):
     return fix_field_fixes(FIELD_FIXES, key, value, parent_key)
@@ -151,6 +168,81 @@ class TestDecodeNeuronInfoLite(unittest.TestCase):
 
             self.assertGreater(attr_count, 0, "No attributes found")
 
+    def test_decode_hex_str(self):
+        neuron_info = bt_decode.NeuronInfoLite.decode(
+            bytes.fromhex(TEST_NEURON_INFO_LITE_HEX["normal"])
+        )
+
+        for hex_str in [
+            TEST_NEURON_INFO_LITE_HEX["normal"],
+            "0x" + TEST_NEURON_INFO_LITE_HEX["normal"],
+        ]:
+            neuron_info_hex = bt_decode.NeuronInfoLite.decode(hex_str)
+            self.assertEqual(neuron_info_hex.hotkey, neuron_info.hotkey)
+            self.assertEqual(neuron_info_hex.stake, neuron_info.stake)
+
+    def test_decode_vec_from_buffer_range(self):
+        encoded = TEST_NEURON_INFO_LITE_HEX["vec normal"]()
+        expected = bt_decode.NeuronInfoLite.decode_vec(encoded)
+
+        framed = bytearray(b"\x00" * 5 + encoded + b"\x00")
+        actual = bt_decode.NeuronInfoLite.decode_vec(
+            memoryview(framed), offset=5, length=len(encoded)
+        )
+
+        self.assertEqual(
+            [neuron.hotkey for neuron in actual],
+            [neuron.hotkey for neuron in expected],
+        )
+        self.assertEqual(
+            [neuron.stake for neuron in actual],
+            [neuron.stake for neuron in expected],
+        )
+
+    def test_decode_vec_fields(self):
+        encoded = TEST_NEURON_INFO_LITE_HEX["vec normal"]()
+        neurons = bt_decode.NeuronInfoLite.decode_vec(encoded)
+        fields = ["hotkey", "stake", "validator_permit"]
+        projected = bt_decode.NeuronInfoLite.decode_vec(encoded, fields=fields)
+
+        self.assertEqual(len(projected), len(neurons))
+        for item, neuron in zip(projected, neurons):
+            self.assertEqual(list(item.keys()), fields)
+            for field in fields:
+                self.assertEqual(item[field], getattr(neuron, field))
+
+    def test_decode_vec_unknown_field(self):
+        encoded = TEST_NEURON_INFO_LITE_HEX["vec normal"]()
+
+        with self.assertRaises(ValueError):
+            bt_decode.NeuronInfoLite.decode_vec(encoded, fields=["weights"])
+
+    def test_decode_vec_columnar_matches_decode_vec(self):
+        # numpy is an optional dependency, only needed for the columnar decoders
+        np = pytest.importorskip("numpy")
+        encoded = TEST_NEURON_INFO_LITE_HEX["vec normal"]()
+        neurons = bt_decode.NeuronInfoLite.decode_vec(encoded)
+        columns = bt_decode.NeuronInfoLite.decode_vec_columnar(encoded)
+
+        self.assertEqual(columns["hotkey"].shape, (len(neurons), 32))
+        self.assertEqual(columns["hotkey"].dtype, np.uint8)
+        self.assertEqual(columns["uid"].dtype, np.uint16)
+        self.assertEqual(columns["emission"].dtype, np.uint64)
+        self.assertEqual(columns["stake"].dtype, np.uint64)
+
+        for i, neuron in enumerate(neurons):
+            self.assertEqual(bytes(columns["hotkey"][i]), bytes(neuron.hotkey))
+            self.assertEqual(bytes(columns["coldkey"][i]), bytes(neuron.coldkey))
+            self.assertEqual(
+                columns["stake"][i], sum(amount for _, amount in neuron.stake)
+            )
+            for field in COLUMNAR_SCALAR_FIELDS:
+                self.assertEqual(
+                    columns[field][i],
+                    getattr(neuron, field),
+                    f"Column {field} does not match",
+                )
+
 
 class TestDecodeNeuronInfo(unittest.TestCase):
     def test_decode_no_errors(self):
@@ -238,3 +330,62 @@ class TestDecodeNeuronInfo(unittest.TestCase):
                         )
 
             self.assertGreater(attr_count, 0, "No attributes found")
+
+    def test_decode_vec_columnar_matches_decode_vec(self):
+        np = pytest.importorskip("numpy")
+        encoded = TEST_NEURON_INFO_HEX["vec normal"]()
+        neurons = bt_decode.NeuronInfo.decode_vec(encoded)
+        columns = bt_decode.NeuronInfo.decode_vec_columnar(encoded)
+
+        self.assertEqual(columns["hotkey"].shape, (len(neurons), 32))
+        self.assertEqual(columns["hotkey"].dtype, np.uint8)
+        self.assertEqual(columns["uid"].dtype, np.uint16)
+        self.assertEqual(columns["emission"].dtype, np.uint64)
+        self.assertEqual(columns["stake"].dtype, np.uint64)
+
+        for i, neuron in enumerate(neurons):
+            self.assertEqual(bytes(columns["hotkey"][i]), bytes(neuron.hotkey))
+            self.assertEqual(bytes(columns["coldkey"][i]), bytes(neuron.coldkey))
+            self.assertEqual(
+                columns["stake"][i], sum(amount for _, amount in neuron.stake)
+            )
+            for field in COLUMNAR_SCALAR_FIELDS:
+                self.assertEqual(
+                    columns[field][i],
+                    getattr(neuron, field),
+                    f"Column {field} does not match",
+                )
+
+    def test_decode_vec_fields(self):
+        encoded = TEST_NEURON_INFO_HEX["vec normal"]()
+        neurons = bt_decode.NeuronInfo.decode_vec(encoded)
+        fields = ["axon_info", "weights", "pruning_score"]
+        projected = bt_decode.NeuronInfo.decode_vec(encoded, fields=fields)
+
+        self.assertEqual(len(projected), len(neurons))
+        for item, neuron in zip(projected, neurons):
+            self.assertEqual(list(item.keys()), fields)
+            self.assertEqual(item["axon_info"].ip, neuron.axon_info.ip)
+            self.assertEqual(item["weights"], neuron.weights)
+            self.assertEqual(item["pruning_score"], neuron.pruning_score)
+
+    def test_decode_vec_columnar_weights_and_bonds_as_csr(self):
+        np = pytest.importorskip("numpy")
+        encoded = TEST_NEURON_INFO_HEX["vec normal"]()
+        neurons = bt_decode.NeuronInfo.decode_vec(encoded)
+        columns = bt_decode.NeuronInfo.decode_vec_columnar(encoded)
+
+        for field in ["weights", "bonds"]:
+            indptr, indices, values = columns[field]
+            self.assertEqual(indptr.dtype, np.uint32)
+            self.assertEqual(indices.dtype, np.uint16)
+            self.assertEqual(values.dtype, np.uint16)
+            self.assertEqual(len(indptr), len(neurons) + 1)
+
+            for i, neuron in enumerate(neurons):
+                row = slice(indptr[i], indptr[i + 1])
+                self.assertEqual(
+                    list(zip(indices[row].tolist(), values[row].tolist())),
+                    [tuple(entry) for entry in getattr(neuron, field)],
+                    f"Row {i} of {field} does not match",
+                )
@@ -1,9 +1,14 @@
 from typing import Any, Dict, Tuple
 
+import os
 import pytest
 
 import bt_decode
 
+from . import get_metadata
+
+ALICE_HEX = "d43593c715fdd31c61141abd04a99fd6822c8558854ccde39a5684e7a56da27d"
+ALICE_SS58 = "5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY"
 
 TEST_TYPE_STRING_SCALE_INFO_DECODING: Dict[str, Tuple[str, Any]] = {
     "scale_info::2": ("01", 1),  # u8
@@ -159,6 +164,9 @@ TEST_TYPE_STRING_SCALE_INFO_DECODING: Dict[str, Tuple[str, Any]] = {
     ),  # NeuronInfo
     "Option<scale_info::39> ": ("00", None),
     "Option<scale_info::39>": ("010100", 1),  # u16
+    "scale_info::0": (ALICE_HEX, (bytes.fromhex(ALICE_HEX),)),  # AccountId32
+    "scale_info::0 ": (ALICE_HEX, bytes.fromhex(ALICE_HEX)),
+    "scale_info::0  ": (ALICE_HEX, ALICE_SS58),
 }
 
 
@@ -182,10 +190,13 @@ TEST_TYPE_STRING_PLAIN_DECODING: list[tuple[str, tuple[str, Any]]] = [
     ("()", ("", ())),
     ("[u8; 4]", ("62616265", (98, 97, 98, 101))),
     ("[u8; 4]", ("62616265", [98, 97, 98, 101])),
+    ("[u8; 4]", ("62616265", b"babe")),
     ("Vec<u8>", ("0c010203", (1, 2, 3))),
+    ("Vec<u8>", ("0c010203", b"\x01\x02\x03")),
     ("Vec<u8> ", ("00", [])),
     ("Vec<u8> ", ("00", ())),
     ("(u8, u16) ", ("7bffff", (123, 2**16 - 1))),
+    ("Vec<(u16, u16)>", ("0801000200ffff0000", [(1, 2), (2**16 - 1, 0)])),
     ("str", ("0c666f6f", "foo")),
 ]
 
@@ -236,3 +247,229 @@ class TestEncodeByScaleInfoTypeString:
         test_bytes = bytes.fromhex(test_hex)
         actual: list[int] = bt_decode.encode(type_string, self.registry, test_value)
         assert bytes(actual) == test_bytes
+
+
+@pytest.mark.parametrize(
+    "type_string,test_hex,test_value",
+    [(x, y, z) for x, (y, z) in TEST_TYPE_STRING_PLAIN_DECODING],
+)
+class TestEncodeByPlainTypeStringCompiledRegistry:
+    # Test the same type strings against a CompiledRegistry that is reused across calls
+    registry: bt_decode.CompiledRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.CompiledRegistry.from_portable_registry(
+            bt_decode.PortableRegistry.from_json(types_json_str)
+        )
+
+    def test_encode_values(self, type_string: str, test_value: Any, test_hex: str):
+        type_string = type_string.strip()
+
+        test_bytes = bytes.fromhex(test_hex)
+        actual: list[int] = bt_decode.encode(type_string, self.registry, test_value)
+        assert bytes(actual) == test_bytes
+
+
+@pytest.mark.parametrize(
+    "type_string,test_hex,test_value",
+    [(x, y, z) for x, (y, z) in TEST_TYPE_STRING_PLAIN_DECODING],
+)
+class TestEncodeByCompiledType:
+    # Test encoding with a type string compiled ahead of time
+    registry: bt_decode.PortableRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.PortableRegistry.from_json(types_json_str)
+
+    def test_encode_values(self, type_string: str, test_value: Any, test_hex: str):
+        compiled = bt_decode.compile(type_string.strip(), self.registry)
+
+        test_bytes = bytes.fromhex(test_hex)
+        actual: list[int] = compiled.encode(test_value)
+        assert bytes(actual) == test_bytes
+
+
+class TestEncodeWeights:
+    # Test encoding a large list of tuples, as in a set_weights payload
+    registry: bt_decode.CompiledRegistry
+
+    @classmethod
+    def setup_class(cls) -> None:
+        with open(TEST_TYPES_JSON, "r") as f:
+            types_json_str = f.read()
+
+        cls.registry = bt_decode.CompiledRegistry.from_portable_registry(
+            bt_decode.PortableRegistry.from_json(types_json_str)
+        )
+
+    def test_encode_weights(self):
+        weights = [(uid, (uid * 7) % 2**16) for uid in range(4096)]
+
+        # Compact<u32> length of 4096, then each (u16, u16) little endian
+        expected = bytes.fromhex("0140") + b"".join(
+            uid.to_bytes(2, "little") + weight.to_bytes(2, "little")
+            for uid, weight in weights
+        )
+
+        actual = bt_decode.encode("Vec<(u16, u16)>", self.registry, weights)
+        assert bytes(actual) == expected
+
+    def test_encode_weights_errors(self):
+        for weights in ([(1, -1)], [(1, True)], [(1, 2**16)], [(1, "1")]):
+            with pytest.raises(ValueError):
+                bt_decode.encode("Vec<(u16, u16)>", self.registry, weights)
+
+    def test_encode_bytes(self):
+        actual = bt_decode.encode("Vec<u8>", self.registry, b"\x01\x02")
+        assert actual == bytes.fromhex("080102")
+
+        # Bytes for a sequence of wider ints are taken as a list of ints
+        actual = bt_decode.encode("Vec<u16>", self.registry, b"\x01\x02")
+        assert actual == bytes.fromhex("0801000200")
+
+        with pytest.raises(ValueError, match="Invalid type for a list of data"):
+            bt_decode.encode("bool", self.registry, b"\x01")
+
+    def test_encode_ss58_only_for_public_keys(self):
+        # An SS58 string is only taken as the public key of a [u8; 32]
+        actual = bt_decode.encode("[u8; 32]", self.registry, ALICE_SS58)
+        assert actual == bytes.fromhex(ALICE_HEX)
+
+        for type_string in ("Vec<u8>", "[u8; 4]", "u32"):
+            with pytest.raises(ValueError, match="Invalid type for string data"):
+                bt_decode.encode(type_string, self.registry, ALICE_SS58)
+
+    def test_encode_returns_bytes(self):
+        actual = bt_decode.encode("Compact<u16>", self.registry, 2**16 - 1)
+        assert actual == bytes.fromhex("feff0300")
+
+        actual = bt_decode.encode("Compact<u16>", self.registry, 2**16 - 1, as_list=True)
+        assert actual == [254, 255, 3, 0]
+
+    def test_encode_into(self):
+        buffer = bytearray(8)
+        written = bt_decode.encode_into(
+            "Compact<u16>", self.registry, 2**16 - 1, buffer, offset=2
+        )
+        assert written == 4
+        assert buffer == bytearray.fromhex("0000feff03000000")
+
+        compiled = bt_decode.compile("u16", self.registry)
+        written = compiled.encode_into(1, memoryview(buffer), offset=6)
+        assert written == 2
+        assert buffer == bytearray.fromhex("0000feff03000100")
+
+        with pytest.raises(ValueError):
+            bt_decode.encode_into("u32", self.registry, 1, buffer, offset=6)
+
+    def test_encode_list(self):
+        type_strings = ["Compact<u16>", "Vec<(u16, u16)>", "bool"]
+        values = [2**16 - 1, [(1, 2)], True]
+        expected = [
+            bytes.fromhex("feff0300"),
+            bytes.fromhex("0401000200"),
+            bytes.fromhex("01"),
+        ]
+
+        assert bt_decode.encode_list(type_strings, self.registry, values) == expected
+
+        buffer, offsets = bt_decode.encode_list(
+            type_strings, self.registry, values, concatenate=True
+        )
+        assert buffer == b"".join(expected)
+        assert offsets == [0, 4, 9, 10]
+
+
+@pytest.mark.skipif(
+    not os.path.exists("tests/metadata.hex"),
+    reason="needs metadata in tests/metadata.hex",
+)
+class TestStorageKey:
+    # Test storage keys against ones built by substrate for the System pallet
+    metadata: bt_decode.MetadataV15
+
+    @classmethod
+    def setup_class(cls) -> None:
+        cls.metadata = bt_decode.MetadataV15.decode_from_metadata_option(get_metadata())
+
+    def test_storage_key(self):
+        # twox128("System") ++ twox128("Number")
+        assert bt_decode.storage_key(self.metadata, "System", "Number") == bytes.fromhex(
+            "26aa394eea5630e07c48ae0c9558cef702a5c1b19ab7a04f536c519aca4983ac"
+        )
+
+        # ... ++ twox128("Account") ++ blake2_128_concat(Alice)
+        expected = bytes.fromhex(
+            "26aa394eea5630e07c48ae0c9558cef7b99d880ec681799c0cf30e8886371da9"
+            "de1e86a9a8c739864cf3cc5ec2bea59f" + ALICE_HEX
+        )
+        for alice in (bytes.fromhex(ALICE_HEX), ALICE_SS58):
+            assert (
+                bt_decode.storage_key(self.metadata, "System", "Account", [alice])
+                == expected
+            )
+
+        assert bt_decode.storage_key(self.metadata, "System", "Account") == expected[:32]
+
+    def test_storage_keys(self):
+        alice = bytes.fromhex(ALICE_HEX)
+        assert bt_decode.storage_keys(
+            self.metadata, "System", "Account", [[alice], [ALICE_SS58]]
+        ) == [bt_decode.storage_key(self.metadata, "System", "Account", [alice])] * 2
+
+    def test_decode_storage_keys(self):
+        alice = bytes.fromhex(ALICE_HEX)
+        storage_keys = bt_decode.storage_keys(
+            self.metadata, "System", "Account", [[alice], [bytes(32)]]
+        )
+        # AccountId32 is a composite around [u8; 32], so each key is a 1-tuple of bytes
+        expected = [((alice,),), ((bytes(32),),)]
+
+        assert (
+            bt_decode.decode_storage_keys(
+                self.metadata, "System", "Account", storage_keys
+            )
+            == expected
+        )
+        # Hex strings, as returned by state_getKeysPaged, in parallel
+        assert (
+            bt_decode.decode_storage_keys(
+                self.metadata,
+                "System",
+                "Account",
+                ["0x" + storage_key.hex() for storage_key in storage_keys],
+                workers=2,
+            )
+            == expected
+        )
+        number_key = bt_decode.storage_key(self.metadata, "System", "Number")
+        assert bt_decode.decode_storage_keys(
+            self.metadata, "System", "Number", [number_key]
+        ) == [()]
+
+    def test_decode_storage_keys_errors(self):
+        storage_key = bt_decode.storage_key(
+            self.metadata, "System", "Account", [bytes.fromhex(ALICE_HEX)]
+        )
+        for invalid in (storage_key[:-1], storage_key + b"\x00"):
+            with pytest.raises(ValueError):
+                bt_decode.decode_storage_keys(self.metadata, "System", "Account", [invalid])
+        # A key of another entry
+        with pytest.raises(ValueError):
+            bt_decode.decode_storage_keys(self.metadata, "System", "Number", [storage_key])
+
+    def test_storage_key_errors(self):
+        with pytest.raises(ValueError):
+            bt_decode.storage_key(self.metadata, "NoSuchPallet", "Account")
+        with pytest.raises(ValueError):
+            bt_decode.storage_key(self.metadata, "System", "NoSuchEntry")
+        with pytest.raises(ValueError):
+            bt_decode.storage_key(self.metadata, "System", "Number", [1])